@@ -1,6 +1,6 @@
+import os
 from flask import Flask
 from extensions import db, login_manager
-from models import User
 from config import Config
 
 
@@ -12,6 +12,11 @@ def create_app():
     # ======================
     app.config.from_object(Config)
 
+    # IP จริงของ client เมื่ออยู่หลัง proxy (ใช้กับ login rate limit)
+    if app.config["PROXY_FIX_X_FOR"]:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
+
     # ======================
     # INIT EXTENSIONS
     # ======================
@@ -20,17 +25,57 @@ def create_app():
     login_manager.login_view = "auth.login"
 
     # ======================
-    # CREATE TABLES (เฉพาะที่ขาด)
+    # TEMPLATES
     # ======================
-    with app.app_context():
-        db.create_all()
+    # bytecode cache บนดิสก์: worker / process ใหม่โหลด template ที่ compile แล้ว ไม่ต้อง parse ใหม่
+    # (key ตาม checksum ของ source -> แก้ template แล้วไม่ต้องล้างเอง)
+    jinja_cache_dir = app.config["JINJA_CACHE_DIR"]
+    if jinja_cache_dir is None:
+        jinja_cache_dir = os.path.join(app.instance_path, "jinja_cache")
+    if jinja_cache_dir:
+        from jinja2 import FileSystemBytecodeCache
+        os.makedirs(jinja_cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
 
     # ======================
-    # USER LOADER
+    # INIT SERVICES
     # ======================
-    @login_manager.user_loader
-    def load_user(user_id):
-        return User.query.get(int(user_id))
+    from services import search, query_budget, change_tracking, dashboard_metrics, db_routing, http_cache, static_assets, passwords, rate_limit, state_machine, audit, scheduler, analytics, overdue, live, profiling, fragment_cache
+    # profiling ก่อนทุกตัว: before_request แรก / after_request สุดท้าย -> total ครอบ hook อื่นทั้งหมด
+    profiling.init_app(app)
+    db_routing.init_app(app)
+    search.init_app(app)
+    query_budget.init_app(app)
+    change_tracking.init_app(app)
+    dashboard_metrics.init_app(app)
+    http_cache.init_app(app)
+    static_assets.init_app(app)
+    passwords.init_app(app)
+    rate_limit.init_app(app)
+    state_machine.init_app(app)
+    audit.init_app(app)
+    # scheduler ก่อน service ที่ลงทะเบียนงาน
+    scheduler.init_app(app)
+    analytics.init_app(app)
+    overdue.init_app(app)
+    live.init_app(app)
+    fragment_cache.init_app(app)
+
+    # ======================
+    # SCHEMA
+    # ======================
+    # ไม่แตะ DB ตอนสร้าง app อีกแล้ว (worker boot เร็วขึ้น / รองรับ --preload)
+    # ตารางจัดการด้วย Flask-Migrate:  flask --app wsgi db upgrade
+    # โหลด alembic เฉพาะตอนรันผ่าน flask CLI (gunicorn worker ไม่ต้องใช้)
+    if os.environ.get("FLASK_RUN_FROM_CLI"):
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    # ======================
+    # USER LOADER (identity cache)
+    # ======================
+    from services import identity_cache
+    identity_cache.init_app(app)
 
     # ======================
     # IMPORT BLUEPRINTS
@@ -40,6 +85,7 @@ def create_app():
     from blueprints.assets import assets_bp
     from blueprints.checkouts.routes import checkouts_bp
     from blueprints.tickets.routes import tickets_bp
+    from blueprints.api import api_bp
 
     # ======================
     # REGISTER BLUEPRINTS
@@ -49,10 +95,24 @@ def create_app():
     app.register_blueprint(assets_bp, url_prefix="/assets")
     app.register_blueprint(checkouts_bp, url_prefix="/checkouts")
     app.register_blueprint(tickets_bp, url_prefix="/tickets")
+    app.register_blueprint(api_bp)
 
     return app
 
 
+def warm_up(app):
+    """
+    เรียกใน gunicorn master เมื่อใช้ --preload (ดู gunicorn.conf.py)
+    compile template ล่วงหน้าเพื่อให้ทุก worker ที่ fork ออกไปได้ของที่อุ่นแล้ว
+    ไม่แตะ DB
+    """
+    for name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(name)
+
+
 if __name__ == "__main__":
     app = create_app()
+    # debug reloader: เริ่ม scheduler ใน process ลูกที่เสิร์ฟจริงเท่านั้น
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        app.extensions["scheduler"].start()
     app.run(debug=True)
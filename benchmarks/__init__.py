@@ -0,0 +1 @@
+# benchmarks/ — สคริปต์วัดประสิทธิภาพ (ไม่ใช่ unit test)  รันจาก root ของโปรเจกต์
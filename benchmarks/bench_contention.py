@@ -0,0 +1,219 @@
+# benchmarks/bench_contention.py
+# ======================
+# ยิง transition พร้อมกันหลาย thread แล้วตรวจว่า optimistic concurrency ถูกต้อง
+# ======================
+# DB เป็นไฟล์ SQLite ชั่วคราว (หรือ --database-url) ทุก thread มี app context / session ของตัวเอง
+#   approve : ทุก thread อนุมัติ checkout ชุดเดียวกัน (สลับลำดับ)
+#             -> แต่ละรายการต้องถูกเปลี่ยนแค่ครั้งเดียว (version = 2) ที่เหลือเป็น conflict
+#   request : ทุก thread ขอเบิกครุภัณฑ์ชุดเดียวกัน
+#             -> ครุภัณฑ์ละ 1 checkout active เท่านั้น (uq_checkouts_active_asset)
+#   ไม่มี error อื่นหลุดออกมา (lock ชนกัน -> with_retry ลองใหม่เอง)
+# ใช้:
+#   python -m benchmarks.bench_contention                  # เทียบกับ baseline
+#   python -m benchmarks.bench_contention --threads 16     # เพิ่มแรงกด
+#   python -m benchmarks.bench_contention --update         # บันทึก baseline ใหม่
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "contention.json")
+
+
+def setup(database_url, items):
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, ROOT)
+    from app import create_app
+    from extensions import db
+    from models import Asset, Category, Checkout, Location, User
+    from services.search import trigram_metadata
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        if db.engine.dialect.name == "sqlite":
+            # create_all ไม่ผ่าน migration -> สร้างตาราง trigram เอง (insert asset จะ index ลงตารางนี้)
+            trigram_metadata.drop_all(db.engine)
+            trigram_metadata.create_all(db.engine)
+        # ไม่ต้อง hash รหัสผ่านจริง (ไม่ได้ login)
+        admin = User(full_name="Bench Admin", email="bench@example.com", password_hash="-", role="admin")
+        cat, loc = Category(name="Bench"), Location(building="B", room="1")
+        db.session.add_all([admin, cat, loc])
+        db.session.flush()
+        db.session.add_all([
+            Asset(asset_tag="BENCH-%05d" % i, name="bench %d" % i, category_id=cat.id, location_id=loc.id)
+            for i in range(items * 2)
+        ])
+        db.session.flush()
+        assets = [a.id for a in Asset.query.order_by(Asset.id)]
+        db.session.add_all([
+            Checkout(asset_id=a, borrower_id=admin.id, status="requested") for a in assets[:items]
+        ])
+        db.session.commit()
+        ids = [c.id for c in Checkout.query.order_by(Checkout.id)]
+        return app, admin.id, ids, assets[items:]
+
+
+def hammer(app, threads, work):
+    """รัน work(i, item) ทุก item ในทุก thread พร้อมกัน คืน (latencies, outcomes, errors, seconds)"""
+    latencies, outcomes, errors = [], [], []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def run(i):
+        with app.app_context():
+            start.wait()
+            for item in work.items(i):
+                t0 = time.perf_counter()
+                try:
+                    outcome = work(item)
+                except Exception as e:  # noqa: BLE001 นับทุกอย่างที่หลุดออกมาเป็น error
+                    outcome, err = None, "%s: %s" % (type(e).__name__, e)
+                else:
+                    err = None
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+                    if err:
+                        errors.append(err)
+                    else:
+                        outcomes.append(outcome)
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, outcomes, errors, time.perf_counter() - t0
+
+
+class Work:
+    def __init__(self, items, fn):
+        self.all = list(items)
+        self.fn = fn
+
+    def items(self, i):
+        # แต่ละ thread ไล่คนละลำดับ -> ชนกันทั้งต้นและปลายรายการ
+        order = list(self.all)
+        random.Random(i).shuffle(order)
+        return order
+
+    def __call__(self, item):
+        return self.fn(item)
+
+
+def summarize(name, latencies, outcomes, errors, seconds):
+    ms = sorted(x * 1000 for x in latencies)
+    return {
+        "phase": name,
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(statistics.median(ms), 2) if ms else 0.0,
+        "p95_ms": round(ms[int(len(ms) * 0.95) - 1], 2) if ms else 0.0,
+        "won": sum(1 for o in outcomes if o),
+        "conflicts": sum(1 for o in outcomes if not o),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--items", type=int, default=200, help="จำนวน checkout / ครุภัณฑ์ที่แย่งกัน")
+    parser.add_argument("--database-url", help="ค่าเริ่มต้น: ไฟล์ SQLite ชั่วคราว (ตารางถูก drop/create ใหม่!)")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="ยอมให้ throughput ต่ำกว่า baseline ได้กี่เท่า (0.5 = 50%%)")
+    parser.add_argument("--update", action="store_true", help="เขียน baseline ใหม่")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    url = args.database_url
+    if not url:
+        fd, tmp = tempfile.mkstemp(suffix=".db", prefix="bench-contention-")
+        os.close(fd)
+        url = "sqlite:///" + tmp
+
+    try:
+        app, admin_id, checkout_ids, free_assets = setup(url, args.items)
+        from extensions import db
+        from models import Checkout
+        from services.checkout_batch import request_assets, transition
+        from services.state_machine import ConflictError
+
+        def approve(cid):
+            return bool(transition("approve", [cid], admin_id)["changed"])
+
+        def request(asset_id):
+            try:
+                return bool(request_assets([asset_id], admin_id)["created"])
+            except ConflictError:
+                db.session.rollback()
+                return False
+
+        phases = [
+            summarize("approve", *hammer(app, args.threads, Work(checkout_ids, approve))),
+            summarize("request", *hammer(app, args.threads, Work(free_assets, request))),
+        ]
+
+        failures = []
+        with app.app_context():
+            rows = db.session.execute(db.select(Checkout.id, Checkout.status, Checkout.version)
+                                      .where(Checkout.id.in_(checkout_ids))).all()
+            wrong = [r.id for r in rows if (r.status, r.version) != ("approved", 2)]
+            if wrong:
+                failures.append("approve: %d checkouts not approved exactly once" % len(wrong))
+            active = db.session.execute(
+                db.select(Checkout.asset_id, db.func.count())
+                .where(Checkout.asset_id.in_(free_assets), Checkout.status == "requested")
+                .group_by(Checkout.asset_id)
+            ).all()
+            if len(active) != len(free_assets) or any(n != 1 for _, n in active):
+                failures.append("request: expected exactly one active checkout per asset")
+        for p in phases:
+            if p["won"] != args.items:
+                failures.append("%s: %d winners, expected %d" % (p["phase"], p["won"], args.items))
+            if p["errors"]:
+                failures.append("%s: %d unexpected errors" % (p["phase"], p["errors"]))
+    finally:
+        if tmp:
+            for suffix in ("", "-journal", "-wal", "-shm"):
+                if os.path.exists(tmp + suffix):
+                    os.remove(tmp + suffix)
+
+    result = {
+        "threads": args.threads,
+        "items": args.items,
+        "phases": phases,
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.update:
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        with open(BASELINE, "w") as f:
+            json.dump({p["phase"]: {"ops_per_sec": p["ops_per_sec"]} for p in phases}, f, indent=2)
+        print("baseline written:", BASELINE)
+    elif os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        for p in phases:
+            base = baseline.get(p["phase"], {}).get("ops_per_sec")
+            if base and p["ops_per_sec"] < base * (1 - args.tolerance):
+                failures.append("%s: %.1f ops/s < %.1f ops/s (baseline - %d%%)" % (
+                    p["phase"], p["ops_per_sec"], base * (1 - args.tolerance), args.tolerance * 100))
+
+    for f in failures:
+        print("FAIL:", f)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# benchmarks/bench_routes.py
+# ======================
+# วัด latency / จำนวน SQL / หน่วยความจำสูงสุด ของแต่ละ route บนข้อมูลสังเคราะห์ (benchmarks/datagen.py)
+# ======================
+# DB เป็นไฟล์ SQLite (หรือ --database-url เช่น MySQL) สร้างครั้งแรกแล้วใช้ซ้ำเมื่อ scale/seed ตรงกัน
+# ยิงผ่าน test client ของ create_app() ในฐานะ admin (ใส่ session ตรง ๆ ไม่ผ่านหน้า login)
+#   latency   : p50 / p95 / p99 / max จาก --runs รอบ (หลัง --warmup) อ่าน body จนจบ (รวม stream)
+#   statements: จำนวน SQL ต่อ request (รอบสุดท้าย)
+#   peak_kb   : tracemalloc ระหว่าง request หนึ่งครั้ง (แยกรอบจากการจับเวลา)
+# ผลลัพธ์: benchmarks/results/routes-<scale>.json
+# เทียบกับ benchmarks/baselines/routes-<scale>.json:
+#   --percentile (ค่าเริ่มต้น p50) ช้ากว่า baseline เกิน --tolerance และ --slack-ms,
+#   SQL มากกว่า baseline, peak memory เกิน --memory-tolerance หรือ status ไม่ใช่ 200 -> FAIL
+# ใช้:
+#   python -m benchmarks.bench_routes                         # 1k (SQLite ชั่วคราว)
+#   python -m benchmarks.bench_routes --scale 100k --database-url sqlite:////tmp/bench-100k.db
+#   python -m benchmarks.bench_routes --routes assets         # เฉพาะ route ที่ชื่อมีคำนี้
+#   python -m benchmarks.bench_routes --update                # บันทึก baseline ใหม่
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import datagen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES = os.path.join(ROOT, "benchmarks", "baselines")
+RESULTS = os.path.join(ROOT, "benchmarks", "results")
+
+# (ชื่อ, path) วัดทุก route ที่ทุก scale -> หน้าไหนโหลดทั้งตาราง baseline ที่ scale ใหญ่จะฟ้องเอง
+ROUTES = (
+    ("dashboard.index", "/"),
+    ("assets.list_assets", "/assets/"),
+    ("assets.list_assets?count", "/assets/?count=1"),
+    ("assets.list_assets?status", "/assets/?status=repair&category_id=3"),
+    ("assets.list_assets?q", "/assets/?q=ThinkPad"),
+    ("assets.lookup_assets", "/assets/lookup?q=BENCH-00001"),
+    ("assets.export_csv", "/assets/export/csv?status=repair"),
+    ("checkouts.index", "/checkouts/"),
+    ("checkouts.history", "/checkouts/history"),
+    ("tickets.list_tickets", "/tickets/?status=open"),
+    ("tickets.list_tickets?closed", "/tickets/?status=closed"),
+    ("api.list_resource", "/api/v1/assets"),
+    ("api.list_resource?checkouts", "/api/v1/checkouts?status=approved"),
+    ("api.history", "/api/v1/checkouts/1/history"),
+)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def setup(database_url, scale, seed):
+    os.environ["DATABASE_URL"] = database_url
+    # ไม่ต้องการ warning ของ query budget / งานเบื้องหลังระหว่างวัด
+    os.environ.setdefault("QUERY_BUDGET_ENABLED", "0")
+    os.environ.setdefault("SCHEDULER_ENABLED", "0")
+    sys.path.insert(0, ROOT)
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        if datagen.is_seeded(scale, seed):
+            print("reuse dataset %s" % datagen.dataset_key(scale, seed), file=sys.stderr)
+        else:
+            print("generate dataset %s" % datagen.dataset_key(scale, seed), file=sys.stderr)
+            datagen.generate(scale, seed, log=lambda line: print(line, file=sys.stderr))
+    return app
+
+
+def login(client):
+    # admin = users.id 1 ของ datagen
+    with client.session_transaction() as sess:
+        sess["_user_id"] = "1"
+        sess["_fresh"] = True
+
+
+def measure(app, client, path, warmup, runs):
+    from sqlalchemy import event
+    from extensions import db
+
+    with app.app_context():
+        engine = db.engine
+    counter = {"n": 0}
+
+    def count(*_):
+        counter["n"] += 1
+
+    def call():
+        resp = client.get(path)
+        # stream (export) ต้องอ่านจนจบถึงจะนับเวลา / SQL ครบ
+        size = sum(len(chunk) for chunk in resp.response)
+        resp.close()
+        return resp.status_code, size
+
+    for _ in range(warmup):
+        call()
+    # ขยะจาก route ก่อนหน้าไม่ให้ไปเก็บกลางรอบที่จับเวลา
+    gc.collect()
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        latencies = []
+        for _ in range(runs):
+            counter["n"] = 0
+            t0 = time.perf_counter()
+            status, size = call()
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ms = sorted(latencies)
+    return {
+        "status": status,
+        "bytes": size,
+        "statements": counter["n"],
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(ms[-1], 2),
+        "peak_kb": round(peak / 1024.0, 1),
+    }
+
+
+def compare(results, baseline, metric, tolerance, memory_tolerance, slack_ms):
+    failures = []
+    for name, r in results.items():
+        if r["status"] != 200:
+            failures.append("%s: status %d" % (name, r["status"]))
+        base = baseline.get(name)
+        if not base:
+            continue
+        if metric in base:
+            # route ที่เร็วระดับไม่กี่ ms แกว่งเกิน % ได้ง่าย -> ต้องเกินทั้ง % และ slack_ms
+            limit = max(base[metric] * (1 + tolerance), base[metric] + slack_ms)
+            if r[metric] > limit:
+                failures.append("%s: %s %.2f ms > %.2f ms (baseline %.2f ms)" % (
+                    name, metric, r[metric], limit, base[metric]))
+        if r["statements"] > base["statements"]:
+            failures.append("%s: %d statements > baseline %d" % (name, r["statements"], base["statements"]))
+        if r["peak_kb"] > base["peak_kb"] * (1 + memory_tolerance):
+            failures.append("%s: peak %.1f KB > %.1f KB (baseline + %d%%)" % (
+                name, r["peak_kb"], base["peak_kb"] * (1 + memory_tolerance), memory_tolerance * 100))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark ของแต่ละ route บนข้อมูลสังเคราะห์")
+    parser.add_argument("--scale", default="1k", help="1k / 10k / 100k / 1m หรือจำนวนครุภัณฑ์")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url",
+                        help="ค่าเริ่มต้น: ไฟล์ SQLite ชั่วคราว; DB ที่ไม่มีข้อมูลของ scale/seed นี้จะถูก drop/create ใหม่!")
+    parser.add_argument("--routes", help="เฉพาะ route ที่ชื่อมีข้อความนี้ (คั่นด้วย ,)")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--percentile", choices=("p50", "p95", "p99"), default="p50",
+                        help="percentile ที่ใช้ตัดสิน (p95/p99 ต้องใช้ --runs มากพอ ไม่งั้นคือค่าสูงสุดที่แกว่ง)")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="ยอมให้ช้ากว่า baseline ได้กี่เท่า (0.5 = 50%%)")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="ส่วนต่าง latency ขั้นต่ำที่นับว่าช้าลง")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    parser.add_argument("--update", action="store_true", help="เขียน baseline ใหม่")
+    args = parser.parse_args(argv)
+
+    scale = datagen.parse_scale(args.scale)
+    label = args.scale.strip().lower() if args.scale.strip().lower() in datagen.SCALES else str(scale)
+    metric = args.percentile + "_ms"
+    wanted = [w.strip() for w in args.routes.split(",")] if args.routes else None
+
+    tmp = None
+    url = args.database_url
+    if not url:
+        fd, tmp = tempfile.mkstemp(suffix=".db", prefix="bench-routes-")
+        os.close(fd)
+        url = "sqlite:///" + tmp
+
+    try:
+        app = setup(url, scale, args.seed)
+        client = app.test_client()
+        login(client)
+        with app.app_context():
+            from extensions import db
+            dialect = db.engine.dialect.name
+
+        results = {}
+        for name, path in ROUTES:
+            if wanted and not any(w in name for w in wanted):
+                continue
+            results[name] = measure(app, client, path, args.warmup, args.runs)
+            print("  %-32s p50 %8.2f ms  p95 %8.2f ms  %3d sql" % (
+                name, results[name]["p50_ms"], results[name]["p95_ms"], results[name]["statements"]
+            ), file=sys.stderr)
+    finally:
+        if tmp:
+            for suffix in ("", "-journal", "-wal", "-shm"):
+                if os.path.exists(tmp + suffix):
+                    os.remove(tmp + suffix)
+
+    result = {
+        "scale": scale,
+        "seed": args.seed,
+        "dialect": dialect,
+        "rows": datagen.sizes(scale),
+        "runs": args.runs,
+        "routes": results,
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    os.makedirs(RESULTS, exist_ok=True)
+    with open(os.path.join(RESULTS, "routes-%s.json" % label), "w") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    baseline_path = os.path.join(BASELINES, "routes-%s.json" % label)
+    failures = []
+    if args.update:
+        os.makedirs(BASELINES, exist_ok=True)
+        baseline = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+        # --routes: อัปเดตเฉพาะ route ที่วัด ที่เหลือคงเดิม
+        baseline.update({
+            name: {k: r[k] for k in ("p50_ms", "p95_ms", "p99_ms", "statements", "peak_kb")}
+            for name, r in results.items()
+        })
+        with open(baseline_path, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print("baseline written:", baseline_path)
+        failures = compare(results, {}, metric, args.tolerance, args.memory_tolerance, args.slack_ms)
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            failures = compare(results, json.load(f), metric, args.tolerance, args.memory_tolerance, args.slack_ms)
+
+    for f in failures:
+        print("FAIL:", f)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
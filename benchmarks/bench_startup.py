@@ -0,0 +1,98 @@
+# benchmarks/bench_startup.py
+# ======================
+# วัดเวลา boot ของ worker: import app + create_app()
+# ======================
+# รันใน subprocess ใหม่ทุกรอบ (import cache ไม่ช่วย) แล้วตรวจว่า:
+#   - create_app() ไม่ยิง SQL เลย
+#   - ไม่โหลดโมดูลหนัก (reportlab / pypdf) ตอน boot
+#   - median ไม่ช้ากว่า baseline เกิน tolerance
+# ใช้:
+#   python -m benchmarks.bench_startup                 # เทียบกับ baseline
+#   python -m benchmarks.bench_startup --update        # บันทึก baseline ใหม่
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "startup.json")
+
+HEAVY_MODULES = ("reportlab", "pypdf", "numpy", "alembic")
+
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "total_ms": (t2 - t0) * 1000,
+    "statements": len(statements),
+    "heavy_loaded": [m for m in HEAVY if m in sys.modules],
+}))
+"""
+
+
+def run_once():
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    code = "HEAVY = %r\n" % (HEAVY_MODULES,) + PROBE
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="ยอมให้ช้ากว่า baseline ได้กี่เท่า (0.25 = 25%%)")
+    parser.add_argument("--update", action="store_true", help="เขียน baseline ใหม่")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    result = {
+        "total_ms_median": round(statistics.median(r["total_ms"] for r in runs), 1),
+        "create_app_ms_median": round(statistics.median(r["create_app_ms"] for r in runs), 1),
+        "statements": max(r["statements"] for r in runs),
+        "heavy_loaded": sorted({m for r in runs for m in r["heavy_loaded"]}),
+    }
+    print(json.dumps(result, indent=2))
+
+    failures = []
+    if result["statements"]:
+        failures.append("create_app() executed %d SQL statements" % result["statements"])
+    if result["heavy_loaded"]:
+        failures.append("heavy modules imported at boot: %s" % ", ".join(result["heavy_loaded"]))
+
+    if args.update:
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        with open(BASELINE, "w") as f:
+            json.dump(result, f, indent=2)
+        print("baseline written:", BASELINE)
+    elif os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        limit = baseline["total_ms_median"] * (1 + args.tolerance)
+        if result["total_ms_median"] > limit:
+            failures.append("startup %.1f ms > %.1f ms (baseline %.1f ms + %d%%)" % (
+                result["total_ms_median"], limit, baseline["total_ms_median"], args.tolerance * 100))
+
+    for f in failures:
+        print("FAIL:", f)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# benchmarks/datagen.py
+# ======================
+# สร้างข้อมูลสังเคราะห์สำหรับ benchmark (seed เดิม = ข้อมูลเดิมทุกครั้ง)
+# ======================
+# scale = จำนวนครุภัณฑ์ ("1k" / "10k" / "100k" / "1m" หรือตัวเลข) ตารางอื่นคิดตามสัดส่วน:
+#   users = max(20, scale/100)   categories = 20   locations = 40
+#   assets = scale   checkouts = scale   tickets = scale/2
+# checkout ที่ยัง active (requested/approved) ไม่ซ้ำครุภัณฑ์ (uq_checkouts_active_asset)
+# เขียนด้วย bulk INSERT ทีละ chunk แล้วเตรียมสิ่งที่หน้าเว็บอ่าน: search index, rollup analytics,
+# ตาราง overdue และสถิติของ planner (ANALYZE)
+# ใช้:
+#   python -m benchmarks.datagen --scale 100k --database-url sqlite:////tmp/bench-100k.db
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+MARK = "bench.dataset"
+CHUNK = 5000
+
+CATEGORIES = (
+    "โน้ตบุ๊ค", "คอมพิวเตอร์ตั้งโต๊ะ", "จอภาพ", "เครื่องพิมพ์", "โปรเจคเตอร์", "สแกนเนอร์", "แท็บเล็ต",
+    "กล้องถ่ายรูป", "ลำโพง", "ไมโครโฟน", "Router", "Switch", "Access Point", "UPS", "Server",
+    "External HDD", "Webcam", "Headset", "Docking Station", "เครื่องสำรองไฟ",
+)
+MODELS = (
+    "Dell Latitude", "Lenovo ThinkPad", "HP ProBook", "Acer Aspire", "Asus VivoBook", "Apple MacBook",
+    "LG UltraFine", "Samsung Odyssey", "Epson EcoTank", "Canon PIXMA", "Brother HL", "Cisco Catalyst",
+    "TP-Link Archer", "APC Back-UPS", "Logitech", "Sony Alpha", "BenQ", "Ubiquiti UniFi",
+)
+ISSUES = (
+    "เปิดไม่ติด", "จอไม่แสดงผล", "แบตเตอรี่เสื่อม", "คีย์บอร์ดกดไม่ได้", "พิมพ์ไม่ออก", "กระดาษติด",
+    "เชื่อมต่อ Wi-Fi ไม่ได้", "เสียงไม่ออก", "เครื่องร้อนผิดปกติ", "หน้าจอแตก", "พัดลมเสียงดัง",
+)
+
+ASSET_STATUS_WEIGHTS = (("new", 45), ("in_use", 40), ("repair", 10), ("retired", 5))
+CHECKOUT_STATUS_WEIGHTS = (("returned", 70), ("rejected", 10), ("approved", 12), ("requested", 8))
+TICKET_STATUS_WEIGHTS = (("closed", 60), ("resolved", 10), ("in_progress", 10), ("open", 20))
+
+
+def parse_scale(value):
+    value = str(value).strip().lower()
+    if value in SCALES:
+        return SCALES[value]
+    n = int(value)
+    if n < 1:
+        raise ValueError("scale ต้องมากกว่า 0")
+    return n
+
+
+def _picker(rng, weights):
+    names = [n for n, _ in weights]
+    cum = [w for _, w in weights]
+    return lambda: rng.choices(names, cum)[0]
+
+
+def _chunks(rows, size=CHUNK):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def sizes(scale):
+    return {
+        "users": max(20, scale // 100),
+        "categories": len(CATEGORIES),
+        "locations": 40,
+        "assets": scale,
+        "checkouts": scale,
+        "tickets": max(1, scale // 2),
+    }
+
+
+# ======================
+# ROWS (generator ต่อตาราง ไม่สร้างทั้งก้อนในหน่วยความจำ)
+# ======================
+def _users(rng, n):
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "full_name": "ผู้ใช้ทดสอบ %d" % i,
+            "email": "bench%d@example.com" % i,
+            # ไม่ login ด้วยรหัสผ่าน (benchmark ใส่ session ตรง ๆ)
+            "password_hash": "-",
+            "role": "admin" if i == 1 else "staff",
+            "is_active": True,
+        }
+
+
+def _assets(rng, n, n_categories, n_locations):
+    status = _picker(rng, ASSET_STATUS_WEIGHTS)
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "asset_tag": "BENCH-%07d" % i,
+            "name": "%s %s %d" % (rng.choice(CATEGORIES), rng.choice(MODELS), rng.randrange(100, 999)),
+            "category_id": rng.randint(1, n_categories),
+            "location_id": rng.randint(1, n_locations),
+            "status": status(),
+        }
+
+
+def _checkouts(rng, n, n_assets, n_users, today):
+    status = _picker(rng, CHECKOUT_STATUS_WEIGHTS)
+    # ครุภัณฑ์ละไม่เกิน 1 checkout active: หยิบจากลำดับสุ่มโดยไม่ซ้ำ
+    free = list(range(1, n_assets + 1))
+    rng.shuffle(free)
+    for i in range(1, n + 1):
+        st = status()
+        if st in ("requested", "approved"):
+            if free:
+                asset_id = free.pop()
+            else:
+                st, asset_id = "returned", rng.randint(1, n_assets)
+        else:
+            asset_id = rng.randint(1, n_assets)
+        start = today - timedelta(days=rng.randint(0, 365))
+        due = start + timedelta(days=rng.randint(3, 30))
+        returned = min(start + timedelta(days=rng.randint(1, 40)), today) if st == "returned" else None
+        approved = st in ("approved", "returned")
+        yield {
+            "id": i,
+            "asset_id": asset_id,
+            "borrower_id": rng.randint(1, n_users),
+            "checkout_date": start,
+            "due_date": due,
+            "return_date": returned,
+            "status": st,
+            "approved_by": 1 if approved else None,
+            "approved_at": datetime.combine(start, datetime.min.time()) + timedelta(hours=9) if approved else None,
+        }
+
+
+def _tickets(rng, n, n_assets, n_users, now):
+    status = _picker(rng, TICKET_STATUS_WEIGHTS)
+    for i in range(1, n + 1):
+        yield {
+            "id": i,
+            "asset_id": rng.randint(1, n_assets),
+            "requester_id": rng.randint(1, n_users),
+            "issue": rng.choice(ISSUES),
+            "status": status(),
+            "created_at": now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+        }
+
+
+# ======================
+# GENERATE
+# ======================
+def dataset_key(scale, seed):
+    return "%d:%d" % (scale, seed)
+
+
+def is_seeded(scale, seed):
+    """ฐานข้อมูลนี้มีข้อมูลของ (scale, seed) ครบแล้วหรือยัง (ใช้ซ้ำได้โดยไม่ต้องสร้างใหม่)"""
+    from sqlalchemy import inspect
+    from extensions import db
+    from services.marks import get_mark
+
+    if not inspect(db.engine).has_table("sync_marks"):
+        return False
+    value, _ = get_mark(MARK)
+    return value == dataset_key(scale, seed)
+
+
+def generate(scale, seed=42, today=None, log=print):
+    """ล้างตารางแล้วสร้างข้อมูลใหม่ (ต้องอยู่ใน app context) คืนจำนวนแถวต่อตาราง"""
+    from sqlalchemy import insert, text
+    from extensions import db
+    from models import Asset, Category, Checkout, Location, Ticket, User
+    from services import analytics, overdue
+    from services.marks import set_mark
+    from services.search import get_backend, trigram_metadata
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    now = datetime.combine(today, datetime.min.time()) + timedelta(hours=12)
+    n = sizes(scale)
+
+    db.drop_all()
+    db.create_all()
+    if db.engine.dialect.name == "sqlite":
+        # create_all ไม่ผ่าน migration -> สร้างตาราง trigram เอง แล้ว rebuild() ด้านล่าง backfill
+        trigram_metadata.create_all(db.engine)
+
+    def load(model, rows, label):
+        t0 = time.perf_counter()
+        count = 0
+        for chunk in _chunks(rows):
+            db.session.execute(insert(model), chunk)
+            db.session.commit()
+            count += len(chunk)
+        log("  %-11s %9d rows  %6.1fs" % (label, count, time.perf_counter() - t0))
+
+    load(User, _users(rng, n["users"]), "users")
+    load(Category, ({"id": i, "name": name} for i, name in enumerate(CATEGORIES, 1)), "categories")
+    load(Location, ({"id": i, "building": "อาคาร %d" % ((i - 1) // 10 + 1), "room": "ห้อง %d" % i}
+                    for i in range(1, n["locations"] + 1)), "locations")
+    load(Asset, _assets(rng, n["assets"], n["categories"], n["locations"]), "assets")
+    load(Checkout, _checkouts(rng, n["checkouts"], n["assets"], n["users"], today), "checkouts")
+    load(Ticket, _tickets(rng, n["tickets"], n["assets"], n["users"], now), "tickets")
+
+    # สิ่งที่หน้าเว็บอ่านนอกเหนือจากตารางหลัก
+    t0 = time.perf_counter()
+    get_backend().rebuild()
+    analytics.refresh(today)
+    overdue.scan(today)
+    log("  derived     search index / analytics rollup / overdue  %6.1fs" % (time.perf_counter() - t0))
+
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        db.session.execute(text("ANALYZE"))
+    elif dialect == "mysql":
+        db.session.execute(text("ANALYZE TABLE users, categories, locations, assets, checkouts, tickets"))
+    set_mark(MARK, dataset_key(scale, seed))
+    db.session.commit()
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="สร้างข้อมูลสังเคราะห์สำหรับ benchmark")
+    parser.add_argument("--scale", default="1k", help="1k / 10k / 100k / 1m หรือจำนวนครุภัณฑ์")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", required=True, help="ตารางทั้งหมดจะถูก drop/create ใหม่!")
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, ROOT)
+    from app import create_app
+
+    scale = parse_scale(args.scale)
+    app = create_app()
+    with app.app_context():
+        generate(scale, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# blueprints/api/resources.py
+# ======================
+# นิยาม resource ของ /api/v1
+# ======================
+# แต่ละ resource บอกว่า
+#   fields   : ชื่อ field ที่ client ขอได้ -> คอลัมน์ (+ join ที่ต้องใช้)
+#   computed : field คำนวณจากคอลัมน์อื่น (status_th / status_badge) ไม่ต้อง SELECT เพิ่ม
+#   filters  : query parameter -> คอลัมน์ที่มี index
+# เลือกเฉพาะคอลัมน์ที่ถูกขอ แล้วแปลง row tuple เป็น dict ตรง ๆ ไม่สร้าง ORM object
+from models import (
+    Asset, AuditLog, Category, Location, Checkout, Ticket, TicketLog, User,
+    ASSET_STATUSES, CHECKOUT_STATUSES, TICKET_STATUSES,
+    ASSET_STATUS_LABELS, CHECKOUT_STATUS_LABELS, TICKET_STATUS_LABELS,
+    STATUS_BADGE_CLASS,
+)
+
+
+class Resource:
+    def __init__(self, name, base, key, fields, default_fields, joins=None,
+                 filters=None, statuses=None, labels=None, descending=True):
+        self.name = name
+        self.base = base
+        self.key = key
+        self.fields = fields
+        self.default_fields = default_fields
+        self.joins = joins or {}
+        self.filters = filters or {}
+        self.statuses = statuses
+        self.labels = labels
+        self.descending = descending
+
+    @property
+    def computed(self):
+        if self.labels is None:
+            return {}
+        return {
+            "status_th": lambda status: self.labels.get(status, status),
+            "status_badge": lambda status: STATUS_BADGE_CLASS.get(status, "pill-muted"),
+        }
+
+    def available(self):
+        return list(self.fields) + list(self.computed)
+
+
+def _int(value):
+    return int(value)
+
+
+RESOURCES = {}
+
+
+def register(resource):
+    RESOURCES[resource.name] = resource
+    return resource
+
+
+# ======================
+# assets
+# ======================
+register(Resource(
+    "assets",
+    base=Asset,
+    key=Asset.id,
+    fields={
+        "id": (Asset.id, None),
+        "asset_tag": (Asset.asset_tag, None),
+        "name": (Asset.name, None),
+        "status": (Asset.status, None),
+        "category_id": (Asset.category_id, None),
+        "category": (Category.name, "category"),
+        "location_id": (Asset.location_id, None),
+        "building": (Location.building, "location"),
+        "room": (Location.room, "location"),
+        "created_at": (Asset.created_at, None),
+    },
+    default_fields=("id", "asset_tag", "name", "status"),
+    joins={
+        "category": (Category, Asset.category_id == Category.id),
+        "location": (Location, Asset.location_id == Location.id),
+    },
+    filters={
+        # uq_assets_asset_tag / idx_assets_status / idx_assets_category_id / idx_assets_location_id
+        "asset_tag": (Asset.asset_tag, str),
+        "status": (Asset.status, str),
+        "category_id": (Asset.category_id, _int),
+        "location_id": (Asset.location_id, _int),
+    },
+    statuses=ASSET_STATUSES,
+    labels=ASSET_STATUS_LABELS,
+))
+
+# ======================
+# checkouts
+# ======================
+register(Resource(
+    "checkouts",
+    base=Checkout,
+    key=Checkout.id,
+    fields={
+        "id": (Checkout.id, None),
+        "asset_id": (Checkout.asset_id, None),
+        "asset_tag": (Asset.asset_tag, "asset"),
+        "asset_name": (Asset.name, "asset"),
+        "borrower_id": (Checkout.borrower_id, None),
+        "borrower_name": (User.full_name, "borrower"),
+        "checkout_date": (Checkout.checkout_date, None),
+        "due_date": (Checkout.due_date, None),
+        "return_date": (Checkout.return_date, None),
+        "status": (Checkout.status, None),
+        "approved_by": (Checkout.approved_by, None),
+        "approved_at": (Checkout.approved_at, None),
+        "version": (Checkout.version, None),
+    },
+    default_fields=("id", "asset_id", "borrower_id", "checkout_date", "due_date", "status"),
+    joins={
+        "asset": (Asset, Checkout.asset_id == Asset.id),
+        "borrower": (User, Checkout.borrower_id == User.id),
+    },
+    filters={
+        # idx_checkouts_status / idx_checkouts_asset / idx_checkouts_borrower
+        "status": (Checkout.status, str),
+        "asset_id": (Checkout.asset_id, _int),
+        "borrower_id": (Checkout.borrower_id, _int),
+    },
+    statuses=CHECKOUT_STATUSES,
+    labels=CHECKOUT_STATUS_LABELS,
+))
+
+# ======================
+# tickets
+# ======================
+register(Resource(
+    "tickets",
+    base=Ticket,
+    key=Ticket.id,
+    fields={
+        "id": (Ticket.id, None),
+        "asset_id": (Ticket.asset_id, None),
+        "asset_name": (Asset.name, "asset"),
+        "requester_id": (Ticket.requester_id, None),
+        "requester_name": (User.full_name, "requester"),
+        "issue": (Ticket.issue, None),
+        "status": (Ticket.status, None),
+        "created_at": (Ticket.created_at, None),
+        "version": (Ticket.version, None),
+    },
+    default_fields=("id", "asset_id", "issue", "status", "created_at"),
+    joins={
+        "asset": (Asset, Ticket.asset_id == Asset.id),
+        "requester": (User, Ticket.requester_id == User.id),
+    },
+    filters={
+        # idx_tickets_status_created / idx_tickets_asset / idx_tickets_requester
+        "status": (Ticket.status, str),
+        "asset_id": (Ticket.asset_id, _int),
+        "requester_id": (Ticket.requester_id, _int),
+    },
+    statuses=TICKET_STATUSES,
+    labels=TICKET_STATUS_LABELS,
+))
+
+# ======================
+# categories / locations (ตารางเล็ก เรียงตาม id)
+# ======================
+register(Resource(
+    "categories",
+    base=Category,
+    key=Category.id,
+    fields={
+        "id": (Category.id, None),
+        "name": (Category.name, None),
+    },
+    default_fields=("id", "name"),
+    descending=False,
+))
+
+register(Resource(
+    "locations",
+    base=Location,
+    key=Location.id,
+    fields={
+        "id": (Location.id, None),
+        "building": (Location.building, None),
+        "room": (Location.room, None),
+    },
+    default_fields=("id", "building", "room"),
+    filters={
+        # idx_locations_building_room (building เป็นคอลัมน์แรก)
+        "building": (Location.building, str),
+    },
+    descending=False,
+))
+
+
+# ======================
+# history (audit log ต่อ entity)
+# ======================
+# resource -> (ตาราง log, คอลัมน์ id ของ entity, เงื่อนไขเพิ่ม)
+#   tickets   : ticket_logs ผ่าน idx_ticket_logs_ticket
+#   checkouts : audit_logs ผ่าน idx_audit_logs_entity (entity_type, entity_id, id)
+HISTORY = {
+    "tickets": (TicketLog, TicketLog.ticket_id, ()),
+    "checkouts": (AuditLog, AuditLog.entity_id, (AuditLog.entity_type == "checkout",)),
+    "assets": (AuditLog, AuditLog.entity_id, (AuditLog.entity_type == "asset",)),
+}
@@ -0,0 +1,204 @@
+from datetime import date, datetime
+
+from flask import jsonify, request, url_for, abort
+from flask_login import current_user
+
+from extensions import db
+from services.pagination import paginate, get_page_size
+from . import api_bp
+from models import User
+from .resources import RESOURCES, HISTORY
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@api_bp.errorhandler(ApiError)
+def handle_api_error(e):
+    return jsonify(error=e.message), e.status
+
+
+@api_bp.before_request
+def require_login():
+    # API ตอบ 401 เป็น JSON แทนการ redirect ไปหน้า login
+    if not current_user.is_authenticated:
+        return jsonify(error="authentication required"), 401
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def parse_fields(resource):
+    raw = request.args.get("fields")
+    if not raw:
+        return list(resource.default_fields)
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in resource.fields and f not in resource.computed]
+    if unknown:
+        raise ApiError("unknown fields: %s (available: %s)" % (
+            ", ".join(unknown), ", ".join(resource.available())
+        ))
+    return fields
+
+
+def build_query(resource, fields):
+    # คอลัมน์ที่ต้อง SELECT = field ที่ขอ + id (cursor) + status (ถ้าขอ field คำนวณ)
+    needed = [f for f in fields if f in resource.fields]
+    if any(f in resource.computed for f in fields) and "status" not in needed:
+        needed.append("status")
+    if "id" not in needed:
+        needed.insert(0, "id")
+
+    columns = [resource.fields[f][0].label(f) for f in needed]
+    query = db.session.query(*columns).select_from(resource.base)
+
+    joined = []
+    for f in needed:
+        join = resource.fields[f][1]
+        if join and join not in joined:
+            target, onclause = resource.joins[join]
+            query = query.outerjoin(target, onclause)
+            joined.append(join)
+
+    for param, (col, convert) in resource.filters.items():
+        value = request.args.get(param)
+        if value is None or value == "":
+            continue
+        try:
+            value = convert(value)
+        except ValueError:
+            raise ApiError("invalid %s: %s" % (param, value))
+        if param == "status" and resource.statuses and value not in resource.statuses:
+            raise ApiError("invalid status: %s (allowed: %s)" % (value, ", ".join(resource.statuses)))
+        query = query.filter(col == value)
+    return query
+
+
+def serialize(rows, fields, resource):
+    computed = resource.computed
+    out = []
+    for row in rows:
+        values = row._mapping
+        item = {}
+        for f in fields:
+            if f in computed:
+                item[f] = computed[f](values["status"])
+            else:
+                item[f] = _json_value(values[f])
+        out.append(item)
+    return out
+
+
+@api_bp.route("/<resource_name>")
+def list_resource(resource_name):
+    resource = RESOURCES.get(resource_name)
+    if resource is None:
+        abort(404)
+
+    fields = parse_fields(resource)
+    page = paginate(
+        build_query(resource, fields),
+        [resource.key],
+        get_page_size(),
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+        descending=resource.descending,
+    )
+
+    args = request.args.to_dict()
+    links = {}
+    if page.next_cursor:
+        links["next"] = url_for("api.list_resource", resource_name=resource_name,
+                                **dict(args, after=page.next_cursor, before=None))
+    if page.prev_cursor:
+        links["prev"] = url_for("api.list_resource", resource_name=resource_name,
+                                **dict(args, before=page.prev_cursor, after=None))
+
+    return jsonify(
+        data=serialize(page.items, fields, resource),
+        meta={
+            "page_size": page.page_size,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        },
+        links=links,
+    )
+
+
+@api_bp.route("/<resource_name>/<int:item_id>/history")
+def history(resource_name, item_id):
+    """ประวัติเปลี่ยนสถานะของรายการเดียว ล่าสุดก่อน (cursor ตาม id ของ log)"""
+    if resource_name not in HISTORY:
+        abort(404)
+    log_model, entity_col, extra = HISTORY[resource_name]
+
+    query = (
+        db.session.query(
+            log_model.id,
+            log_model.old_status,
+            log_model.new_status,
+            log_model.note,
+            log_model.changed_by,
+            User.full_name.label("changed_by_name"),
+            log_model.changed_at,
+        )
+        .outerjoin(User, log_model.changed_by == User.id)
+        .filter(entity_col == item_id, *extra)
+    )
+    page = paginate(
+        query,
+        [log_model.id],
+        get_page_size(),
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+
+    labels = RESOURCES[resource_name].labels or {}
+    data = [
+        dict(
+            {k: _json_value(v) for k, v in row._mapping.items()},
+            old_status_th=labels.get(row.old_status, row.old_status),
+            new_status_th=labels.get(row.new_status, row.new_status),
+        )
+        for row in page.items
+    ]
+
+    args = request.args.to_dict()
+    links = {}
+    if page.next_cursor:
+        links["next"] = url_for("api.history", resource_name=resource_name, item_id=item_id,
+                                **dict(args, after=page.next_cursor, before=None))
+    if page.prev_cursor:
+        links["prev"] = url_for("api.history", resource_name=resource_name, item_id=item_id,
+                                **dict(args, before=page.prev_cursor, after=None))
+
+    return jsonify(
+        data=data,
+        meta={
+            "page_size": page.page_size,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        },
+        links=links,
+    )
+
+
+@api_bp.route("/")
+def index():
+    return jsonify(resources={
+        name: {
+            "url": url_for("api.list_resource", resource_name=name),
+            "fields": r.available(),
+            "default_fields": list(r.default_fields),
+            "filters": list(r.filters),
+            "history": name in HISTORY,
+        }
+        for name, r in RESOURCES.items()
+    })
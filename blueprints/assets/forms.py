@@ -1,4 +1,5 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, SelectField, SubmitField
 from wtforms.validators import DataRequired, Length
 
@@ -11,3 +12,7 @@ class AssetForm(FlaskForm):
     location_id = SelectField("สถานที่จัดเก็บ", coerce=int, validators=[DataRequired()])
     status = SelectField("สถานะ", choices=ASSET_STATUSES, validators=[DataRequired()])
     submit = SubmitField("บันทึก")
+
+class AssetImportForm(FlaskForm):
+    file = FileField("ไฟล์ CSV / XLSX", validators=[FileRequired(), FileAllowed(["csv", "xlsx"], "รองรับเฉพาะ .csv และ .xlsx")])
+    submit = SubmitField("นำเข้า")
@@ -1,14 +1,18 @@
 import csv
-from io import BytesIO, StringIO
-from datetime import datetime
-from flask import render_template, redirect, url_for, flash, request, Response, send_file
+import click
+from io import StringIO
+from flask import render_template, redirect, url_for, flash, request, Response, send_file, current_app, stream_with_context, jsonify, abort
 from flask_login import login_required, current_user
 from extensions import db
-from models import Asset, Category, Location
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from models import Asset, Category, Location, ASSET_STATUSES, ASSET_STATUS_LABELS
+from services.pagination import Page, paginate, get_page_size, approximate_count
+from services.search import search_assets, search_asset_ids, typeahead
+from services import reports
+from services.http_cache import conditional
+from services.query_budget import query_budget
+from services.asset_import import import_assets, ImportFormatError
 from . import assets_bp
-from .forms import AssetForm
+from .forms import AssetForm, AssetImportForm
 
 def admin_required():
     if not current_user.is_authenticated or current_user.role != "admin":
@@ -16,16 +20,80 @@ def admin_required():
         return False
     return True
 
+def asset_filters():
+    """อ่าน filter จาก query string -> dict ที่ผ่านการตรวจแล้ว"""
+    status = request.args.get("status", "").strip()
+    return {
+        "q": request.args.get("q", "").strip(),
+        "status": status if status in ASSET_STATUSES else "",
+        "category_id": request.args.get("category_id", type=int),
+        "location_id": request.args.get("location_id", type=int),
+    }
+
+def apply_asset_filters(query, filters):
+    # status / category_id / location_id ใช้ idx_assets_status, idx_assets_category_id, idx_assets_location_id
+    if filters["status"]:
+        query = query.filter(Asset.status == filters["status"])
+    if filters["category_id"]:
+        query = query.filter(Asset.category_id == filters["category_id"])
+    if filters["location_id"]:
+        query = query.filter(Asset.location_id == filters["location_id"])
+    return query
+
 @assets_bp.route("/")
 @login_required
+@conditional("assets", "categories", "locations")
 def list_assets():
-    q = request.args.get("q", "").strip()
-    query = Asset.query
-    if q:
-        like = "%" + q + "%"
-        query = query.filter(db.or_(Asset.asset_tag.like(like), Asset.name.like(like)))
-    assets = query.order_by(Asset.id.desc()).all()
-    return render_template("assets_list.html", assets=assets, q=q)
+    filters = asset_filters()
+    query = apply_asset_filters(Asset.query, filters)
+    page_size = get_page_size("ASSETS_PAGE_SIZE")
+
+    if filters["q"]:
+        # ผลค้นหาเรียงตาม relevance -> แสดง top-N ไม่ใช้ cursor
+        results = search_assets(filters["q"], query, limit=page_size)
+        page = Page(items=[a for a, _ in results], page_size=page_size)
+    else:
+        page = paginate(
+            query,
+            [Asset.id],
+            page_size=page_size,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+        )
+
+    if request.args.get("count") == "1" and not filters["q"]:
+        page.total, page.total_is_estimate = approximate_count(
+            query, Asset.__tablename__, filtered=any(filters.values())
+        )
+
+    categories = Category.query.order_by(Category.name).all()
+    locations = Location.query.order_by(Location.building, Location.room).all()
+
+    return render_template(
+        "assets_list.html",
+        assets=page.items,
+        page=page,
+        filters=filters,
+        q=filters["q"],
+        statuses=ASSET_STATUSES,
+        status_labels=ASSET_STATUS_LABELS,
+        categories=categories,
+        locations=locations,
+    )
+
+@assets_bp.route("/lookup")
+@login_required
+def lookup_assets():
+    """typeahead ของฟอร์มขอเบิก / แจ้งซ่อม: ?q=prefix&limit=20&mode=checkout|ticket"""
+    limit = max(1, min(request.args.get("limit", type=int) or current_app.config["TYPEAHEAD_LIMIT"], 50))
+    # แจ้งซ่อมได้แม้ครุภัณฑ์ถูกยืมอยู่ (ผู้ยืมเป็นคนแจ้ง) -> ตัดแค่ retired
+    mode = request.args.get("mode", "checkout")
+    rows = typeahead(request.args.get("q", ""), limit, exclude_checked_out=(mode != "ticket"))
+    return jsonify(results=[
+        {"id": r.id, "asset_tag": r.asset_tag, "name": r.name, "status": r.status,
+         "status_th": ASSET_STATUS_LABELS.get(r.status, r.status)}
+        for r in rows
+    ])
 
 @assets_bp.route("/create", methods=["GET", "POST"])
 @login_required
@@ -98,68 +166,163 @@ def delete_asset(asset_id):
     flash("ลบครุภัณฑ์แล้ว", "info")
     return redirect(url_for("assets.list_assets"))
 
+# ======================
+# BULK IMPORT
+# ======================
+@assets_bp.route("/import", methods=["GET", "POST"])
+@login_required
+@query_budget(None)
+def import_assets_view():
+    if not admin_required():
+        return redirect(url_for("assets.list_assets"))
+
+    form = AssetImportForm()
+    report = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            report = import_assets(upload.stream, upload.filename, created_by=current_user.id).as_dict()
+        except ImportFormatError as e:
+            flash(str(e), "danger")
+        else:
+            if report["aborted"]:
+                flash("หยุดนำเข้า: %s — บันทึกแล้ว %d แถว%s" % (
+                    report["aborted"], report["inserted"],
+                    " (ถึงแถวที่ %d)" % report["committed_to"] if report["committed_to"] else "",
+                ), "danger")
+            else:
+                flash("นำเข้าสำเร็จ %d จาก %d แถว" % (report["inserted"], report["total"]),
+                      "success" if not report["failed"] else "warning")
+
+    if request.args.get("format") == "json" and report is not None:
+        return jsonify(report)
+    return render_template("asset_import.html", form=form, report=report)
+
+
+@assets_bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", type=int, default=None, help="จำนวนแถวต่อ batch")
+@click.option("--created-by", type=int, default=None, help="users.id ของผู้นำเข้า")
+def import_assets_command(path, batch_size, created_by):
+    """นำเข้าครุภัณฑ์จากไฟล์ CSV / XLSX"""
+    with open(path, "rb") as f:
+        try:
+            report = import_assets(f, path, created_by=created_by, batch_size=batch_size)
+        except ImportFormatError as e:
+            raise click.ClickException(str(e))
+
+    click.echo("inserted %d / %d rows, %d failed" % (report.inserted, report.total, report.error_count))
+    for err in report.errors:
+        click.echo("  row %(row)s [%(asset_tag)s]: %(error)s" % err)
+    if report.error_count > len(report.errors):
+        click.echo("  ... และอีก %d แถว" % (report.error_count - len(report.errors)))
+    if report.aborted:
+        raise click.ClickException("หยุดนำเข้า: %s (commit แล้วถึงแถวที่ %s)" % (report.aborted, report.committed_to or "-"))
+
+def export_rows_query(filters):
+    """query เดียวแบบ join (ไม่มี lazy load ต่อแถว) สำหรับ export"""
+    stmt = (
+        db.select(
+            Asset.id,
+            Asset.asset_tag,
+            Asset.name,
+            Category.name.label("category"),
+            Location.building,
+            Location.room,
+            Asset.status,
+        )
+        .join(Category, Asset.category_id == Category.id)
+        .join(Location, Asset.location_id == Location.id)
+        .order_by(Asset.id.asc())
+    )
+    stmt = apply_asset_filters(stmt, filters)
+    if filters["q"]:
+        ids = search_asset_ids(filters["q"], limit=current_app.config["EXPORT_SEARCH_LIMIT"])
+        stmt = stmt.filter(Asset.id.in_(ids))
+    return stmt
+
+def stream_export_rows(filters):
+    # server-side cursor: ดึงทีละ batch ไม่โหลดทั้งตารางเข้า memory
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    stmt = export_rows_query(filters).execution_options(stream_results=True, yield_per=batch_size)
+    result = db.session.execute(stmt)
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
 @assets_bp.route("/export/csv")
 @login_required
+@conditional("assets", "categories", "locations")
 def export_csv():
-    assets = Asset.query.order_by(Asset.id.asc()).all()
+    filters = asset_filters()
 
-    sio = StringIO()
-    writer = csv.writer(sio)
-    writer.writerow(["id", "asset_tag", "name", "category", "location", "status"])
-    for a in assets:
-        writer.writerow([a.id, a.asset_tag, a.name, a.category.name, a.location.label, a.status])
+    def generate():
+        sio = StringIO()
+        writer = csv.writer(sio)
+
+        # BOM ให้ Excel อ่านภาษาไทยได้ (เหมือน utf-8-sig เดิม)
+        sio.write("\ufeff")
+        writer.writerow(["id", "asset_tag", "name", "category", "location", "status"])
+
+        for batch in stream_export_rows(filters):
+            for r in batch:
+                writer.writerow([r.id, r.asset_tag, r.name, r.category, r.building + " / " + r.room, r.status])
+            yield sio.getvalue().encode("utf-8")
+            sio.seek(0)
+            sio.truncate(0)
+
+        if sio.tell():
+            yield sio.getvalue().encode("utf-8")
 
-    output = sio.getvalue().encode("utf-8-sig")
     return Response(
-        output,
+        stream_with_context(generate()),
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment; filename=assets.csv"}
     )
 
-@assets_bp.route("/export/pdf")
+def job_payload(job):
+    payload = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "cached": job["cached"],
+        "error": job["error"],
+        "status_url": url_for("assets.pdf_job_status", job_id=job["id"]),
+    }
+    if job["status"] == reports.JOB_DONE:
+        payload["download_url"] = url_for("assets.pdf_job_download", job_id=job["id"])
+    return payload
+
+@assets_bp.route("/export/pdf", methods=["GET", "POST"])
 @login_required
 def export_pdf():
-    assets = Asset.query.order_by(Asset.id.asc()).all()
-
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    y = height - 50
-    c.setFont("Helvetica", 14)
-    c.drawString(50, y, "IT Assets Report")
-    y -= 20
-
-    c.setFont("Helvetica", 10)
-    c.drawString(50, y, "Generated: " + datetime.now().strftime("%Y-%m-%d %H:%M"))
-    y -= 25
-
-    c.setFont("Helvetica", 9)
-    c.drawString(50, y, "id")
-    c.drawString(80, y, "asset_tag")
-    c.drawString(160, y, "name")
-    c.drawString(330, y, "category")
-    c.drawString(420, y, "status")
-    y -= 15
-
-    for a in assets:
-        if y < 60:
-            c.showPage()
-            y = height - 50
-            c.setFont("Helvetica", 9)
-
-        c.drawString(50, y, str(a.id))
-        c.drawString(80, y, a.asset_tag[:12])
-        c.drawString(160, y, a.name[:28])
-        c.drawString(330, y, a.category.name[:15])
-        c.drawString(420, y, a.status)
-        y -= 13
-
-    c.save()
-    buffer.seek(0)
-    return send_file(
-        buffer,
+    # render PDF ไม่ทำใน request แล้ว -> สร้าง job แล้วให้ client poll สถานะ
+    job_id = reports.submit_asset_report(asset_filters(), stream_export_rows)
+    return jsonify(job_payload(reports.get_job(job_id))), 202
+
+@assets_bp.route("/export/pdf/jobs/<job_id>")
+@login_required
+def pdf_job_status(job_id):
+    job = reports.get_job(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job_payload(job))
+
+@assets_bp.route("/export/pdf/jobs/<job_id>/download")
+@login_required
+def pdf_job_download(job_id):
+    job = reports.get_job(job_id)
+    if job is None or job["status"] != reports.JOB_DONE:
+        abort(404)
+    # ชื่อไฟล์ artifact คือ hash ของข้อมูล -> ใช้เป็น ETag ได้ตรง ๆ (send_file ตอบ 304 ให้เอง)
+    response = send_file(
+        reports.artifact_path(job),
         as_attachment=True,
         download_name="assets.pdf",
-        mimetype="application/pdf"
+        mimetype="application/pdf",
+        etag=job["artifact"].rsplit(".", 1)[0],
+        conditional=True
     )
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
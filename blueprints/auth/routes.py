@@ -1,7 +1,10 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify, abort, make_response
 from flask_login import login_user, logout_user, login_required, current_user
 from extensions import db
 from models import User
+from services.identity_cache import get_cache
+from services.passwords import HashingBusy, verify_password, get_hasher
+from services.rate_limit import login_limiters
 from . import auth_bp
 from .forms import LoginForm, RegisterForm, ForgotPasswordForm
 
@@ -15,16 +18,49 @@ def login():
 
     if login_form.validate_on_submit():
         email = login_form.email.data.strip().lower()
+        password = login_form.password.data
+
+        # ตัดก่อนแตะ DB / hash (กัน credential stuffing กิน CPU ทั้ง worker)
+        # bucket ของ email คืนให้เมื่อ login สำเร็จ -> นับจริงเฉพาะครั้งที่รหัสผิด
+        limiters = login_limiters()
+        for kind, key in (("ip", request.remote_addr or "-"), ("email", email)):
+            if not limiters[kind].hit(key):
+                wait = int(limiters[kind].retry_after(key)) + 1
+                flash("พยายามเข้าสู่ระบบบ่อยเกินไป กรุณารอ %d วินาที" % wait, "danger")
+                response = make_response(render_template("auth_double.html", login_form=login_form, register_form=register_form, mode="login"), 429)
+                response.headers["Retry-After"] = str(wait)
+                return response
+
         user = User.query.filter_by(email=email).first()
 
-        if not user or not user.check_password(login_form.password.data):
+        try:
+            ok = verify_password(user.password_hash if user else None, password)
+        except HashingBusy:
+            # ยังไม่ได้ตรวจรหัสผ่าน -> ไม่นับเป็นครั้งที่ผิด
+            limiters["email"].refund(email)
+            flash("ระบบกำลังยุ่ง กรุณาลองใหม่อีกครั้ง", "warning")
+            response = make_response(render_template("auth_double.html", login_form=login_form, register_form=register_form, mode="login"), 503)
+            response.headers["Retry-After"] = "2"
+            return response
+
+        if not ok:
             flash("อีเมลหรือรหัสผ่านไม่ถูกต้อง", "danger")
             return render_template("auth_double.html", login_form=login_form, register_form=register_form, mode="login")
 
+        limiters["email"].reset(email)
+
         if not user.is_active:
             flash("บัญชีถูกปิดใช้งาน", "danger")
             return render_template("auth_double.html", login_form=login_form, register_form=register_form, mode="login")
 
+        # พารามิเตอร์ hash เปลี่ยน -> hash ใหม่ด้วยรหัสผ่านที่เพิ่งตรวจผ่าน
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except HashingBusy:
+                pass
+
         login_user(user)
         flash("เข้าสู่ระบบสำเร็จ", "success")
         next_url = request.args.get("next")
@@ -54,7 +90,11 @@ def register():
             role="staff",
             is_active=True
         )
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except HashingBusy:
+            flash("ระบบกำลังยุ่ง กรุณาลองใหม่อีกครั้ง", "warning")
+            return render_template("auth_double.html", login_form=login_form, register_form=form, mode="register"), 503
         db.session.add(user)
         db.session.commit()
 
@@ -79,3 +119,23 @@ def logout():
     logout_user()
     flash("ออกจากระบบแล้ว", "info")
     return redirect(url_for("auth.login"))
+
+
+@auth_bp.route("/auth/identity-cache")
+@login_required
+def identity_cache_stats():
+    if current_user.role != "admin":
+        abort(403)
+    return jsonify(get_cache().stats())
+
+
+@auth_bp.route("/auth/login-metrics")
+@login_required
+def login_metrics():
+    if current_user.role != "admin":
+        abort(403)
+    limiters = login_limiters()
+    return jsonify(
+        hashing=get_hasher().stats(),
+        throttled={kind: limiter.rejected for kind, limiter in limiters.items()},
+    )
@@ -1,8 +1,14 @@
-from flask import Blueprint, render_template, request, redirect, url_for, abort
+from flask import Blueprint, render_template, request, redirect, url_for, abort, flash, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload, contains_eager
 from extensions import db
-from models import Checkout, Asset , User
-from datetime import date
+from models import Checkout, Asset , User, CHECKOUT_STATUSES, CHECKOUT_STATUS_LABELS, status_badges
+from services.checkout_batch import BatchError, parse_ids, parse_versions, request_assets, transition
+from services.state_machine import CHECKOUT_FLOW, ConflictError
+from services.http_cache import conditional
+from services.pagination import get_page_size, paginate
+from services.analytics import summary as usage_summary
+from datetime import datetime
 
 checkouts_bp = Blueprint("checkouts", __name__)
 
@@ -12,82 +18,157 @@ def admin_only():
 
 @checkouts_bp.route("/")
 @login_required
+@conditional("checkouts", "assets")
 def index():
-    checkouts = Checkout.query.order_by(Checkout.id.desc()).all()
-    return render_template("checkouts_list.html", checkouts=checkouts)
+    # template ใช้ c.asset.name -> โหลดมาพร้อมกันใน query เดียว
+    # ทีละหน้า (cursor ตาม id ใหม่สุดก่อน) แทนการโหลดทุก checkout
+    page = paginate(
+        Checkout.query.options(joinedload(Checkout.asset)),
+        [Checkout.id],
+        page_size=get_page_size(),
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+    return render_template(
+        "checkouts_list.html",
+        checkouts=page.items,
+        page=page,
+        badges=status_badges(CHECKOUT_STATUSES, CHECKOUT_STATUS_LABELS),
+    )
 
 @checkouts_bp.route("/history")
 @login_required
+@conditional("checkouts", "assets", "users", "sync_marks")
 def history():
-    history = (
+    query = (
         db.session.query(Checkout)
         .join(Asset)
         .join(User, Checkout.borrower_id == User.id)
+        .options(contains_eager(Checkout.asset), contains_eager(Checkout.borrower))
         .filter(Checkout.status.in_(["returned", "rejected", "approved"]))
-        .order_by(Checkout.id.desc())
-        .all()
+    )
+    # ทีละหน้า (cursor ตาม id) แทนการโหลดประวัติทั้งหมด
+    page = paginate(
+        query,
+        [Checkout.id],
+        page_size=get_page_size(),
+        after=request.args.get("after"),
+        before=request.args.get("before"),
     )
 
     return render_template(
         "history.html",
-        history=history
+        history=page.items,
+        page=page,
+        # สรุปตามหมวดหมู่จาก rollup รายวัน
+        usage=usage_summary(),
     )
 
+def wants_json():
+    return request.is_json or request.accept_mimetypes.best == "application/json"
+
+def due_date_arg():
+    # ฟอร์มส่งชื่อ return_date (วันที่คาดว่าจะคืน) = due_date ของ checkout
+    value = request.form.get("due_date") or request.form.get("return_date")
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise BatchError("รูปแบบวันที่ไม่ถูกต้อง")
+
 @checkouts_bp.route("/new", methods=["GET", "POST"])
 @login_required
 def new():
-    assets = Asset.query.all()
-
     if request.method == "POST":
-        asset_id = request.form.get("asset_id")
-        if not asset_id:
+        # เลือกได้หลายรายการ -> insert ทั้งหมดใน transaction เดียว
+        try:
+            asset_ids = parse_ids(request.form.getlist("asset_id"))
+            result = request_assets(asset_ids, current_user.id, due_date_arg())
+        except BatchError as e:
+            flash(str(e), "danger")
             return redirect(url_for("checkouts.new"))
 
-        # ✅ FIX ตัวจริงอยู่ตรงนี้
-        checkout = Checkout(
-            asset_id=asset_id,
-            borrower_id=current_user.id,   # <<< ห้าม NULL
-            checkout_date=date.today(),
-            status="requested"
-        )
-
-        db.session.add(checkout)
-        db.session.commit()
-
-        return redirect(url_for("checkouts.index"))
+        if result["skipped"]:
+            flash("ไม่พบครุภัณฑ์ %d รายการ" % len(result["skipped"]), "warning")
+        if result["busy"]:
+            flash("ข้าม %d รายการที่มีผู้ขอเบิก/ยืมอยู่แล้ว" % len(result["busy"]), "warning")
+        if result["created"]:
+            flash("ส่งคำขอเบิก %d รายการแล้ว" % len(result["created"]), "success")
+            return redirect(url_for("checkouts.index"))
+        # ไม่มีรายการไหนสร้างได้ -> กลับไปเลือกใหม่พร้อมคำเตือน
+        return render_template("checkout_form.html", checkout=None)
 
+    # ตัวเลือกครุภัณฑ์โหลดทีละส่วนผ่าน assets.lookup_assets (typeahead)
     return render_template(
         "checkout_form.html",
-          assets=assets,
           checkout=None
           )
 
+# =====================================================
+# ADMIN: อนุมัติ / ปฏิเสธ / คืน (ทีละรายการหรือหลายรายการ)
+# =====================================================
+def single_transition(action, id):
+    admin_only()
+    # version ที่เห็นตอนโหลดหน้า (hidden input) -> ถ้ามีคนแก้ไปก่อน ได้ 409 แทนการทับ
+    payload = request.get_json(silent=True) or {}
+    seen = request.form.get("version") or payload.get("version")
+    try:
+        versions = parse_versions({id: seen} if seen else None)
+    except BatchError as e:
+        abort(400, str(e))
+    result = transition(action, [id], current_user.id, versions,
+                        note=request.form.get("note") or payload.get("note"))
+    skipped = result["skipped"]
+    if skipped and skipped[0]["status"] is None:
+        abort(404)
+    if skipped:
+        raise ConflictError(
+            "รายการ #%d ถูกแก้ไขโดยผู้อื่นแล้ว (สถานะปัจจุบัน: %s)" % (id, CHECKOUT_STATUS_LABELS.get(skipped[0]["status"])),
+            skipped,
+        )
+    if wants_json():
+        return jsonify(result)
+    return redirect(url_for("checkouts.index"))
+
 @checkouts_bp.route("/<int:id>/approve", methods=["POST"])
 @login_required
 def approve(id):
-    admin_only()
-    checkout = Checkout.query.get_or_404(id)
-    checkout.status = "approved"
-    checkout.approved_by = current_user.id
-    checkout.approved_at = date.today()
-    db.session.commit()
-    return redirect(url_for("checkouts.index"))
+    return single_transition("approve", id)
 
 @checkouts_bp.route("/<int:id>/reject", methods=["POST"])
 @login_required
 def reject(id):
-    admin_only()
-    checkout = Checkout.query.get_or_404(id)
-    checkout.status = "rejected"
-    db.session.commit()
-    return redirect(url_for("checkouts.index"))
+    return single_transition("reject", id)
 
 @checkouts_bp.route("/<int:id>/return", methods=["POST"])
 @login_required
 def return_asset(id):
+    return single_transition("return", id)
+
+@checkouts_bp.route("/batch/<action>", methods=["POST"])
+@login_required
+def batch(action):
     admin_only()
-    checkout = Checkout.query.get_or_404(id)
-    checkout.status = "returned"
-    checkout.return_date = date.today()
-    db.session.commit()
+    if action not in CHECKOUT_FLOW:
+        abort(404)
+    payload = (request.get_json(silent=True) or {}) if request.is_json else {}
+    raw = payload.get("ids", []) if request.is_json else request.form.getlist("ids")
+    try:
+        # JSON: {"ids": [...], "versions": {"id": version}, "note": "..."} (versions / note ไม่บังคับ)
+        result = transition(action, parse_ids(raw), current_user.id, parse_versions(payload.get("versions")),
+                            note=payload.get("note") or request.form.get("note"))
+    except BatchError as e:
+        if wants_json():
+            return jsonify(error=str(e)), 400
+        flash(str(e), "danger")
+        return redirect(url_for("checkouts.index"))
+
+    if wants_json():
+        return jsonify(result)
+    flash("ดำเนินการ %d รายการ" % len(result["changed"]), "success")
+    if result["skipped"]:
+        flash("ข้าม %d รายการที่ถูกเปลี่ยนสถานะไปแล้ว: %s" % (
+            len(result["skipped"]), ", ".join("#%d" % s["id"] for s in result["skipped"])
+        ), "warning")
     return redirect(url_for("checkouts.index"))
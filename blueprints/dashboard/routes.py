@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request
 from flask_login import login_required
-from extensions import db
-from models import Asset, Checkout
+from sqlalchemy.orm import joinedload
+from models import Checkout, CHECKOUT_STATUSES, CHECKOUT_STATUS_LABELS, status_badges
+from services.dashboard_metrics import get_metrics
+from services.analytics import summary as usage_summary
+from services import live, overdue
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
@@ -9,31 +12,17 @@ dashboard_bp = Blueprint("dashboard", __name__)
 @login_required
 def index():
     # =====================
-    # ครุภัณฑ์ทั้งหมด
+    # สรุปสถานะทั้งหมด (query เดียว + cache)
     # =====================
-    total_assets = Asset.query.count()
+    metrics = get_metrics()
 
     # =====================
-    # กำลังใช้งาน
+    # รายการยืมที่ยังไม่คืน (ล่าสุด)
     # =====================
-    in_use_assets = Checkout.query.filter_by(status="borrowed").count()
-
-    # =====================
-    # แจ้งซ่อม (ใช้ SQL ตรง ไม่แตะ user_id)
-    # =====================
-    open_tickets = db.session.execute(
-        db.text("""
-            SELECT COUNT(*) 
-            FROM tickets 
-            WHERE status = 'open'
-        """)
-    ).scalar()
-
-    # =====================
-    # รายการยืมล่าสุด
-    # =====================
-    recent_checkouts = (
+    recent_unreturned = (
         Checkout.query
+        .options(joinedload(Checkout.asset), joinedload(Checkout.borrower))
+        .filter(Checkout.status.in_(["requested", "approved"]))
         .order_by(Checkout.id.desc())
         .limit(5)
         .all()
@@ -41,8 +30,29 @@ def index():
 
     return render_template(
         "dashboard.html",
-        total_assets=total_assets,
-        in_use_assets=in_use_assets,
-        open_tickets=open_tickets,
-        recent_checkouts=recent_checkouts
+        total_assets=metrics["totals"]["assets"],
+        # กำลังใช้งาน = รายการยืมที่อนุมัติแล้วและยังไม่คืน
+        in_use_assets=metrics["checkouts"]["approved"],
+        open_tickets=metrics["tickets"]["open"],
+        status_summary=metrics["assets"],
+        checkout_summary=metrics["checkouts"],
+        ticket_summary=metrics["tickets"],
+        recent_unreturned=recent_unreturned,
+        # loan เลยกำหนด (ตารางที่ scheduler เติม ไม่ scan checkouts)
+        overdue_count=overdue.count(),
+        most_overdue=overdue.most_overdue(),
+        # utilization จาก rollup รายวัน (ไม่แตะ checkouts)
+        usage=usage_summary(),
+        # badge ของแต่ละสถานะ ให้หน้า live เปลี่ยนแถวได้เอง
+        checkout_badges=status_badges(CHECKOUT_STATUSES, CHECKOUT_STATUS_LABELS),
     )
+
+
+@dashboard_bp.route("/live")
+@login_required
+def live_stream():
+    # Server-Sent Events ของ dashboard / checkouts / tickets (ดู services/live.py)
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+    if last_event_id is None:
+        last_event_id = request.args.get("last_event_id", type=int)
+    return live.response(last_event_id)
@@ -1,28 +1,64 @@
-from flask import Blueprint, render_template, request, redirect, url_for, abort
+from flask import Blueprint, render_template, request, redirect, url_for, abort, flash
 from flask_login import login_required, current_user
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 from extensions import db
+from models import Asset, Ticket, User, TICKET_STATUSES, TICKET_STATUS_LABELS, status_badges
+from services import live
+from services.http_cache import conditional
+from services.pagination import get_page_size, paginate
+from services.state_machine import TICKET_FLOW, ConflictError, guarded_update, with_retry
 
 tickets_bp = Blueprint("tickets", __name__, url_prefix="/tickets")
 
+# งานที่ยังค้าง: เก่าสุดขึ้นก่อน (ทำตามคิว) / งานที่จบแล้ว: ล่าสุดขึ้นก่อน
+QUEUE_STATUSES = ("open", "in_progress")
+
+
+def status_counts():
+    """จำนวนงานทุกสถานะใน query เดียว (GROUP BY บน idx_tickets_status_created)"""
+    counts = dict.fromkeys(TICKET_STATUSES, 0)
+    counts.update(db.session.execute(
+        db.select(Ticket.status, func.count()).group_by(Ticket.status)
+    ).all())
+    return counts
+
 
 @tickets_bp.route("/", methods=["GET"])
 @login_required
+@conditional("tickets", "assets", "users")
 def list_tickets():
-    sql = """
-        SELECT
-            t.id,
-            a.name AS asset_name,
-            t.issue,
-            t.status
-        FROM tickets t
-        LEFT JOIN assets a ON a.id = t.asset_id
-        ORDER BY t.id DESC
-    """
-    tickets = db.session.execute(db.text(sql)).fetchall()
+    status = request.args.get("status", "open")
+    if status not in TICKET_STATUSES:
+        status = "open"
+
+    # อ่านเฉพาะช่วง index ของสถานะนี้ (ไม่แตะงานที่ปิดไปแล้วหลายหมื่นรายการ)
+    query = (
+        Ticket.query
+        .join(Asset, Ticket.asset_id == Asset.id)
+        .join(User, Ticket.requester_id == User.id)
+        .options(contains_eager(Ticket.asset), contains_eager(Ticket.requester))
+        .filter(Ticket.status == status)
+    )
+    page = paginate(
+        query,
+        [Ticket.status, Ticket.created_at, Ticket.id],
+        page_size=get_page_size("TICKETS_PAGE_SIZE"),
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+        descending=status not in QUEUE_STATUSES,
+    )
 
     return render_template(
         "tickets_list.html",
-        tickets=tickets
+        tickets=page.items,
+        page=page,
+        status=status,
+        statuses=TICKET_STATUSES,
+        status_labels=TICKET_STATUS_LABELS,
+        badges=status_badges(TICKET_STATUSES, TICKET_STATUS_LABELS),
+        counts=status_counts(),
+        close_from=TICKET_FLOW.sources("close"),
     )
 
 
@@ -30,33 +66,23 @@ def list_tickets():
 @login_required
 def create_ticket():
     if request.method == "POST":
-        asset_id = request.form.get("asset_id")
-        issue = request.form.get("issue")
-
-        sql = """
-            INSERT INTO tickets (asset_id, requester_id, issue, status)
-            VALUES (:asset_id, :requester_id, :issue, 'open')
-        """
-        db.session.execute(
-            db.text(sql),
-            {
-                "asset_id": asset_id,
-                "requester_id": current_user.id,
-                "issue": issue
-            }
-        )
+        asset_id = request.form.get("asset_id", type=int)
+        issue = (request.form.get("issue") or "").strip()
+        if not asset_id or not issue or db.session.get(Asset, asset_id) is None:
+            flash("กรุณาเลือกครุภัณฑ์และระบุอาการ", "danger")
+            return render_template("ticket_form.html"), 400
+
+        ticket = Ticket(asset_id=asset_id, requester_id=current_user.id, issue=issue, status="open")
+        db.session.add(ticket)
+        db.session.flush()
+        # หน้า live: แจ้งว่ามีเรื่องใหม่ (เขียนพร้อม commit นี้)
+        live.publish("ticket", "open", [{"id": ticket.id, "status": "open", "version": ticket.version, "from": None}])
         db.session.commit()
 
         return redirect(url_for("tickets.list_tickets"))
 
-    assets = db.session.execute(
-        db.text("SELECT id, name FROM assets ORDER BY name")
-    ).fetchall()
-
-    return render_template(
-        "ticket_form.html",
-        assets=assets
-    )
+    # ตัวเลือกครุภัณฑ์โหลดทีละส่วนผ่าน assets.lookup_assets (typeahead)
+    return render_template("ticket_form.html")
 
 
 # =====================================================
@@ -69,15 +95,24 @@ def close_ticket(ticket_id):
     if current_user.role != "admin":
         abort(403)
 
-    sql = """
-        UPDATE tickets
-        SET status = 'closed'
-        WHERE id = :ticket_id
-    """
-    db.session.execute(
-        db.text(sql),
-        {"ticket_id": ticket_id}
-    )
-    db.session.commit()
+    # ปิดได้เฉพาะจากสถานะที่ TICKET_FLOW อนุญาต และ version ต้องตรงกับที่เห็นในหน้า
+    seen = request.form.get("version", type=int)
+    versions = {ticket_id: seen} if seen is not None else None
+
+    def close():
+        result = guarded_update(Ticket, TICKET_FLOW, "close", [ticket_id], versions=versions,
+                                actor_id=current_user.id, note=request.form.get("note"))
+        db.session.commit()
+        return result
+
+    result = with_retry(close)
+    skipped = result["skipped"]
+    if skipped and skipped[0]["status"] is None:
+        abort(404)
+    if skipped:
+        raise ConflictError(
+            "งานแจ้งซ่อม #%d ถูกแก้ไขโดยผู้อื่นแล้ว (สถานะปัจจุบัน: %s)" % (ticket_id, TICKET_STATUS_LABELS.get(skipped[0]["status"])),
+            skipped,
+        )
 
     return redirect(url_for("tickets.list_tickets"))
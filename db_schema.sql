@@ -95,6 +95,8 @@ CREATE TABLE assets (
 CREATE INDEX idx_assets_status ON assets(status);
 CREATE INDEX idx_assets_category_id ON assets(category_id);
 CREATE INDEX idx_assets_location_id ON assets(location_id);
+-- ค้นหาชื่อครุภัณฑ์ (ไทย/อังกฤษ) ด้วย ngram parser
+CREATE FULLTEXT INDEX ft_assets_name ON assets(name) WITH PARSER ngram;
 
 -- ======================
 -- checkouts
@@ -1,8 +1,10 @@
 # extensions.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from services.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession: GET ไป replica (ถ้ามี), การเขียนไป primary
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 
 # ❌ ลบ CSRFProtect ออกทั้งหมด
@@ -0,0 +1,42 @@
+# gunicorn.conf.py
+# ใช้: gunicorn -c gunicorn.conf.py wsgi:app
+import os
+
+bind = "0.0.0.0:" + os.environ.get("PORT", "8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+# gthread: หน้า live (SSE) ถือการเชื่อมต่อค้างไว้ ต้องไม่กิน worker ทั้งตัว
+# (จำนวน stream ต่อ worker จำกัดด้วย LIVE_MAX_CLIENTS ให้เหลือ thread ไว้เสิร์ฟ request ปกติ)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# โหลด app ครั้งเดียวใน master แล้ว fork (create_app ไม่เปิด connection DB)
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    if preload_app:
+        from app import warm_up
+        from wsgi import app
+        warm_up(app)
+
+
+def post_fork(server, worker):
+    # กันไว้: ถ้า master เคยเปิด connection ไว้ อย่าให้ worker ใช้ socket ร่วมกัน
+    from extensions import db
+    from wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # thread ของ scheduler ต้องเริ่มใน worker (ทุก worker แย่ง leader lease กัน รันจริงแค่ตัวเดียว)
+    app.extensions["scheduler"].start()
+
+
+def worker_exit(server, worker):
+    # เขียน audit event ที่ค้างในบัฟเฟอร์ให้หมดก่อน worker ปิด / คืน leader lease
+    # / ปิด process pool ของ PDF report (ไม่ทิ้ง process ลูกค้างหลัง worker ตาย)
+    from services import reports
+    from wsgi import app
+    app.extensions["audit_writer"].close()
+    app.extensions["scheduler"].stop()
+    reports.shutdown()
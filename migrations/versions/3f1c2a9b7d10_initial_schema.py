@@ -0,0 +1,188 @@
+"""initial schema (ตรงกับ db_schema.sql)
+
+Revision ID: 3f1c2a9b7d10
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+ฐานข้อมูลเดิมที่สร้างจาก db_schema.sql แล้ว ให้รัน
+    flask --app wsgi db stamp 3f1c2a9b7d10
+แทนการ upgrade
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_mysql = op.get_bind().dialect.name == "mysql"
+    now = sa.text("CURRENT_TIMESTAMP")
+
+    # ======================
+    # users
+    # ======================
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("full_name", sa.String(120), nullable=False),
+        sa.Column("email", sa.String(120), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("role", sa.String(20), nullable=False, server_default="staff"),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=now),
+        sa.Column(
+            "updated_at", sa.TIMESTAMP(), nullable=True,
+            server_default=sa.text("NULL ON UPDATE CURRENT_TIMESTAMP") if is_mysql else None,
+        ),
+        sa.UniqueConstraint("email", name="uq_users_email"),
+        sa.CheckConstraint("role IN ('admin','staff')", name="ck_users_role"),
+    )
+    op.create_index("idx_users_email", "users", ["email"])
+
+    # ======================
+    # categories / locations
+    # ======================
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(120), nullable=False),
+        sa.UniqueConstraint("name", name="uq_categories_name"),
+    )
+
+    op.create_table(
+        "locations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("building", sa.String(120), nullable=False),
+        sa.Column("room", sa.String(120), nullable=False),
+    )
+    op.create_index("idx_locations_building_room", "locations", ["building", "room"])
+
+    # ======================
+    # assets
+    # ======================
+    op.create_table(
+        "assets",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("asset_tag", sa.String(50), nullable=False),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="new"),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=now),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.UniqueConstraint("asset_tag", name="uq_assets_asset_tag"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], name="fk_assets_category",
+                                onupdate="CASCADE", ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["location_id"], ["locations.id"], name="fk_assets_location",
+                                onupdate="CASCADE", ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"], name="fk_assets_created_by",
+                                onupdate="CASCADE", ondelete="SET NULL"),
+        sa.CheckConstraint("status IN ('new','in_use','repair','retired')", name="ck_assets_status"),
+    )
+    op.create_index("idx_assets_status", "assets", ["status"])
+    op.create_index("idx_assets_category_id", "assets", ["category_id"])
+    op.create_index("idx_assets_location_id", "assets", ["location_id"])
+    if is_mysql:
+        op.create_index("ft_assets_name", "assets", ["name"],
+                        mysql_prefix="FULLTEXT", mysql_with_parser="ngram")
+
+    # ======================
+    # checkouts
+    # ======================
+    op.create_table(
+        "checkouts",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("borrower_id", sa.Integer(), nullable=False),
+        sa.Column("checkout_date", sa.Date(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("return_date", sa.Date(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="requested"),
+        sa.Column("approved_by", sa.Integer(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"], name="fk_checkouts_asset",
+                                onupdate="CASCADE", ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["borrower_id"], ["users.id"], name="fk_checkouts_borrower",
+                                onupdate="CASCADE", ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["approved_by"], ["users.id"], name="fk_checkouts_approved_by",
+                                onupdate="CASCADE", ondelete="SET NULL"),
+        sa.CheckConstraint("status IN ('requested','approved','returned','rejected')",
+                           name="ck_checkouts_status"),
+        sa.CheckConstraint("due_date IS NULL OR due_date >= checkout_date", name="ck_checkouts_due"),
+        sa.CheckConstraint("return_date IS NULL OR return_date >= checkout_date", name="ck_checkouts_return"),
+    )
+    op.create_index("idx_checkouts_asset", "checkouts", ["asset_id"])
+    op.create_index("idx_checkouts_borrower", "checkouts", ["borrower_id"])
+    op.create_index("idx_checkouts_status", "checkouts", ["status"])
+    op.create_index("idx_checkouts_dates", "checkouts", ["checkout_date", "due_date", "return_date"])
+
+    # ======================
+    # tickets
+    # ======================
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("requester_id", sa.Integer(), nullable=False),
+        sa.Column("issue", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="open"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=now),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"], name="fk_tickets_asset",
+                                onupdate="CASCADE", ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["requester_id"], ["users.id"], name="fk_tickets_requester",
+                                onupdate="CASCADE", ondelete="RESTRICT"),
+        sa.CheckConstraint("status IN ('open','in_progress','resolved','closed')", name="ck_tickets_status"),
+    )
+    op.create_index("idx_tickets_asset", "tickets", ["asset_id"])
+    op.create_index("idx_tickets_requester", "tickets", ["requester_id"])
+    op.create_index("idx_tickets_status", "tickets", ["status"])
+    op.create_index("idx_tickets_created_at", "tickets", ["created_at"])
+
+    # ======================
+    # ticket_logs
+    # ======================
+    op.create_table(
+        "ticket_logs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("ticket_id", sa.Integer(), nullable=False),
+        sa.Column("changed_by", sa.Integer(), nullable=True),
+        sa.Column("old_status", sa.String(20), nullable=False),
+        sa.Column("new_status", sa.String(20), nullable=False),
+        sa.Column("note", sa.String(255), nullable=True),
+        sa.Column("changed_at", sa.DateTime(), nullable=False, server_default=now),
+        sa.ForeignKeyConstraint(["ticket_id"], ["tickets.id"], name="fk_ticket_logs_ticket",
+                                onupdate="CASCADE", ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["changed_by"], ["users.id"], name="fk_ticket_logs_changed_by",
+                                onupdate="CASCADE", ondelete="SET NULL"),
+        sa.CheckConstraint("old_status IN ('open','in_progress','resolved','closed')", name="ck_ticket_logs_old"),
+        sa.CheckConstraint("new_status IN ('open','in_progress','resolved','closed')", name="ck_ticket_logs_new"),
+    )
+    op.create_index("idx_ticket_logs_ticket", "ticket_logs", ["ticket_id"])
+    op.create_index("idx_ticket_logs_changed_at", "ticket_logs", ["changed_at"])
+
+    # ======================
+    # seed (เหมือน db_schema.sql)
+    # ======================
+    categories = sa.table("categories", sa.column("name", sa.String))
+    op.bulk_insert(categories, [{"name": "Laptop"}, {"name": "Monitor"}, {"name": "Network"}])
+
+    locations = sa.table("locations", sa.column("building", sa.String), sa.column("room", sa.String))
+    op.bulk_insert(locations, [
+        {"building": "A", "room": "101"},
+        {"building": "A", "room": "IT-Store"},
+    ])
+
+
+def downgrade():
+    op.drop_table("ticket_logs")
+    op.drop_table("tickets")
+    op.drop_table("checkouts")
+    op.drop_table("assets")
+    op.drop_table("locations")
+    op.drop_table("categories")
+    op.drop_table("users")
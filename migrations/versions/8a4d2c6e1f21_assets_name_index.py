@@ -0,0 +1,23 @@
+"""index assets.name สำหรับ typeahead (prefix range scan)
+
+Revision ID: 8a4d2c6e1f21
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4d2c6e1f21'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("idx_assets_name", "assets", ["name"])
+
+
+def downgrade():
+    op.drop_index("idx_assets_name", table_name="assets")
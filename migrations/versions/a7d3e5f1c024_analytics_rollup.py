@@ -0,0 +1,60 @@
+"""analytics: asset_usage_daily rollup + analytics_checkout_state + sync_marks
+
+Revision ID: a7d3e5f1c024
+Revises: f4a6c2e9d815
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5f1c024'
+down_revision = 'f4a6c2e9d815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "asset_usage_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("asset_id", sa.Integer(), primary_key=True),
+        sa.Column("busy", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("overdue", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("started", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("returned", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("loan_days", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"], name="fk_asset_usage_daily_asset",
+                                onupdate="CASCADE", ondelete="CASCADE"),
+    )
+    op.create_index("idx_asset_usage_daily_asset", "asset_usage_daily", ["asset_id", "day"])
+
+    op.create_table(
+        "analytics_checkout_state",
+        sa.Column("checkout_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("asset_id", sa.Integer(), nullable=True),
+        sa.Column("start_day", sa.Date(), nullable=True),
+        sa.Column("end_day", sa.Date(), nullable=True),
+        sa.Column("due_day", sa.Date(), nullable=True),
+        sa.Column("returned_day", sa.Date(), nullable=True),
+        sa.Column("is_open", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.ForeignKeyConstraint(["checkout_id"], ["checkouts.id"], name="fk_analytics_state_checkout",
+                                onupdate="CASCADE", ondelete="CASCADE"),
+    )
+    op.create_index("idx_analytics_checkout_state_open", "analytics_checkout_state", ["is_open", "end_day"])
+
+    op.create_table(
+        "sync_marks",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("value", sa.String(64), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("sync_marks")
+    op.drop_table("analytics_checkout_state")
+    op.drop_table("asset_usage_daily")
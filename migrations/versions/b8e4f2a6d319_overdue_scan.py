@@ -0,0 +1,47 @@
+"""overdue loans: idx_checkouts_status_due + overdue_checkouts + scheduler_leases
+
+Revision ID: b8e4f2a6d319
+Revises: a7d3e5f1c024
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4f2a6d319'
+down_revision = 'a7d3e5f1c024'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("idx_checkouts_status_due", "checkouts", ["status", "due_date", "id"])
+
+    op.create_table(
+        "overdue_checkouts",
+        sa.Column("checkout_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("borrower_id", sa.Integer(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("detected_at", sa.DateTime(), nullable=False),
+        sa.Column("notified_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["checkout_id"], ["checkouts.id"], name="fk_overdue_checkouts_checkout",
+                                onupdate="CASCADE", ondelete="CASCADE"),
+    )
+    op.create_index("idx_overdue_checkouts_due", "overdue_checkouts", ["due_date", "checkout_id"])
+    op.create_index("idx_overdue_checkouts_borrower", "overdue_checkouts", ["borrower_id"])
+
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("owner", sa.String(128), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("scheduler_leases")
+    op.drop_table("overdue_checkouts")
+    op.drop_index("idx_checkouts_status_due", table_name="checkouts")
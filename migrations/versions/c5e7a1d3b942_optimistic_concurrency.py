@@ -0,0 +1,97 @@
+"""version column (optimistic concurrency) + checkout active ได้ครั้งละ 1 รายการต่อครุภัณฑ์
+
+Revision ID: c5e7a1d3b942
+Revises: 8a4d2c6e1f21
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+import logging
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e7a1d3b942'
+down_revision = '8a4d2c6e1f21'
+branch_labels = None
+depends_on = None
+
+ACTIVE = "CASE WHEN status IN ('requested','approved') THEN asset_id END"
+
+log = logging.getLogger("alembic.migration.c5e7a1d3b942")
+
+
+def _update(bind, stmt, ids, **params):
+    # ทีละชุด: IN (...) ยาวเกินไปไม่ได้ในบาง driver
+    for i in range(0, len(ids), 500):
+        bind.execute(stmt, dict(params, ids=ids[i:i + 500]))
+
+
+def _dedupe_active_checkouts(bind):
+    """
+    ข้อมูลเดิมอาจมี checkout active ซ้ำในครุภัณฑ์เดียวกัน (unique index ด้านล่างจะสร้างไม่ได้)
+      - approved หลายรายการ (อนุมัติซ้ำ): เก็บรายการล่าสุด (id มากสุด) ที่เหลือ -> returned
+      - requested ที่มี approved อยู่แล้ว หรือมี requested ที่เก่ากว่า -> rejected
+    ทุกแถวที่ถูกเปลี่ยนถูก log (id ของ checkout / ครุภัณฑ์) ให้ผู้ดูแลตรวจสอบย้อนหลังได้
+    """
+    surplus = bind.execute(sa.text("""
+        SELECT c.id, c.asset_id FROM checkouts c
+        WHERE c.status = 'approved'
+          AND EXISTS (SELECT 1 FROM checkouts o
+                      WHERE o.asset_id = c.asset_id AND o.status = 'approved' AND o.id > c.id)
+        ORDER BY c.asset_id, c.id
+    """)).all()
+    if surplus:
+        log.warning(
+            "checkouts approved more than once per asset: marking %d older rows returned "
+            "(checkout id -> asset id): %s",
+            len(surplus), ", ".join("%d->%d" % (r.id, r.asset_id) for r in surplus),
+        )
+        _update(
+            bind,
+            sa.text("UPDATE checkouts SET status = 'returned', return_date = COALESCE(return_date, :today) "
+                    "WHERE id IN :ids").bindparams(sa.bindparam("ids", expanding=True)),
+            [r.id for r in surplus],
+            today=date.today(),
+        )
+
+    duplicate = bind.execute(sa.text("""
+        SELECT c.id, c.asset_id FROM checkouts c
+        WHERE c.status = 'requested'
+          AND EXISTS (SELECT 1 FROM checkouts o
+                      WHERE o.asset_id = c.asset_id AND o.id <> c.id
+                        AND (o.status = 'approved' OR (o.status = 'requested' AND o.id < c.id)))
+        ORDER BY c.asset_id, c.id
+    """)).all()
+    if duplicate:
+        log.warning(
+            "duplicate pending checkout requests: marking %d rows rejected (checkout id -> asset id): %s",
+            len(duplicate), ", ".join("%d->%d" % (r.id, r.asset_id) for r in duplicate),
+        )
+        _update(
+            bind,
+            sa.text("UPDATE checkouts SET status = 'rejected' WHERE id IN :ids")
+            .bindparams(sa.bindparam("ids", expanding=True)),
+            [r.id for r in duplicate],
+        )
+
+
+def upgrade():
+    op.add_column("checkouts", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("tickets", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+    _dedupe_active_checkouts(op.get_bind())
+
+    op.add_column("checkouts", sa.Column("active_asset_id", sa.Integer(), sa.Computed(ACTIVE, persisted=False)))
+    op.create_index("uq_checkouts_active_asset", "checkouts", ["active_asset_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_checkouts_active_asset", table_name="checkouts")
+    with op.batch_alter_table("checkouts") as batch:
+        batch.drop_column("active_asset_id")
+        batch.drop_column("version")
+    with op.batch_alter_table("tickets") as batch:
+        batch.drop_column("version")
@@ -0,0 +1,32 @@
+"""live_events (relay ของ SSE ระหว่าง worker)
+
+Revision ID: d3c7a9e5b140
+Revises: b8e4f2a6d319
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3c7a9e5b140'
+down_revision = 'b8e4f2a6d319'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "live_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("action", sa.String(20), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("idx_live_events_created_at", "live_events", ["created_at"])
+
+
+def downgrade():
+    op.drop_table("live_events")
@@ -0,0 +1,26 @@
+"""index คิวแจ้งซ่อม (status, created_at, id) แทน idx_tickets_status
+
+Revision ID: e2b9f4c8a613
+Revises: c5e7a1d3b942
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b9f4c8a613'
+down_revision = 'c5e7a1d3b942'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("idx_tickets_status_created", "tickets", ["status", "created_at", "id"])
+    # status เป็นคอลัมน์แรกของ index ใหม่อยู่แล้ว
+    op.drop_index("idx_tickets_status", table_name="tickets")
+
+
+def downgrade():
+    op.create_index("idx_tickets_status", "tickets", ["status"])
+    op.drop_index("idx_tickets_status_created", table_name="tickets")
@@ -0,0 +1,69 @@
+"""asset_search_trigrams (search index ของครุภัณฑ์บน SQLite)
+
+Revision ID: e9f1b3c7a502
+Revises: d3c7a9e5b140
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9f1b3c7a502'
+down_revision = 'd3c7a9e5b140'
+branch_labels = None
+depends_on = None
+
+# ต้องตรงกับ services/search.py (NGRAM / normalize) ตอนเขียน migration นี้
+NGRAM = 3
+BATCH = 1000
+
+
+def _ngrams(value):
+    value = " ".join(unicodedata.normalize("NFKC", value or "").casefold().split())
+    return {value[i:i + NGRAM] for i in range(len(value) - NGRAM + 1)}
+
+
+def upgrade():
+    # MySQL ใช้ FULLTEXT ngram (ft_assets_name) แทน
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    # ก่อนหน้านี้แอปสร้างตารางเองตอนค้นครั้งแรก -> DB เก่าอาจมีอยู่แล้ว
+    if sa.inspect(bind).has_table("asset_search_trigrams"):
+        return
+
+    trigrams = op.create_table(
+        "asset_search_trigrams",
+        sa.Column("trigram", sa.String(NGRAM * 4), primary_key=True),
+        sa.Column("asset_id", sa.Integer(), primary_key=True),
+        sqlite_with_rowid=False,
+    )
+    op.create_index("ix_asset_search_trigrams_asset_id", "asset_search_trigrams", ["asset_id"])
+
+    # index ครุภัณฑ์ที่มีอยู่ทีละ batch (ไม่ต้องรอ flask search-reindex)
+    last_id = 0
+    while True:
+        batch = bind.execute(
+            sa.text("SELECT id, name, asset_tag FROM assets WHERE id > :last ORDER BY id LIMIT :n"),
+            {"last": last_id, "n": BATCH},
+        ).all()
+        if not batch:
+            break
+        rows = [
+            {"trigram": g, "asset_id": r.id}
+            for r in batch
+            for g in _ngrams(r.name) | _ngrams(r.asset_tag)
+        ]
+        if rows:
+            op.bulk_insert(trigrams, rows)
+        last_id = batch[-1].id
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.drop_table("asset_search_trigrams")
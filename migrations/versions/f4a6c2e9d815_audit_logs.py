@@ -0,0 +1,39 @@
+"""audit_logs: ประวัติเปลี่ยนสถานะของ checkouts / assets
+
+Revision ID: f4a6c2e9d815
+Revises: e2b9f4c8a613
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a6c2e9d815'
+down_revision = 'e2b9f4c8a613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    now = sa.text("CURRENT_TIMESTAMP")
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("changed_by", sa.Integer(), nullable=True),
+        sa.Column("old_status", sa.String(20), nullable=False),
+        sa.Column("new_status", sa.String(20), nullable=False),
+        sa.Column("note", sa.String(255), nullable=True),
+        sa.Column("changed_at", sa.DateTime(), nullable=False, server_default=now),
+        sa.ForeignKeyConstraint(["changed_by"], ["users.id"], name="fk_audit_logs_changed_by",
+                                onupdate="CASCADE", ondelete="SET NULL"),
+    )
+    op.create_index("idx_audit_logs_entity", "audit_logs", ["entity_type", "entity_id", "id"])
+    op.create_index("idx_audit_logs_changed_at", "audit_logs", ["changed_at"])
+
+
+def downgrade():
+    op.drop_table("audit_logs")
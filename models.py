@@ -1,12 +1,15 @@
 from datetime import datetime, date
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-from extensions import db, login_manager
+from extensions import db
+from services.passwords import hash_password, verify_password, get_hasher
 
 ASSET_STATUSES = ("new", "in_use", "repair", "retired")
 CHECKOUT_STATUSES = ("requested", "approved", "returned", "rejected")
 TICKET_STATUSES = ("open", "in_progress", "resolved", "closed")
 
+# checkout ที่ยังจอง/ยืมครุภัณฑ์อยู่ (ดู Checkout.active_asset_id)
+ACTIVE_CHECKOUT_STATUSES = ("requested", "approved")
+
 # ===== Human-friendly labels (TH) =====
 ASSET_STATUS_LABELS = {
     "new": "พร้อมใช้งาน",
@@ -51,45 +54,60 @@ STATUS_BADGE_CLASS = {
 }
 
 
+def status_badges(statuses, labels):
+    """{status: (label, badge class)} ของทุกสถานะ (<template data-live-badge> ของหน้า live)"""
+    return {s: (labels.get(s, s), STATUS_BADGE_CLASS.get(s, "pill-muted")) for s in statuses}
+
+
 class User(db.Model, UserMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        db.UniqueConstraint("email", name="uq_users_email"),
+        db.Index("idx_users_email", "email"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(120), nullable=False)
-    email = db.Column(db.String(120), unique=True, index=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default="staff")  # admin/staff
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+    created_at = db.Column(db.TIMESTAMP, nullable=False, server_default=db.func.current_timestamp())
+    updated_at = db.Column(db.TIMESTAMP, nullable=True)
 
     assets_created = db.relationship("Asset", backref="creator", lazy=True, foreign_keys="Asset.created_by")
     checkouts = db.relationship("Checkout", backref="borrower", lazy=True, foreign_keys="Checkout.borrower_id")
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return get_hasher().needs_rehash(self.password_hash)
 
     def get_id(self):
         return str(self.id)
 
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-
 class Category(db.Model):
     __tablename__ = "categories"
+    __table_args__ = (
+        db.UniqueConstraint("name", name="uq_categories_name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(120), unique=True, nullable=False)
+    name = db.Column(db.String(120), nullable=False)
 
     assets = db.relationship("Asset", backref="category", lazy=True)
 
 
 class Location(db.Model):
     __tablename__ = "locations"
+    __table_args__ = (
+        db.Index("idx_locations_building_room", "building", "room"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     building = db.Column(db.String(120), nullable=False)
@@ -104,17 +122,27 @@ class Location(db.Model):
 
 class Asset(db.Model):
     __tablename__ = "assets"
+    __table_args__ = (
+        db.UniqueConstraint("asset_tag", name="uq_assets_asset_tag"),
+        db.Index("idx_assets_status", "status"),
+        db.Index("idx_assets_category_id", "category_id"),
+        db.Index("idx_assets_location_id", "location_id"),
+        db.Index("idx_assets_name", "name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    asset_tag = db.Column(db.String(50), unique=True, index=True, nullable=False)
+    asset_tag = db.Column(db.String(50), nullable=False)
     name = db.Column(db.String(200), nullable=False)
 
-    category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)
-    location_id = db.Column(db.Integer, db.ForeignKey("locations.id"), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id", name="fk_assets_category",
+                                                      onupdate="CASCADE", ondelete="RESTRICT"), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey("locations.id", name="fk_assets_location",
+                                                      onupdate="CASCADE", ondelete="RESTRICT"), nullable=False)
 
     status = db.Column(db.String(20), nullable=False, default="new")  # new/in_use/repair/retired
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    created_at = db.Column(db.TIMESTAMP, nullable=False, default=datetime.utcnow, server_default=db.func.current_timestamp())
+    created_by = db.Column(db.Integer, db.ForeignKey("users.id", name="fk_assets_created_by",
+                                                     onupdate="CASCADE", ondelete="SET NULL"), nullable=True)
 
     checkouts = db.relationship("Checkout", backref="asset", lazy=True)
 
@@ -129,22 +157,47 @@ class Asset(db.Model):
 
 class Checkout(db.Model):
     __tablename__ = "checkouts"
+    __table_args__ = (
+        db.Index("idx_checkouts_asset", "asset_id"),
+        db.Index("idx_checkouts_borrower", "borrower_id"),
+        db.Index("idx_checkouts_status", "status"),
+        db.Index("idx_checkouts_dates", "checkout_date", "due_date", "return_date"),
+        # หา loan ที่เลยกำหนด: WHERE status = 'approved' AND due_date > :mark ORDER BY due_date, id
+        # (idx_checkouts_status ยังต้องมี: รายการตามสถานะเรียงด้วย id)
+        db.Index("idx_checkouts_status_due", "status", "due_date", "id"),
+        # ครุภัณฑ์ 1 ชิ้นมี checkout ที่ยัง active (requested/approved) ได้แค่ 1 รายการ
+        # active_asset_id เป็น NULL เมื่อจบแล้ว และ NULL ซ้ำกันได้ใน unique index
+        db.Index("uq_checkouts_active_asset", "active_asset_id", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
-    asset_id = db.Column(db.Integer, db.ForeignKey("assets.id"), nullable=False)
-    borrower_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    asset_id = db.Column(db.Integer, db.ForeignKey("assets.id", name="fk_checkouts_asset",
+                                                   onupdate="CASCADE", ondelete="RESTRICT"), nullable=False)
+    borrower_id = db.Column(db.Integer, db.ForeignKey("users.id", name="fk_checkouts_borrower",
+                                                      onupdate="CASCADE", ondelete="RESTRICT"), nullable=False)
 
-    checkout_date = db.Column(db.Date, default=date.today)
+    checkout_date = db.Column(db.Date, nullable=False, default=date.today)
     due_date = db.Column(db.Date, nullable=True)
     return_date = db.Column(db.Date, nullable=True)
 
     status = db.Column(db.String(20), nullable=False, default="requested")  # requested/approved/returned/rejected
-    approved_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    approved_by = db.Column(db.Integer, db.ForeignKey("users.id", name="fk_checkouts_approved_by",
+                                                      onupdate="CASCADE", ondelete="SET NULL"), nullable=True)
     approved_at = db.Column(db.DateTime, nullable=True)
 
+    # optimistic concurrency: ORM flush ตรวจ version เดิมและ +1 ให้เอง
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    # generated column (DB คำนวณเอง ใช้ได้กับทั้ง ORM / bulk insert / raw SQL)
+    active_asset_id = db.Column(db.Integer, db.Computed(
+        "CASE WHEN status IN (%s) THEN asset_id END" % ",".join("'%s'" % s for s in ACTIVE_CHECKOUT_STATUSES),
+        persisted=False,
+    ))
+
     approver = db.relationship("User", foreign_keys=[approved_by], lazy=True)
 
+    __mapper_args__ = {"version_id_col": version}
+
     @property
     def status_th(self):
         return CHECKOUT_STATUS_LABELS.get(self.status, self.status)
@@ -153,45 +206,68 @@ class Checkout(db.Model):
     def status_badge(self):
         return STATUS_BADGE_CLASS.get(self.status, "pill-muted")
 
-
-from datetime import datetime
-from extensions import db
+    @property
+    def is_overdue(self):
+        return self.status == "approved" and self.due_date is not None and self.due_date < date.today()
 
 
 class Ticket(db.Model):
-    __tablename__ = 'tickets'
+    __tablename__ = "tickets"
+    __table_args__ = (
+        db.Index("idx_tickets_asset", "asset_id"),
+        db.Index("idx_tickets_requester", "requester_id"),
+        db.Index("idx_tickets_created_at", "created_at"),
+        # คิวงานแยกตามสถานะ: WHERE status = ? ORDER BY created_at, id (keyset)
+        # ใช้แทน idx_tickets_status เดิมได้ด้วย (status เป็นคอลัมน์แรก)
+        db.Index("idx_tickets_status_created", "status", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
-    asset_id = db.Column(db.Integer, db.ForeignKey('assets.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    asset_id = db.Column(db.Integer, db.ForeignKey("assets.id", name="fk_tickets_asset",
+                                                   onupdate="CASCADE", ondelete="RESTRICT"), nullable=False)
+    requester_id = db.Column(db.Integer, db.ForeignKey("users.id", name="fk_tickets_requester",
+                                                       onupdate="CASCADE", ondelete="RESTRICT"), nullable=False)
 
-    problem = db.Column(db.Text, nullable=False)
+    issue = db.Column(db.Text, nullable=False)
 
-    status = db.Column(
-        db.String(20),
-        nullable=False,
-        default='open'
-    )
+    status = db.Column(db.String(20), nullable=False, default="open")  # open/in_progress/resolved/closed
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.current_timestamp())
 
-    asset = db.relationship('Asset')   # ✅ ฝั่งเดียวพอ
-    user = db.relationship('User')
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    asset = db.relationship("Asset", lazy=True)
+    requester = db.relationship("User", lazy=True)
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @property
+    def status_th(self):
+        return TICKET_STATUS_LABELS.get(self.status, self.status)
+
+    @property
+    def status_badge(self):
+        return STATUS_BADGE_CLASS.get(self.status, "pill-muted")
 
 
 class TicketLog(db.Model):
     __tablename__ = "ticket_logs"
+    __table_args__ = (
+        db.Index("idx_ticket_logs_ticket", "ticket_id"),
+        db.Index("idx_ticket_logs_changed_at", "changed_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
     ticket_id = db.Column(
         db.Integer,
-        db.ForeignKey("tickets.id"),
+        db.ForeignKey("tickets.id", name="fk_ticket_logs_ticket", onupdate="CASCADE", ondelete="CASCADE"),
         nullable=False
     )
 
     changed_by = db.Column(
         db.Integer,
-        db.ForeignKey("users.id"),
+        db.ForeignKey("users.id", name="fk_ticket_logs_changed_by", onupdate="CASCADE", ondelete="SET NULL"),
         nullable=True
     )
 
@@ -199,10 +275,134 @@ class TicketLog(db.Model):
     new_status = db.Column(db.String(20), nullable=False)
 
     note = db.Column(db.String(255), nullable=True)
-    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.current_timestamp())
 
     ticket = db.relationship("Ticket", lazy=True)
     changer = db.relationship("User", lazy=True)
 
     def __repr__(self):
         return f"<TicketLog ticket={self.ticket_id} {self.old_status}->{self.new_status}>"
+
+
+class AuditLog(db.Model):
+    """ประวัติการเปลี่ยนสถานะของ checkouts / assets (tickets ใช้ ticket_logs)"""
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        # ประวัติของ entity หนึ่ง เรียงตาม id (keyset)
+        db.Index("idx_audit_logs_entity", "entity_type", "entity_id", "id"),
+        db.Index("idx_audit_logs_changed_at", "changed_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    entity_type = db.Column(db.String(20), nullable=False)  # checkout/asset
+    entity_id = db.Column(db.Integer, nullable=False)
+
+    changed_by = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", name="fk_audit_logs_changed_by", onupdate="CASCADE", ondelete="SET NULL"),
+        nullable=True
+    )
+
+    old_status = db.Column(db.String(20), nullable=False)
+    new_status = db.Column(db.String(20), nullable=False)
+
+    note = db.Column(db.String(255), nullable=True)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, server_default=db.func.current_timestamp())
+
+    changer = db.relationship("User", lazy=True)
+
+    def __repr__(self):
+        return f"<AuditLog {self.entity_type}={self.entity_id} {self.old_status}->{self.new_status}>"
+
+
+# ===== Analytics (rollup รายวัน: services/analytics.py) =====
+class AssetUsageDaily(db.Model):
+    """ผลรวมต่อ (วัน, ครุภัณฑ์) : จำนวน loan ที่ครอบวันนั้น / เกินกำหนด / เริ่ม / คืน"""
+    __tablename__ = "asset_usage_daily"
+    __table_args__ = (
+        db.Index("idx_asset_usage_daily_asset", "asset_id", "day"),
+    )
+
+    day = db.Column(db.Date, primary_key=True)
+    asset_id = db.Column(db.Integer, db.ForeignKey("assets.id", name="fk_asset_usage_daily_asset",
+                                                   onupdate="CASCADE", ondelete="CASCADE"), primary_key=True)
+
+    busy = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    overdue = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    started = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    returned = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    loan_days = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # ความยาว loan ที่คืนวันนี้ (รวม)
+
+
+class AnalyticsCheckoutState(db.Model):
+    """ช่วงเวลาของ checkout ที่ถูกนับลง rollup ไปแล้ว (ไว้หักออกเมื่อ checkout เปลี่ยน)"""
+    __tablename__ = "analytics_checkout_state"
+    __table_args__ = (
+        db.Index("idx_analytics_checkout_state_open", "is_open", "end_day"),
+    )
+
+    checkout_id = db.Column(db.Integer, db.ForeignKey("checkouts.id", name="fk_analytics_state_checkout",
+                                                      onupdate="CASCADE", ondelete="CASCADE"), primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
+    # NULL = ไม่ได้ยืมจริง (requested / rejected) ไม่มีผลกับ rollup
+    asset_id = db.Column(db.Integer, nullable=True)
+    start_day = db.Column(db.Date, nullable=True)
+    end_day = db.Column(db.Date, nullable=True)
+    due_day = db.Column(db.Date, nullable=True)
+    returned_day = db.Column(db.Date, nullable=True)
+    is_open = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+
+class SyncMark(db.Model):
+    """ค่าสถานะของงานเบื้องหลัง (high-water mark / วันที่คำนวณล่าสุด)"""
+    __tablename__ = "sync_marks"
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class OverdueCheckout(db.Model):
+    """loan ที่อนุมัติแล้วและเลยกำหนดคืน (เติมโดย services.overdue) ไว้อ่านบน dashboard / แจ้งเตือน"""
+    __tablename__ = "overdue_checkouts"
+    __table_args__ = (
+        db.Index("idx_overdue_checkouts_due", "due_date", "checkout_id"),
+        db.Index("idx_overdue_checkouts_borrower", "borrower_id"),
+    )
+
+    checkout_id = db.Column(db.Integer, db.ForeignKey("checkouts.id", name="fk_overdue_checkouts_checkout",
+                                                      onupdate="CASCADE", ondelete="CASCADE"), primary_key=True)
+    asset_id = db.Column(db.Integer, nullable=False)
+    borrower_id = db.Column(db.Integer, nullable=False)
+    due_date = db.Column(db.Date, nullable=False)
+
+    detected_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # ยังไม่มีระบบแจ้งเตือนผู้ยืม: คอลัมน์มีใน migration b8e4f2a6d319 แต่ยังไม่มีโค้ดเขียนค่า (NULL เสมอ)
+    notified_at = db.Column(db.DateTime, nullable=True)
+
+    checkout = db.relationship("Checkout", lazy=True)
+
+
+class SchedulerLease(db.Model):
+    """leader lock ของ scheduler: worker ที่ถือ lease (ยังไม่หมดอายุ) เป็นผู้รันงาน"""
+    __tablename__ = "scheduler_leases"
+
+    name = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(128), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+class LiveEvent(db.Model):
+    """event เปลี่ยนแปลงสำหรับหน้า live (SSE) ใช้ส่งต่อระหว่าง worker เก็บไว้ชั่วคราว"""
+    __tablename__ = "live_events"
+    __table_args__ = (
+        db.Index("idx_live_events_created_at", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # checkout/ticket
+    action = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=False)       # JSON: {"rows": [...]}
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
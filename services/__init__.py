@@ -0,0 +1 @@
+# services/ — ตัวช่วยฝั่ง query / cache / background job ที่ blueprint หลายตัวใช้ร่วมกัน
@@ -0,0 +1,348 @@
+# services/analytics.py
+# ======================
+# Utilization / overdue analytics (rollup รายวัน)
+# ======================
+# refresh() : อ่าน checkout เป็นชุด (keyset ตาม id, เฉพาะคอลัมน์ที่ใช้) แล้วใช้ NumPy
+#             แตกช่วง [checkout_date, return_date หรือวันนี้] เป็นรายวัน -> บวกลง asset_usage_daily
+#   incremental: analytics_checkout_state เก็บช่วงที่เคยนับของแต่ละ checkout
+#     - checkout ใหม่ / version เปลี่ยน -> หักช่วงเดิม (-1) แล้วบวกช่วงใหม่ (+1)
+#     - loan ที่ยังไม่คืน (version เดิม) -> บวกเฉพาะ [end_day เดิม + 1, วันนี้] (งานต่อรอบ = จำนวนวันที่เพิ่ม)
+#     checkout ที่ไม่เปลี่ยนไม่ถูกคำนวณซ้ำ
+#   ต้องมีผู้รัน refresh ได้ทีละคน (CLI / scheduler ที่มี leader lock)
+# summary() : อ่านจาก rollup อย่างเดียว (ไม่แตะ checkouts)
+#   flask --app wsgi analytics refresh [--as-of 2026-01-31]
+from datetime import date
+
+import click
+from flask import current_app
+from sqlalchemy import and_, case, delete, func, or_, select, true
+
+from extensions import db
+from models import AnalyticsCheckoutState, Asset, AssetUsageDaily, Category, Checkout
+from services import scheduler
+from services.marks import get_mark, set_mark
+
+MARK = "asset_usage.as_of"
+METRICS = ("busy", "overdue", "started", "returned", "loan_days")
+BORROWED = ("approved", "returned")
+# key = asset_id << DAY_BITS | ordinal ของวัน (ordinal < 2**20 ไปจนถึงปี 2870)
+DAY_BITS = 20
+STATE_COLUMNS = ("version", "asset_id", "start_day", "end_day", "due_day", "returned_day", "is_open")
+
+
+def _numpy():
+    # โหลดเมื่อคำนวณเท่านั้น (worker boot ไม่ต้อง import numpy)
+    import numpy as np
+    return np
+
+
+# ======================
+# INTERVAL ARITHMETIC (NumPy)
+# ======================
+def _expand(np, asset, start, end, weight):
+    """ช่วง [start, end] (ordinal) ต่อแถว -> (asset, day, weight) รายวัน"""
+    lengths = np.maximum(end - start + 1, 0)
+    keep = lengths > 0
+    asset, start, weight, lengths = asset[keep], start[keep], weight[keep], lengths[keep]
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(asset, lengths), np.repeat(start, lengths) + offsets, np.repeat(weight, lengths)
+
+
+def contributions(np, cols):
+    """
+    cols: dict ของ array asset/start/end/due/returned/weight (ordinal, -1 = ไม่มีค่า)
+          + started (bool): False = ช่วงต่อท้ายของ loan เดิม ไม่นับ started ซ้ำ
+    คืน (keys, totals) : key ต่อ (วัน, ครุภัณฑ์) และผลรวม METRICS ต่อ key
+    """
+    asset, start, end, due, ret, w = (cols[k] for k in ("asset", "start", "end", "due", "returned", "weight"))
+    keys, metric, weights = [], [], []
+
+    def add(m, a, d, wt):
+        keys.append((a << DAY_BITS) | d)
+        metric.append(np.full(len(a), m, dtype=np.int64))
+        weights.append(wt)
+
+    add(0, *_expand(np, asset, start, end, w))                        # busy
+    has_due = due >= 0
+    add(1, *_expand(np, asset[has_due], np.maximum(start[has_due], due[has_due] + 1),
+                    end[has_due], w[has_due]))                        # overdue: หลัง due ถึงวันคืน/วันนี้
+    s = cols["started"]
+    add(2, asset[s], start[s], w[s])                                  # started
+    r = ret >= 0
+    add(3, asset[r], ret[r], w[r])                                    # returned
+    add(4, asset[r], ret[r], w[r] * (ret[r] - start[r] + 1))          # loan_days
+
+    keys = np.concatenate(keys)
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    totals = np.zeros((len(uniq), len(METRICS)), dtype=np.int64)
+    np.add.at(totals, (inverse, np.concatenate(metric)), np.concatenate(weights))
+    nonzero = totals.any(axis=1)
+    return uniq[nonzero], totals[nonzero]
+
+
+# ======================
+# REFRESH
+# ======================
+def _candidates(after, as_of, limit):
+    s = AnalyticsCheckoutState
+    return (
+        select(
+            Checkout.id, Checkout.version, Checkout.asset_id, Checkout.status,
+            Checkout.checkout_date, Checkout.due_date, Checkout.return_date,
+            s.version.label("s_version"), s.asset_id.label("s_asset"), s.start_day, s.end_day,
+            s.due_day, s.returned_day, s.is_open,
+        )
+        .outerjoin(s, s.checkout_id == Checkout.id)
+        .where(
+            Checkout.id > after,
+            or_(
+                s.checkout_id.is_(None),
+                s.version != Checkout.version,
+                and_(s.is_open == true(), s.end_day < as_of),
+            ),
+        )
+        .order_by(Checkout.id)
+        .limit(limit)
+    )
+
+
+def _new_state(row, as_of):
+    state = dict(checkout_id=row.id, version=row.version, asset_id=None, start_day=None,
+                 end_day=None, due_day=None, returned_day=None, is_open=False)
+    if row.status not in BORROWED:
+        return state
+    start = row.checkout_date
+    if row.status == "returned":
+        returned = row.return_date or start
+        end = returned
+    else:
+        returned, end = None, as_of
+    state.update(asset_id=row.asset_id, start_day=start, end_day=end, due_day=row.due_date,
+                 returned_day=returned, is_open=row.status == "approved")
+    return state
+
+
+def _ordinal(d):
+    return d.toordinal() if d else -1
+
+
+def _columns(np, items, weight, started=True):
+    # items: [(asset_id, start, end, due, returned)] -> dict ของ array
+    arr = np.array(items, dtype=np.int64).reshape(-1, 5)
+    return {
+        "asset": arr[:, 0], "start": arr[:, 1], "end": arr[:, 2], "due": arr[:, 3], "returned": arr[:, 4],
+        "weight": np.full(len(arr), weight, dtype=np.int64),
+        "started": np.full(len(arr), started, dtype=bool),
+    }
+
+
+def _dialect_insert():
+    name = db.session.get_bind(mapper=AssetUsageDaily.__mapper__).dialect.name
+    if name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return name, insert
+
+
+def _upsert(model, rows, keys, columns, additive):
+    if not rows:
+        return
+    name, insert = _dialect_insert()
+    stmt = insert(model)
+    new = stmt.inserted if name == "mysql" else stmt.excluded
+    values = {c: (getattr(model, c) + new[c]) if additive else new[c] for c in columns}
+    if name == "mysql":
+        stmt = stmt.on_duplicate_key_update(values)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_=values)
+    db.session.execute(stmt, rows)
+
+
+def _apply(np, rows, as_of):
+    old, new, tail, states = [], [], [], []
+    for r in rows:
+        if r.s_asset is not None and r.s_version == r.version and r.is_open:
+            # loan เดิมที่ยังไม่คืน: นับเพิ่มเฉพาะวันหลังจากที่นับไว้ (overdue ตาม due_day ใน contributions)
+            states.append(_new_state(r, as_of))
+            tail.append((r.s_asset, _ordinal(r.end_day) + 1, _ordinal(as_of), _ordinal(r.due_day), -1))
+            continue
+        if r.s_asset is not None:
+            old.append((r.s_asset, _ordinal(r.start_day), _ordinal(r.end_day),
+                        _ordinal(r.due_day), _ordinal(r.returned_day)))
+        st = _new_state(r, as_of)
+        states.append(st)
+        if st["asset_id"] is not None:
+            new.append((st["asset_id"], _ordinal(st["start_day"]), _ordinal(st["end_day"]),
+                        _ordinal(st["due_day"]), _ordinal(st["returned_day"])))
+
+    parts = [
+        c for c in (_columns(np, old, -1), _columns(np, new, 1), _columns(np, tail, 1, started=False))
+        if len(c["asset"])
+    ]
+    rollup = []
+    if parts:
+        cols = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+        keys, totals = contributions(np, cols)
+        mask = (1 << DAY_BITS) - 1
+        rollup = [
+            dict(zip(METRICS, map(int, t)), asset_id=int(k >> DAY_BITS), day=date.fromordinal(int(k & mask)))
+            for k, t in zip(keys.tolist(), totals)
+        ]
+
+    _upsert(AssetUsageDaily, rollup, ["day", "asset_id"], METRICS, additive=True)
+    _upsert(AnalyticsCheckoutState, states, ["checkout_id"], STATE_COLUMNS, additive=False)
+    if old:
+        # หักช่วงเดิมออกแล้วอาจเหลือแถวที่เป็นศูนย์ทั้งหมด
+        u = AssetUsageDaily
+        db.session.execute(delete(u).where(
+            u.asset_id.in_({o[0] for o in old}),
+            *(getattr(u, m) == 0 for m in METRICS),
+        ))
+    return len(rollup)
+
+
+def refresh(as_of=None, batch_size=None):
+    """อัปเดต rollup ถึงวันที่ as_of (ค่าเริ่มต้น: วันนี้) คืนสถิติของรอบนี้"""
+    np = _numpy()
+    as_of = as_of or date.today()
+    batch_size = batch_size or current_app.config["ANALYTICS_BATCH_SIZE"]
+    stats = {"as_of": as_of.isoformat(), "checkouts": 0, "rollup_rows": 0, "batches": 0}
+
+    after = 0
+    while True:
+        rows = db.session.execute(_candidates(after, as_of, batch_size)).all()
+        if not rows:
+            break
+        after = rows[-1].id
+        stats["rollup_rows"] += _apply(np, rows, as_of)
+        stats["checkouts"] += len(rows)
+        stats["batches"] += 1
+        db.session.commit()
+
+    set_mark(MARK, as_of.isoformat())
+    db.session.commit()
+    return stats
+
+
+# ======================
+# READ (dashboard / history)
+# ======================
+def summary(days=None, top=5):
+    """
+    สรุปย้อนหลัง days วันจาก rollup:
+      totals / categories (utilization, ยืมเฉลี่ยกี่วัน, ว่าง, ถูกยืมแทบตลอด) / busiest / overdue_now
+    cache ไว้จนกว่า refresh ครั้งถัดไป; คืน None ถ้ายังไม่เคย refresh
+    """
+    days = days or current_app.config["ANALYTICS_WINDOW_DAYS"]
+    value, updated_at = get_mark(MARK)
+    if value is None:
+        return None
+
+    cache = current_app.extensions.setdefault("analytics_summary", {})
+    key = (value, updated_at, days, top)
+    if key in cache:
+        return cache[key]
+
+    as_of = date.fromisoformat(value)
+    start = date.fromordinal(as_of.toordinal() - days + 1)
+    u = AssetUsageDaily
+    per_asset = (
+        select(
+            u.asset_id,
+            func.sum(case((u.busy > 0, 1), else_=0)).label("busy_days"),
+            func.sum(u.returned).label("returned"),
+            func.sum(u.loan_days).label("loan_days"),
+        )
+        .where(u.day.between(start, as_of))
+        .group_by(u.asset_id)
+        .subquery()
+    )
+    busy_days = func.coalesce(per_asset.c.busy_days, 0)
+    always = days * current_app.config["ANALYTICS_ALWAYS_BORROWED"]
+
+    categories = []
+    for row in db.session.execute(
+        select(
+            Category.name,
+            func.count(Asset.id).label("assets"),
+            func.sum(busy_days).label("busy_days"),
+            func.coalesce(func.sum(per_asset.c.returned), 0).label("returned"),
+            func.coalesce(func.sum(per_asset.c.loan_days), 0).label("loan_days"),
+            func.sum(case((busy_days == 0, 1), else_=0)).label("idle"),
+            func.sum(case((busy_days >= always, 1), else_=0)).label("always"),
+        )
+        .select_from(Asset)
+        .join(Category, Asset.category_id == Category.id)
+        .outerjoin(per_asset, per_asset.c.asset_id == Asset.id)
+        .where(Asset.status != "retired")
+        .group_by(Category.id, Category.name)
+        .order_by(Category.name)
+    ):
+        categories.append({
+            "name": row.name,
+            "assets": row.assets,
+            "utilization": _ratio(row.busy_days, row.assets * days),
+            "avg_loan_days": _ratio(row.loan_days, row.returned, 1),
+            "idle": row.idle,
+            "always": row.always,
+            "busy_days": row.busy_days,
+            "returned": row.returned,
+            "loan_days": row.loan_days,
+        })
+
+    busiest = [
+        {"asset_tag": r.asset_tag, "name": r.name, "busy_days": r.busy_days,
+         "utilization": _ratio(r.busy_days, days)}
+        for r in db.session.execute(
+            select(Asset.asset_tag, Asset.name, per_asset.c.busy_days)
+            .join(per_asset, per_asset.c.asset_id == Asset.id)
+            .order_by(per_asset.c.busy_days.desc(), Asset.asset_tag)
+            .limit(top)
+        )
+    ]
+    overdue_now = db.session.execute(
+        select(func.coalesce(func.sum(u.overdue), 0)).where(u.day == as_of)
+    ).scalar()
+
+    n_assets = sum(c["assets"] for c in categories)
+    returned = sum(c["returned"] for c in categories)
+    result = {
+        "as_of": as_of,
+        "days": days,
+        "totals": {
+            "assets": n_assets,
+            "utilization": _ratio(sum(c["busy_days"] for c in categories), n_assets * days),
+            "avg_loan_days": _ratio(sum(c["loan_days"] for c in categories), returned, 1),
+            "idle": sum(c["idle"] for c in categories),
+            "always": sum(c["always"] for c in categories),
+        },
+        "categories": categories,
+        "busiest": busiest,
+        "overdue_now": overdue_now,
+    }
+    cache.clear()
+    cache[key] = result
+    return result
+
+
+def _ratio(a, b, digits=3):
+    return round(a / b, digits) if b else 0.0
+
+
+def init_app(app):
+    scheduler.add_job(app, "analytics_refresh", refresh, app.config["ANALYTICS_REFRESH_SECONDS"])
+
+    @app.cli.group("analytics")
+    def analytics_cli():
+        """rollup การใช้งานครุภัณฑ์"""
+
+    @analytics_cli.command("refresh")
+    @click.option("--as-of", type=click.DateTime(formats=["%Y-%m-%d"]), default=None)
+    @click.option("--batch-size", type=int, default=None)
+    def refresh_cmd(as_of, batch_size):
+        """นับ checkout ที่ใหม่ / เปลี่ยน / ยังไม่คืน ลง asset_usage_daily"""
+        stats = refresh(as_of.date() if as_of else None, batch_size)
+        click.echo("as_of=%(as_of)s checkouts=%(checkouts)d rollup_rows=%(rollup_rows)d batches=%(batches)d" % stats)
@@ -0,0 +1,275 @@
+# services/asset_import.py
+# ======================
+# Bulk import ครุภัณฑ์จาก CSV / XLSX
+# ======================
+# อ่านไฟล์ทีละแถว (ไม่โหลดทั้งไฟล์) แล้วทำงานเป็น batch:
+#   1) ตรวจความถูกต้องของแต่ละแถว
+#   2) asset_tag ซ้ำในฐานข้อมูล -> query IN ครั้งเดียวต่อ batch
+#   3) category / location -> lookup ครั้งเดียวต่อ batch, ที่ยังไม่มีสร้างให้
+#   4) insert แบบ executemany เป็นก้อนตาม IMPORT_INSERT_CHUNK
+# คอลัมน์: asset_tag, name, category, location ("อาคาร / ห้อง") หรือ building + room, status
+# CSV: UTF-8 (มี/ไม่มี BOM) หรือ cp874 (Excel ภาษาไทยบน Windows) ดูจากช่วงต้นไฟล์
+#   ไฟล์เสียกลางทาง -> batch ก่อนหน้า commit ไปแล้ว: หยุดตรงนั้นแล้วรายงานว่านำเข้าถึงแถวไหน (report.aborted)
+import codecs
+import csv
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert, select, tuple_
+
+from extensions import db
+from models import Asset, Category, Location, ASSET_STATUSES
+from services.search import assets_bulk_inserted
+
+REQUIRED = ("asset_tag", "name", "category")
+CSV_ENCODING = "utf-8-sig"
+CSV_FALLBACK_ENCODING = "cp874"
+CSV_SNIFF_BYTES = 64 * 1024
+MAX_LEN = {"asset_tag": 50, "name": 200, "category": 120, "building": 120, "room": 120}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.total = 0
+        self.inserted = 0
+        self.error_count = 0
+        self.errors = []
+        self.created_categories = 0
+        self.created_locations = 0
+        self.batches = []     # แถวที่ commit แล้ว: {"from", "to", "inserted"}
+        self.aborted = None   # ข้อความเมื่ออ่านไฟล์ต่อไม่ได้
+
+    def committed(self, first_row, last_row, inserted):
+        self.inserted += inserted
+        self.batches.append({"from": first_row, "to": last_row, "inserted": inserted})
+
+    @property
+    def committed_to(self):
+        return self.batches[-1]["to"] if self.batches else None
+
+    def error(self, row_no, asset_tag, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_no, "asset_tag": asset_tag, "error": message})
+
+    def as_dict(self):
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "failed": self.error_count,
+            "created_categories": self.created_categories,
+            "created_locations": self.created_locations,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+            "batches": self.batches,
+            "committed_to": self.committed_to,
+            "aborted": self.aborted,
+        }
+
+
+# ======================
+# READERS (stream ทีละแถว)
+# ======================
+def _normalize_header(h):
+    return (h or "").strip().lower().replace(" ", "_")
+
+
+def _sniff_encoding(stream):
+    sample = stream.read(CSV_SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        # final=False: ตัวอักษรที่ถูกตัดครึ่งท้าย sample ไม่นับเป็น error
+        codecs.getincrementaldecoder(CSV_ENCODING)().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return CSV_FALLBACK_ENCODING
+    return CSV_ENCODING
+
+
+def _decoded_lines(stream, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line_no, raw in enumerate(stream, start=1):
+        try:
+            yield decoder.decode(raw)
+        except UnicodeDecodeError:
+            raise ImportFormatError(
+                "แถวที่ %d: อ่านไม่ได้ด้วย encoding %s (บันทึกไฟล์เป็น CSV UTF-8)" % (line_no, encoding)
+            )
+
+
+def iter_csv(stream):
+    reader = csv.reader(_decoded_lines(stream, _sniff_encoding(stream)))
+    header = [_normalize_header(h) for h in next(reader, [])]
+    for row in reader:
+        yield dict(zip(header, row))
+
+
+def iter_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("ต้องติดตั้ง openpyxl เพื่อ import ไฟล์ .xlsx")
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [_normalize_header(str(h) if h is not None else "") for h in next(rows, ())]
+        for row in rows:
+            yield {k: ("" if v is None else str(v)) for k, v in zip(header, row)}
+    finally:
+        wb.close()
+
+
+def iter_rows(stream, filename):
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        return iter_xlsx(stream)
+    if name.endswith(".csv"):
+        return iter_csv(stream)
+    raise ImportFormatError("รองรับเฉพาะไฟล์ .csv และ .xlsx")
+
+
+# ======================
+# VALIDATION
+# ======================
+def _clean(raw):
+    row = {k: (v or "").strip() for k, v in raw.items() if k}
+    if not row.get("building") and "/" in row.get("location", ""):
+        building, _, room = row["location"].partition("/")
+        row["building"], row["room"] = building.strip(), room.strip()
+    row["status"] = row.get("status") or "new"
+    return row
+
+
+def _validate(row):
+    for field in REQUIRED:
+        if not row.get(field):
+            return "ไม่มีค่า %s" % field
+    if not row.get("building") or not row.get("room"):
+        return "ไม่มีค่า location (อาคาร / ห้อง)"
+    for field, limit in MAX_LEN.items():
+        if len(row.get(field, "")) > limit:
+            return "%s ยาวเกิน %d ตัวอักษร" % (field, limit)
+    if row["status"] not in ASSET_STATUSES:
+        return "status ไม่ถูกต้อง: %s" % row["status"]
+    return None
+
+
+# ======================
+# BATCH LOOKUPS
+# ======================
+def _category_ids(names, report):
+    found = dict(db.session.execute(
+        select(Category.name, Category.id).where(Category.name.in_(names))
+    ).all())
+    missing = [n for n in names if n not in found]
+    if missing:
+        db.session.execute(insert(Category), [{"name": n} for n in missing])
+        found.update(db.session.execute(
+            select(Category.name, Category.id).where(Category.name.in_(missing))
+        ).all())
+        report.created_categories += len(missing)
+    return found
+
+
+def _location_ids(pairs, report):
+    def lookup(keys):
+        rows = db.session.execute(
+            select(Location.building, Location.room, Location.id)
+            .where(tuple_(Location.building, Location.room).in_(keys))
+        ).all()
+        return {(b, r): i for b, r, i in rows}
+
+    found = lookup(pairs)
+    missing = [p for p in pairs if p not in found]
+    if missing:
+        db.session.execute(insert(Location), [{"building": b, "room": r} for b, r in missing])
+        found.update(lookup(missing))
+        report.created_locations += len(missing)
+    return found
+
+
+def _flush_batch(batch, report, created_by, insert_chunk):
+    tags = [row["asset_tag"] for _, row in batch]
+    existing = set(db.session.execute(
+        select(Asset.asset_tag).where(Asset.asset_tag.in_(tags))
+    ).scalars())
+
+    pending = []
+    for row_no, row in batch:
+        if row["asset_tag"] in existing:
+            report.error(row_no, row["asset_tag"], "asset_tag นี้มีอยู่แล้ว")
+        else:
+            pending.append(row)
+    if not pending:
+        return
+
+    categories = _category_ids(sorted({r["category"] for r in pending}), report)
+    locations = _location_ids(sorted({(r["building"], r["room"]) for r in pending}), report)
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "asset_tag": r["asset_tag"],
+            "name": r["name"],
+            "category_id": categories[r["category"]],
+            "location_id": locations[(r["building"], r["room"])],
+            "status": r["status"],
+            "created_at": now,
+            "created_by": created_by,
+        }
+        for r in pending
+    ]
+    for i in range(0, len(values), insert_chunk):
+        db.session.execute(insert(Asset), values[i:i + insert_chunk])
+
+    assets_bulk_inserted([v["asset_tag"] for v in values])
+    db.session.commit()
+    report.committed(batch[0][0], batch[-1][0], len(values))
+
+
+# ======================
+# ENTRY POINT
+# ======================
+def import_assets(stream, filename, created_by=None, batch_size=None):
+    cfg = current_app.config
+    batch_size = batch_size or cfg["IMPORT_BATCH_SIZE"]
+    insert_chunk = cfg["IMPORT_INSERT_CHUNK"]
+    report = ImportReport(cfg["IMPORT_MAX_ERRORS"])
+
+    # ตรวจ tag ซ้ำภายในไฟล์เดียวกัน (เก็บแค่ tag ไม่เก็บทั้งแถว)
+    seen_tags = set()
+    batch = []
+
+    rows = iter_rows(stream, filename)
+    try:
+        # แถวที่ 1 คือ header
+        for row_no, raw in enumerate(rows, start=2):
+            row = _clean(raw)
+            if not any(row.get(k) for k in ("asset_tag", "name", "category")):
+                continue
+            report.total += 1
+
+            problem = _validate(row)
+            if problem is None and row["asset_tag"] in seen_tags:
+                problem = "asset_tag ซ้ำในไฟล์"
+            if problem:
+                report.error(row_no, row.get("asset_tag"), problem)
+                continue
+
+            seen_tags.add(row["asset_tag"])
+            batch.append((row_no, row))
+            if len(batch) >= batch_size:
+                _flush_batch(batch, report, created_by, insert_chunk)
+                batch = []
+    except ImportFormatError as e:
+        # แถวที่อ่านได้ก่อนหน้านี้ยังนำเข้าตามปกติ -> แก้ไฟล์แล้ว import ใหม่ได้ (แถวเดิมจะเป็น "มีอยู่แล้ว")
+        report.aborted = str(e)
+
+    if batch:
+        _flush_batch(batch, report, created_by, insert_chunk)
+    return report
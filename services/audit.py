@@ -0,0 +1,212 @@
+# services/audit.py
+# ======================
+# Audit log ของการเปลี่ยนสถานะ (tickets / checkouts / assets)
+# ======================
+# ทางเดินของ event:
+#   record() / ORM flush ที่ status เปลี่ยน
+#     -> session.info["audit_events"]   (ยังไม่ commit: rollback = ทิ้ง)
+#     -> after_commit -> buffer ในหน่วยความจำ (ไม่มี round-trip เพิ่มใน request)
+#     -> thread เบื้องหลัง flush เป็น bulk INSERT เมื่อครบ AUDIT_BATCH_SIZE
+#        หรือทุก AUDIT_FLUSH_SECONDS และ flush ที่เหลือตอน worker ปิด
+#   tickets -> ticket_logs / อื่น ๆ -> audit_logs
+# ข้อจำกัด: process ตายกะทันหัน (SIGKILL / OOM) event ที่ยังอยู่ใน buffer จะหาย
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from flask import current_app, has_request_context
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Asset, AuditLog, Checkout, Ticket, TicketLog
+
+log = logging.getLogger(__name__)
+
+# entity -> model ที่ติดตาม status (ชื่อ entity ตรงกับ StateMachine.name)
+ENTITIES = {"ticket": Ticket, "checkout": Checkout, "asset": Asset}
+_ENTITY_OF = {model: name for name, model in ENTITIES.items()}
+
+
+# ======================
+# WRITER (buffer + background flush)
+# ======================
+class AuditWriter:
+    def __init__(self, app, batch_size, interval, max_buffer):
+        self.app = app
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_buffer = max_buffer
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        self.counts = {"queued": 0, "written": 0, "failed": 0, "flushes": 0, "inline": 0}
+
+    def _ensure_thread(self):
+        # สร้าง thread หลัง gunicorn fork (thread ของ master ไม่ตามมาใน worker)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, events):
+        with self._cond:
+            self._buffer.extend(events)
+            self.counts["queued"] += len(events)
+            behind = len(self._buffer) >= self.max_buffer
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        if behind:
+            # writer ตามไม่ทัน -> ให้ request นี้ช่วยเขียน (back-pressure แทนการทิ้ง event)
+            self.counts["inline"] += 1
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def _drain(self):
+        with self._cond:
+            events = list(self._buffer)
+            self._buffer.clear()
+        return events
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or len(self._buffer) >= self.batch_size,
+                    timeout=self.interval,
+                )
+                if self._stopping:
+                    return
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            events = self._drain()
+            if events:
+                self._write(events)
+        return len(events)
+
+    def _write(self, events):
+        tickets = [e for e in events if e["entity_type"] == "ticket"]
+        others = [e for e in events if e["entity_type"] != "ticket"]
+        try:
+            with self.app.app_context():
+                if tickets:
+                    db.session.execute(insert(TicketLog), [
+                        {
+                            "ticket_id": e["entity_id"],
+                            "changed_by": e["changed_by"],
+                            "old_status": e["old_status"],
+                            "new_status": e["new_status"],
+                            "note": e["note"],
+                            "changed_at": e["changed_at"],
+                        }
+                        for e in tickets
+                    ])
+                if others:
+                    db.session.execute(insert(AuditLog), others)
+                db.session.commit()
+        except Exception:
+            self.counts["failed"] += len(events)
+            log.exception("audit flush failed: dropped %d events", len(events))
+            return
+        self.counts["written"] += len(events)
+        self.counts["flushes"] += 1
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._buffer)
+        return dict(self.counts, pending=pending)
+
+
+def get_writer():
+    return current_app.extensions["audit_writer"]
+
+
+# ======================
+# RECORD
+# ======================
+def _actor_id():
+    if not has_request_context():
+        return None
+    from flask_login import current_user
+    return current_user.id if current_user.is_authenticated else None
+
+
+def record(entity_type, changes, actor_id=None, note=None, session=None):
+    """
+    changes: [(entity_id, old_status, new_status)]
+    เข้าคิวไว้ใน session ปัจจุบัน จะถูกส่งเขียนเมื่อ commit สำเร็จเท่านั้น
+    """
+    if entity_type not in ENTITIES:
+        raise ValueError("unknown audit entity: %s" % entity_type)
+    session = session or db.session()
+    now = datetime.utcnow()
+    actor = actor_id if actor_id is not None else _actor_id()
+    pending = session.info.setdefault("audit_events", [])
+    for entity_id, old, new in changes:
+        if old == new:
+            continue
+        pending.append({
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "changed_by": actor,
+            "old_status": old,
+            "new_status": new,
+            "note": (note or None) and note[:255],
+            "changed_at": now,
+        })
+
+
+def _before_flush(session, flush_context, instances):
+    # เปลี่ยน status ผ่าน ORM (เช่นแก้ไขครุภัณฑ์) -> บันทึกอัตโนมัติ
+    for obj in session.dirty:
+        entity = _ENTITY_OF.get(type(obj))
+        if entity is None:
+            continue
+        hist = inspect(obj).attrs.status.history
+        if hist.deleted and hist.added:
+            record(entity, [(obj.id, hist.deleted[0], hist.added[0])], session=session)
+
+
+def _after_commit(session):
+    events = session.info.pop("audit_events", None)
+    if events and current_app:
+        get_writer().submit(events)
+
+
+def _after_rollback(session):
+    session.info.pop("audit_events", None)
+
+
+def init_app(app):
+    writer = AuditWriter(
+        app,
+        batch_size=app.config["AUDIT_BATCH_SIZE"],
+        interval=app.config["AUDIT_FLUSH_SECONDS"],
+        max_buffer=app.config["AUDIT_MAX_BUFFER"],
+    )
+    app.extensions["audit_writer"] = writer
+    # gunicorn worker ปิดปกติ (SIGTERM / max_requests) -> atexit ยังทำงาน
+    atexit.register(writer.close)
+
+    if not event.contains(Session, "before_flush", _before_flush):
+        event.listen(Session, "before_flush", _before_flush)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,74 @@
+# services/change_tracking.py
+# ======================
+# ติดตามว่าตารางไหนถูกเขียน แล้วแจ้งเมื่อ commit สำเร็จ
+# ======================
+# ดักที่ระดับ cursor จึงครอบคลุมทั้ง ORM flush และ raw SQL แบบ db.text(...)
+# ที่ blueprint tickets ใช้อยู่ แล้วแจ้งหลัง Session commit (ข้อมูลมองเห็นได้แล้ว)
+# นับเฉพาะ statement บน Connection ที่ Session เปิด transaction อยู่ (ผูกกับ Connection object
+# ไม่ใช่ conn.info ของ pool) -> การเขียนผ่าน db.engine.begin() / Core นอก Session ไม่รั่วไปรวมกับ commit ถัดไป
+#   on_commit(callback)  -> callback(set_of_table_names)
+import re
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+_WRITE_RE = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)\s+[`\"]?(\w+)",
+    re.IGNORECASE,
+)
+
+_callbacks = []
+# Connection ของ Session -> set ของตารางที่เขียนใน transaction นั้น
+_session_writes = weakref.WeakKeyDictionary()
+
+
+def on_commit(callback):
+    if callback not in _callbacks:
+        _callbacks.append(callback)
+    return callback
+
+
+def written_table(statement):
+    m = _WRITE_RE.match(statement)
+    return m.group(1).lower() if m else None
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    table = written_table(statement)
+    if table:
+        tables = _session_writes.get(conn)
+        if tables is not None:
+            tables.add(table)
+
+
+def _after_begin(session, transaction, connection):
+    # เก็บ set ไว้ที่ session เพราะตอน after_commit connection อาจถูกคืน pool ไปแล้ว
+    tables = set()
+    _session_writes[connection] = tables
+    session.info.setdefault("_written_tables", []).append(tables)
+
+
+def _after_commit(session):
+    tables = set()
+    for written in session.info.pop("_written_tables", []):
+        tables |= written
+    if tables:
+        for callback in list(_callbacks):
+            callback(tables)
+
+
+def _after_rollback(session):
+    session.info.pop("_written_tables", None)
+
+
+def init_app(app):
+    for target, name, fn in (
+        (Engine, "after_cursor_execute", _after_cursor_execute),
+        (Session, "after_begin", _after_begin),
+        (Session, "after_commit", _after_commit),
+        (Session, "after_rollback", _after_rollback),
+    ):
+        if not event.contains(target, name, fn):
+            event.listen(target, name, fn)
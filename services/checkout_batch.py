@@ -0,0 +1,138 @@
+# services/checkout_batch.py
+# ======================
+# Batch checkout operations
+# ======================
+# - request_assets() : ขอเบิกหลายรายการใน transaction เดียว (bulk INSERT)
+#   ครุภัณฑ์ที่มี checkout active อยู่แล้วถูก skip; ถ้าชนกันพร้อมกันจริง
+#   unique index uq_checkouts_active_asset กันไว้ -> ConflictError (409)
+# - transition()     : อนุมัติ / ปฏิเสธ / คืน หลาย id ด้วย UPDATE เดียว ตาม CHECKOUT_FLOW
+#       UPDATE checkouts SET ..., version = version + 1
+#       WHERE id IN (...) AND status = :expected [AND version = :seen]
+#   แถวที่ admin คนอื่นเปลี่ยนไปก่อนแล้วจะไม่ตรงเงื่อนไข -> ถูกรายงานว่า skipped
+#   อนุมัติ / คืน -> อัปเดต overdue_checkouts ใน transaction เดียวกัน
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Asset, Checkout
+from services import live, overdue
+from services.state_machine import CHECKOUT_FLOW, ConflictError, guarded_update, with_retry
+
+
+class BatchError(ValueError):
+    pass
+
+
+def parse_ids(values):
+    ids = []
+    for v in values:
+        try:
+            ids.append(int(v))
+        except (TypeError, ValueError):
+            raise BatchError("id ไม่ถูกต้อง: %s" % v)
+    # ตัดตัวซ้ำ คงลำดับเดิม
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise BatchError("ไม่ได้เลือกรายการ")
+    if len(ids) > current_app.config["CHECKOUT_BATCH_MAX"]:
+        raise BatchError("เลือกได้ไม่เกิน %d รายการต่อครั้ง" % current_app.config["CHECKOUT_BATCH_MAX"])
+    return ids
+
+
+def parse_versions(mapping):
+    """{"12": 3} -> {12: 3}  (version ที่ client เห็นตอนโหลดหน้า)"""
+    try:
+        return {int(k): int(v) for k, v in (mapping or {}).items()}
+    except (TypeError, ValueError, AttributeError):
+        raise BatchError("version ไม่ถูกต้อง")
+
+
+# ======================
+# REQUEST
+# ======================
+def request_assets(asset_ids, borrower_id, due_date=None):
+    """สร้างคำขอเบิกหลายรายการ คืน dict(created, skipped=ไม่พบ, busy=มี checkout active อยู่) เป็น asset_id"""
+    today = date.today()
+    if due_date is not None and due_date < today:
+        raise BatchError("วันที่คืนต้องไม่ก่อนวันนี้")
+
+    found = set(db.session.execute(
+        select(Asset.id).where(Asset.id.in_(asset_ids))
+    ).scalars())
+    # ครุภัณฑ์ที่ถูกจอง/ยืมอยู่ (อ่านผ่าน uq_checkouts_active_asset)
+    busy = set(db.session.execute(
+        select(Checkout.active_asset_id).where(Checkout.active_asset_id.in_(asset_ids))
+    ).scalars())
+    created = [a for a in asset_ids if a in found and a not in busy]
+
+    if created:
+        try:
+            db.session.execute(insert(Checkout), [
+                {
+                    "asset_id": asset_id,
+                    "borrower_id": borrower_id,
+                    "checkout_date": today,
+                    "due_date": due_date,
+                    "status": "requested",
+                }
+                for asset_id in created
+            ])
+            # id ของคำขอที่เพิ่งสร้าง (active_asset_id ชี้ checkout เดียวต่อครุภัณฑ์) -> หน้า live
+            new_ids = db.session.execute(
+                select(Checkout.id).where(Checkout.active_asset_id.in_(created)).order_by(Checkout.id)
+            ).scalars()
+            live.publish("checkout", "request", [
+                {"id": i, "status": "requested", "version": 1, "from": None} for i in new_ids
+            ])
+            db.session.commit()
+        except IntegrityError:
+            # มีคนขอครุภัณฑ์ตัวเดียวกันไปก่อนระหว่าง SELECT กับ INSERT
+            db.session.rollback()
+            raise ConflictError("ครุภัณฑ์บางรายการเพิ่งถูกขอเบิกไปแล้ว กรุณาเลือกใหม่")
+    else:
+        db.session.commit()
+    return {
+        "created": created,
+        "skipped": [a for a in asset_ids if a not in found],
+        "busy": [a for a in asset_ids if a in found and a in busy],
+    }
+
+
+# ======================
+# APPROVE / REJECT / RETURN
+# ======================
+def _changes(action, actor_id):
+    values = {}
+    if action == "approve":
+        values.update(approved_by=actor_id, approved_at=datetime.now())
+    elif action == "return":
+        values["return_date"] = date.today()
+    return values
+
+
+def _transition(action, ids, actor_id, versions, note):
+    result = guarded_update(Checkout, CHECKOUT_FLOW, action, ids, _changes(action, actor_id), versions,
+                            actor_id=actor_id, note=note)
+    # ตาราง overdue ตามทันใน transaction เดียวกัน (อนุมัติย้อนหลัง / คืนแล้ว)
+    if action == "approve":
+        overdue.track(result["changed"])
+    elif action == "return":
+        overdue.resolve(result["changed"])
+    db.session.commit()
+    return result
+
+
+def transition(action, ids, actor_id, versions=None, note=None):
+    """
+    เปลี่ยนสถานะหลายรายการแบบ set-based คืน
+        {"action", "changed": [id], "skipped": [{"id", "status", "version"}]}
+    status ของ skipped เป็น None เมื่อไม่พบรายการนั้น
+    versions: {id: version} ที่ client เห็น (ไม่ส่ง = ตรวจแค่ status)
+    note    : หมายเหตุที่เก็บใน audit log
+    """
+    if action not in CHECKOUT_FLOW:
+        raise BatchError("action ไม่ถูกต้อง: %s" % action)
+    return with_retry(_transition, action, ids, actor_id, versions, note)
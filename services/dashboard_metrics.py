@@ -0,0 +1,86 @@
+# services/dashboard_metrics.py
+# ======================
+# Dashboard metrics (grouped aggregates + TTL cache)
+# ======================
+# - นับสถานะของ assets / checkouts / tickets ใน query เดียว (GROUP BY + UNION ALL)
+# - cache ใน process ตาม DASHBOARD_CACHE_TTL วินาที
+# - commit ที่เขียนตารางเหล่านี้ -> ล้าง cache ทันที (ผ่าน change_tracking)
+# - มีแค่ thread เดียวที่คำนวณใหม่ ที่เหลือรอผลเดียวกัน
+# หมายเหตุ: การล้าง cache มีผลใน worker ที่ commit; worker อื่นหมดอายุตาม TTL
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, literal, select, union_all
+
+from extensions import db
+from models import (
+    Asset, Checkout, Ticket,
+    ASSET_STATUSES, CHECKOUT_STATUSES, TICKET_STATUSES,
+)
+from services import change_tracking
+
+WATCHED_TABLES = {"assets", "checkouts", "tickets"}
+
+_lock = threading.Lock()
+_cache = {"value": None, "expires": 0.0, "generation": 0}
+
+
+def _aggregate():
+    parts = [
+        select(literal(name).label("source"), col.label("status"), func.count().label("n"))
+        .group_by(col)
+        for name, col in (
+            ("assets", Asset.status),
+            ("checkouts", Checkout.status),
+            ("tickets", Ticket.status),
+        )
+    ]
+    rows = db.session.execute(union_all(*parts)).all()
+
+    metrics = {
+        "assets": dict.fromkeys(ASSET_STATUSES, 0),
+        "checkouts": dict.fromkeys(CHECKOUT_STATUSES, 0),
+        "tickets": dict.fromkeys(TICKET_STATUSES, 0),
+    }
+    for source, status, n in rows:
+        metrics[source][status] = n
+
+    metrics["totals"] = {k: sum(v.values()) for k, v in metrics.items()}
+    metrics["computed_at"] = time.time()
+    return metrics
+
+
+def get_metrics():
+    now = time.monotonic()
+    cached = _cache["value"]
+    if cached is not None and now < _cache["expires"]:
+        return cached
+
+    with _lock:
+        # อาจมี thread อื่นคำนวณเสร็จระหว่างรอ lock
+        if _cache["value"] is not None and time.monotonic() < _cache["expires"]:
+            return _cache["value"]
+
+        generation = _cache["generation"]
+        value = _aggregate()
+        # ถ้าถูก invalidate ระหว่างคำนวณ ก็ใช้ผลนี้ได้ แต่ไม่เก็บลง cache
+        if generation == _cache["generation"]:
+            _cache["value"] = value
+            _cache["expires"] = time.monotonic() + current_app.config["DASHBOARD_CACHE_TTL"]
+        return value
+
+
+def invalidate():
+    _cache["generation"] += 1
+    _cache["value"] = None
+    _cache["expires"] = 0.0
+
+
+def _on_commit(tables):
+    if tables & WATCHED_TABLES:
+        invalidate()
+
+
+def init_app(app):
+    change_tracking.on_commit(_on_commit)
@@ -0,0 +1,99 @@
+# services/db_routing.py
+# ======================
+# Read/write split: ส่ง read-only request ไป replica
+# ======================
+# - GET/HEAD/OPTIONS และ report job -> session.info["read_only"] = True
+# - มีการเขียน (flush / DML) ใน session -> ใช้ primary ตลอดที่เหลือของ request
+# - หลัง commit ที่มีการเขียน -> request ถัดไปของ user คนนี้อ่านจาก primary
+#   อีก DB_READ_YOUR_WRITES_SECONDS วินาที (กัน redirect หลัง POST เห็นข้อมูลเก่า)
+# replica ตั้งผ่าน Config.SQLALCHEMY_BINDS ที่ key ขึ้นต้นด้วย "replica"
+import itertools
+import threading
+import time
+
+from flask import current_app, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.sql.elements import TextClause
+
+from services.change_tracking import written_table
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+STICKY_KEY = "_primary_until"
+
+_rr_lock = threading.Lock()
+_rr_counter = itertools.count()
+
+
+def _replica_engines(engines):
+    return [engines[k] for k in sorted(k for k in engines if k and k.startswith("replica"))]
+
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    if getattr(clause, "is_dml", False):
+        return True
+    if isinstance(clause, TextClause):
+        return written_table(clause.text) is not None
+    return False
+
+
+class RoutingSession(FlaskSession):
+
+    def _use_replica(self, clause):
+        if not self.info.get("read_only") or self.info.get("wrote"):
+            return False
+        if self._flushing or self.new or self.dirty or self.deleted:
+            return False
+        if _is_write(clause):
+            self.info["wrote"] = True
+            return False
+        return True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            replicas = _replica_engines(self._db.engines)
+            if replicas:
+                with _rr_lock:
+                    n = next(_rr_counter)
+                return replicas[n % len(replicas)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def mark_read_only(session):
+    session.info["read_only"] = True
+
+
+# ======================
+# HOOKS
+# ======================
+def _after_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+def _after_commit(session):
+    if session.info.get("wrote") and has_request_context():
+        seconds = current_app.config.get("DB_READ_YOUR_WRITES_SECONDS", 0)
+        if seconds:
+            flask_session[STICKY_KEY] = time.time() + seconds
+
+
+def _route_request():
+    from extensions import db
+
+    if request.method not in SAFE_METHODS:
+        return
+    if flask_session.get(STICKY_KEY, 0) > time.time():
+        return
+    mark_read_only(db.session())
+
+
+def init_app(app):
+    # ไม่มี replica -> ไม่ต้องติดตามการเขียน และไม่ต้องเขียน _primary_until ลง cookie session
+    if not any(k and k.startswith("replica") for k in app.config.get("SQLALCHEMY_BINDS") or {}):
+        return
+    for name, fn in (("after_flush", _after_flush), ("after_commit", _after_commit)):
+        if not event.contains(RoutingSession, name, fn):
+            event.listen(RoutingSession, name, fn)
+    app.before_request(_route_request)
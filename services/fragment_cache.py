@@ -0,0 +1,96 @@
+# services/fragment_cache.py
+# ======================
+# Cache HTML ของแถวในตาราง (assets / checkouts) ต่อ worker
+# ======================
+# รายการยาว ๆ ใช้เวลาส่วนใหญ่กับการ render แถวซ้ำ ๆ ที่ไม่ได้เปลี่ยน
+#   key = (ชื่อ fragment, id, row version, role ของผู้ดู)
+#     row version = ทุกค่าที่แถวแสดง (checkout.version / asset_tag+name+status / ชื่อครุภัณฑ์ที่ join มา)
+#     แก้ข้อมูล -> version เปลี่ยน -> key ใหม่ (ไม่ต้องล้าง cache) ของเก่าหลุดออกตาม LRU
+#     role: admin เห็นปุ่มจัดการ / staff ไม่เห็น
+#   LRU จำกัดขนาดรวมที่ FRAGMENT_CACHE_MAX_BYTES (นับจาก sys.getsizeof ของ HTML)
+# แถวที่ cache ต้องไม่มีค่าที่ขึ้นกับ request / ผู้ใช้คนเดียว (เช่น CSRF token) นอกจาก role
+# ใช้ใน template:
+#   {% call cached_row("asset", a.id, (a.asset_tag, a.name, a.status)) %}<tr>...</tr>{% endcall %}
+import sys
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import current_user
+from markupsafe import Markup
+
+
+class FragmentCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._data.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        cost = sys.getsizeof(html)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= sys.getsizeof(old)
+            self._data[key] = html
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def get_cache():
+    return current_app.extensions.get("fragment_cache")
+
+
+def cached_row(name, entity_id, version, caller):
+    """Jinja global สำหรับ {% call %}: render caller() เฉพาะตอนไม่มีใน cache"""
+    cache = get_cache()
+    if cache is None:
+        return caller()
+    role = getattr(current_user, "role", None)
+    key = (name, entity_id, version, role)
+    html = cache.get(key)
+    if html is None:
+        html = str(caller())
+        cache.set(key, html)
+    return Markup(html)
+
+
+def init_app(app):
+    if app.config["FRAGMENT_CACHE_MAX_BYTES"] > 0:
+        app.extensions["fragment_cache"] = FragmentCache(app.config["FRAGMENT_CACHE_MAX_BYTES"])
+    app.add_template_global(cached_row)
@@ -0,0 +1,133 @@
+# services/http_cache.py
+# ======================
+# HTTP conditional caching (ETag / Last-Modified)
+# ======================
+# - ทุก commit ที่เขียนตารางใด (ผ่าน change_tracking) -> bump version ของตารางนั้น
+#   version = mtime (ns) ของไฟล์ <CHANGE_VERSION_DIR>/<table> ทุก gunicorn worker เห็นตรงกัน
+# - view ที่ครอบด้วย @conditional(...) สร้าง ETag จาก
+#       version ของตารางที่ใช้ + endpoint + query args + ผู้ใช้ (role/ชื่อบน navbar)
+#   ถ้าตรงกับ If-None-Match -> 304 ทันที ก่อน SELECT / render template ใด ๆ
+# หลายเครื่อง: ตั้ง CHANGE_VERSION_DIR ไปที่ storage ที่แชร์กัน
+import hashlib
+import os
+import time
+from functools import wraps
+
+from flask import current_app, request, session as flask_session
+from flask_login import current_user
+from werkzeug.http import http_date
+
+from services import change_tracking
+
+
+# ======================
+# VERSIONS
+# ======================
+def version_dir(app=None):
+    app = app or current_app
+    path = app.config.get("CHANGE_VERSION_DIR") or os.path.join(app.instance_path, "versions")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_versions(tables):
+    base = version_dir()
+    out = {}
+    for t in tables:
+        try:
+            out[t] = os.stat(os.path.join(base, t)).st_mtime_ns
+        except OSError:
+            out[t] = 0
+    return out
+
+
+def bump(tables):
+    base = version_dir()
+    now = time.time_ns()
+    for t in tables:
+        path = os.path.join(base, t)
+        try:
+            old = os.stat(path).st_mtime_ns
+        except OSError:
+            old = 0
+            open(path, "a").close()
+        # ต้องเปลี่ยนเสมอ แม้สอง commit จะอยู่ใน ns เดียวกัน
+        v = max(now, old + 1)
+        os.utime(path, ns=(v, v))
+
+
+def _on_commit(tables):
+    if current_app:
+        bump(tables)
+
+
+# ======================
+# CONDITIONAL VIEWS
+# ======================
+def _has_replicas():
+    return any(k and k.startswith("replica") for k in current_app.config.get("SQLALCHEMY_BINDS") or {})
+
+
+def compute_etag(tables, extra=()):
+    versions = get_versions(tables)
+    h = hashlib.sha256()
+    h.update(current_app.config["ETAG_SALT"].encode())
+    h.update(request.endpoint.encode())
+    h.update(repr(sorted(versions.items())).encode())
+    h.update(repr(sorted(request.args.items(multi=True))).encode())
+    if current_user.is_authenticated:
+        h.update(repr((current_user.id, current_user.role, current_user.full_name)).encode())
+    for part in extra:
+        h.update(repr(part).encode())
+    return h.hexdigest()[:32], max(versions.values(), default=0)
+
+
+def conditional(*tables):
+    """
+    decorator ของ GET view ที่ผลลัพธ์ขึ้นกับตาราง tables เท่านั้น
+        @conditional("assets", "categories", "locations")
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # หน้าที่มี flash ค้างอยู่ต้อง render ใหม่ ไม่งั้นข้อความค้างไปโผล่หน้าอื่น
+            if request.method not in ("GET", "HEAD") or flask_session.get("_flashes"):
+                return view(*args, **kwargs)
+
+            etag, newest = compute_etag(tables)
+            if newest and _has_replicas():
+                # replica อาจยังไม่เห็น commit ล่าสุด -> ไม่ผูก ETag กับข้อมูลที่อาจเก่า
+                settle = current_app.config.get("DB_READ_YOUR_WRITES_SECONDS", 0)
+                if time.time_ns() - newest < settle * 1_000_000_000:
+                    return view(*args, **kwargs)
+
+            if etag in request.if_none_match:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if newest:
+                response.headers["Last-Modified"] = http_date(newest / 1_000_000_000)
+            # ให้ browser ถามทุกครั้ง (ได้ 304 ถ้าไม่มีอะไรเปลี่ยน) และไม่แชร์ผ่าน proxy
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
+
+
+def _release_token(app):
+    # deploy ใหม่ที่แก้ template ต้องได้ ETag ใหม่ แม้ข้อมูลจะไม่เปลี่ยน
+    newest = 0
+    for root, _, files in os.walk(os.path.join(app.root_path, app.template_folder or "templates")):
+        for name in files:
+            newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return str(newest)
+
+
+def init_app(app):
+    if not app.config.get("ETAG_SALT"):
+        app.config["ETAG_SALT"] = _release_token(app)
+    change_tracking.on_commit(_on_commit)
@@ -0,0 +1,203 @@
+# services/identity_cache.py
+# ======================
+# Identity cache สำหรับ Flask-Login user_loader
+# ======================
+# เดิมทุก request ที่ login แล้วต้อง SELECT users ด้วย primary key ก่อนเข้า view
+# ตอนนี้เก็บ snapshot เล็ก ๆ (id/full_name/email/role/is_active) ไว้ใน LRU + TTL
+#   - แก้ role / is_active ผ่าน ORM -> ล้าง id นั้นหลัง commit ทันที
+#   - แจ้ง worker อื่นผ่าน mtime ของไฟล์ signal (stat ต่อ request ถูกมาก)
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from extensions import db, login_manager
+from models import User
+
+# ฟิลด์ที่ถ้าเปลี่ยนต้องล้าง cache
+WATCHED_FIELDS = ("full_name", "email", "role", "is_active")
+
+
+class CachedUser(UserMixin):
+    """snapshot ของ User ที่ current_user ใช้ (ไม่ผูกกับ session)"""
+    is_active = True
+
+    def __init__(self, id, full_name, email, role, is_active):
+        self.id = id
+        self.full_name = full_name
+        self.email = email
+        self.role = role
+        self.is_active = bool(is_active)
+
+    def get_id(self):
+        return str(self.id)
+
+    def __repr__(self):
+        return "<CachedUser %s %s>" % (self.id, self.role)
+
+
+class IdentityCache:
+    def __init__(self, max_size=1000, ttl=300, signal_path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.signal_path = signal_path
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._signal_mtime = self._read_signal()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ----- cross-worker signal -----
+    def _read_signal(self):
+        if not self.signal_path:
+            return None
+        try:
+            return os.stat(self.signal_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_signal(self):
+        mtime = self._read_signal()
+        if mtime != self._signal_mtime:
+            self._signal_mtime = mtime
+            self._data.clear()
+
+    def _broadcast(self):
+        if not self.signal_path:
+            return
+        with open(self.signal_path, "a"):
+            os.utime(self.signal_path)
+        self._signal_mtime = self._read_signal()
+
+    # ----- cache -----
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            self._check_signal()
+            entry = self._data.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[user_id]
+            self.misses += 1
+        return None
+
+    def put(self, user_id, snapshot):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_ids=None):
+        with self._lock:
+            if user_ids is None:
+                self._data.clear()
+            else:
+                for uid in user_ids:
+                    self._data.pop(uid, None)
+            self.invalidations += 1
+            self._broadcast()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def get_cache():
+    return current_app.extensions["identity_cache"]
+
+
+def snapshot(user):
+    return CachedUser(user.id, user.full_name, user.email, user.role, user.is_active)
+
+
+def load_user(user_id):
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    cache = get_cache()
+    cached = cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    row = db.session.execute(
+        db.select(User.id, User.full_name, User.email, User.role, User.is_active)
+        .where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+
+    user = CachedUser(*row)
+    cache.put(user_id, user)
+    return user
+
+
+# ======================
+# INVALIDATION
+# ======================
+def _after_flush(session, flush_context):
+    changed = set()
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in WATCHED_FIELDS):
+                changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    if changed:
+        session.info.setdefault("_identity_dirty", set()).update(changed)
+
+
+def _after_commit(session):
+    ids = session.info.pop("_identity_dirty", None)
+    if ids and current_app:
+        get_cache().invalidate(ids)
+
+
+def _after_rollback(session):
+    session.info.pop("_identity_dirty", None)
+
+
+def init_app(app):
+    signal_path = app.config.get("IDENTITY_CACHE_SIGNAL_FILE")
+    if signal_path is None:
+        os.makedirs(app.instance_path, exist_ok=True)
+        signal_path = os.path.join(app.instance_path, "identity_cache.signal")
+
+    app.extensions["identity_cache"] = IdentityCache(
+        max_size=app.config["IDENTITY_CACHE_SIZE"],
+        ttl=app.config["IDENTITY_CACHE_TTL"],
+        signal_path=signal_path or None,
+    )
+    login_manager.user_loader(load_user)
+
+    for name, fn in (
+        ("after_flush", _after_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(Session, name, fn):
+            event.listen(Session, name, fn)
@@ -0,0 +1,317 @@
+# services/live.py
+# ======================
+# Live updates ของหน้า dashboard / checkouts / tickets (Server-Sent Events)
+# ======================
+# ทางเดินของ event:
+#   publish(entity, action, rows) ใน transaction ของการเปลี่ยนแปลง
+#     -> before_commit: INSERT ลง live_events (rollback = ไม่มี event)
+#   hub (หนึ่งตัวต่อ worker) มี thread poller เดียว อ่าน live_events ที่ id > ล่าสุด
+#     ทุก LIVE_POLL_SECONDS แล้วกระจายให้ทุก client ใน process
+#     -> 1 query ต่อ worker ต่อรอบ ไม่ขึ้นกับจำนวน client / poll เฉพาะตอนมี client
+#   client แต่ละคนมีคิวจำกัด LIVE_QUEUE_SIZE: รับไม่ทันจนคิวเต็ม -> "resync" แล้วปิด stream
+#   stream ปิดเองทุก LIVE_STREAM_SECONDS; EventSource ต่อใหม่พร้อม Last-Event-ID -> อ่านย้อนจาก DB
+# id ได้มาตอน INSERT ไม่ใช่ตอน commit: transaction ที่ได้ id 10 อาจ commit หลัง id 11 ถูกอ่านไปแล้ว
+#   -> id ที่ข้ามไปเก็บเป็น "gap" แล้วอ่านซ้ำทุกรอบจนเจอหรือครบ LIVE_GAP_SECONDS (rollback = ไม่มีวันเจอ)
+#   event ที่มาช้าส่งด้วย id = cursor ปัจจุบัน (Last-Event-ID ของ browser ไม่ถอยหลัง)
+# ต้องใช้ gunicorn worker แบบ gthread (stream หนึ่งตัวถือ thread หนึ่งตัวตลอดอายุ)
+#   จำนวน stream ต่อ worker จำกัดที่ LIVE_MAX_CLIENTS (เกิน -> 503 ให้ client ถอยแล้วลองใหม่)
+# rows: [{"id", "status", "version", "from"}]  ("from" = None คือรายการใหม่)
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Response, current_app
+from sqlalchemy import delete, event, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import LiveEvent
+from services import scheduler
+
+log = logging.getLogger(__name__)
+
+RESYNC = "resync"
+
+
+def _format(event_id, name, data):
+    # resync ไม่มี id: ไม่ให้ Last-Event-ID ของ browser ถูกรีเซ็ต
+    head = "id: %d\n" % event_id if event_id is not None else ""
+    return "%sevent: %s\ndata: %s\n\n" % (head, name, data)
+
+
+class Client:
+    def __init__(self, size):
+        self.queue = queue.Queue(size)
+        self.overflow = False
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # ไม่รอ client ช้า (ไม่ให้ถ่วง client อื่น) -> ให้หน้าโหลดใหม่ทีเดียว
+            self.overflow = True
+
+
+# ======================
+# HUB (fan-out ใน process)
+# ======================
+class Hub:
+    # ตอนเริ่ม: ตรวจ id ที่หายไปย้อนหลังจาก id ล่าสุดไม่เกินเท่านี้ / จำนวน gap สูงสุดที่ติดตาม
+    START_SCAN = 200
+    MAX_GAPS = 1000
+
+    def __init__(self, app, poll, queue_size, max_clients, gap_seconds=10):
+        self.app = app
+        self.poll = poll
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self.gap_seconds = gap_seconds
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._last = None
+        self._gaps = {}   # id ที่ข้ามไป (ยังไม่ commit) -> เวลาที่เลิกรอ (monotonic)
+        self.counts = {"polls": 0, "events": 0, "late": 0, "overflows": 0, "rejected": 0}
+
+    def _read(self, stmt):
+        # app context แยก: session ใหม่ที่ไม่ถูกส่งไป replica และไม่ปนกับ session ของ request
+        with self.app.app_context():
+            return db.session.execute(stmt).all()
+
+    def _max_id(self):
+        return self._read(select(func.coalesce(func.max(LiveEvent.id), 0)))[0][0]
+
+    def _add_gaps(self, start, stop):
+        # id ใน [start, stop) ที่ยังไม่เห็น (เรียกภายใต้ self._lock)
+        deadline = time.monotonic() + self.gap_seconds
+        for missing in range(max(start, stop - self.MAX_GAPS), stop):
+            self._gaps.setdefault(missing, deadline)
+        while len(self._gaps) > self.MAX_GAPS:
+            self._gaps.pop(min(self._gaps))
+
+    def _start(self):
+        """cursor เริ่มต้น = id ล่าสุด; id ที่หายไปช่วงท้ายอาจยังไม่ commit -> เป็น gap (ภายใต้ self._lock)"""
+        self._last = self._max_id()
+        self._gaps = {}
+        low = max(0, self._last - self.START_SCAN)
+        seen = {r[0] for r in self._read(select(LiveEvent.id).where(LiveEvent.id > low))}
+        expected = low + 1
+        for event_id in sorted(seen) + [self._last + 1]:
+            self._add_gaps(expected, event_id)
+            expected = event_id + 1
+
+    def subscribe(self, last_event_id=None):
+        """คืน (client, backlog) หรือ None เมื่อ client เต็ม; backlog = None แปลว่าต้อง resync"""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                self.counts["rejected"] += 1
+                return None
+            if self._last is None or self._pid != os.getpid():
+                self._start()
+            upto = self._last
+            # gap ที่ยังรออยู่ hub จะส่งให้เองตอนเจอ -> ไม่อ่านซ้ำใน backlog
+            pending = list(self._gaps)
+            client = Client(self.queue_size)
+            self._clients.add(client)
+            self._ensure_thread()
+
+        backlog = []
+        if last_event_id is not None and last_event_id < upto:
+            stmt = select(LiveEvent).where(LiveEvent.id > last_event_id, LiveEvent.id <= upto)
+            if pending:
+                stmt = stmt.where(LiveEvent.id.not_in(pending))
+            rows = self._read(stmt.order_by(LiveEvent.id).limit(self.queue_size + 1))
+            backlog = [self._message(r[0]) for r in rows]
+            if len(backlog) > self.queue_size:
+                backlog = None
+        return client, backlog
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def _ensure_thread(self):
+        # เรียกภายใต้ self._lock / สร้างหลัง fork (thread ของ master ไม่ตามมาใน worker)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="live-hub", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll)
+            with self._lock:
+                if not self._clients:
+                    # ไม่มีใครฟังแล้ว: หยุด poll (client ถัดไปเริ่มจาก id ล่าสุดใหม่)
+                    self._thread = None
+                    self._last = None
+                    self._gaps = {}
+                    return
+            try:
+                self._poll_once()
+            except Exception:
+                log.exception("live hub poll failed")
+
+    def _poll_once(self):
+        with self._lock:
+            after = self._last
+            now = time.monotonic()
+            # รอนานเกิน -> ถือว่า rollback ไปแล้ว
+            self._gaps = {i: t for i, t in self._gaps.items() if t > now}
+            gaps = list(self._gaps)
+        cond = LiveEvent.id > after
+        if gaps:
+            cond = or_(cond, LiveEvent.id.in_(gaps))
+        rows = self._read(select(LiveEvent).where(cond).order_by(LiveEvent.id).limit(500))
+        self.counts["polls"] += 1
+        if rows:
+            self._fan_out([r[0] for r in rows])
+
+    def _fan_out(self, rows):
+        """rows เรียงตาม id: ส่วนที่ <= cursor คือ gap ที่เพิ่ง commit ส่วนที่เหลือคือ event ใหม่"""
+        messages = []
+        with self._lock:
+            for row in rows:
+                if row.id <= self._last:
+                    if self._gaps.pop(row.id, None) is None:
+                        continue
+                    self.counts["late"] += 1
+                    messages.append(self._message(row, self._last))
+                else:
+                    self._add_gaps(self._last + 1, row.id)
+                    self._last = row.id
+                    messages.append(self._message(row))
+            clients = list(self._clients)
+        self.counts["events"] += len(messages)
+        for client in clients:
+            for message in messages:
+                client.put(message)
+                if client.overflow:
+                    self.counts["overflows"] += 1
+                    break
+
+    @staticmethod
+    def _message(row, cursor=None):
+        return _format(cursor if cursor is not None else row.id, row.entity, json.dumps(
+            dict(json.loads(row.payload), action=row.action), ensure_ascii=False, separators=(",", ":")
+        ))
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, clients=len(self._clients), last_id=self._last, gaps=len(self._gaps))
+
+
+def get_hub():
+    return current_app.extensions["live_hub"]
+
+
+# ======================
+# STREAM
+# ======================
+def stream(client, backlog, lifetime, heartbeat):
+    """generator ของ text/event-stream (ไม่ใช้ DB / app context ระหว่าง stream)"""
+    hub = get_hub()
+
+    def generate():
+        # reconnect หลัง 3 วินาที (ค่าเริ่มต้นของ browser ก็ใกล้เคียง แต่ระบุไว้ให้แน่นอน)
+        yield "retry: 3000\n\n"
+        try:
+            if backlog is None:
+                yield _format(None, RESYNC, "{}")
+                return
+            for message in backlog:
+                yield message
+            deadline = time.monotonic() + lifetime
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    message = client.queue.get(timeout=min(heartbeat, remaining))
+                except queue.Empty:
+                    # comment line: กัน proxy ตัดการเชื่อมต่อที่เงียบนาน
+                    yield ": ping\n\n"
+                    continue
+                if client.overflow:
+                    yield _format(None, RESYNC, "{}")
+                    return
+                yield message
+        finally:
+            hub.unsubscribe(client)
+
+    return generate()
+
+
+def response(last_event_id=None):
+    """Response ของ /live: 503 เมื่อ stream เต็ม (client ถอยแล้วลองใหม่)"""
+    hub = get_hub()
+    sub = hub.subscribe(last_event_id)
+    if sub is None:
+        return Response("busy", status=503, headers={"Retry-After": "10"})
+    client, backlog = sub
+    cfg = current_app.config
+    resp = Response(
+        stream(client, backlog, cfg["LIVE_STREAM_SECONDS"], cfg["LIVE_HEARTBEAT_SECONDS"]),
+        mimetype="text/event-stream",
+    )
+    resp.headers["Cache-Control"] = "no-cache"
+    # nginx / proxy: ส่งทันทีไม่ buffer
+    resp.headers["X-Accel-Buffering"] = "no"
+    # client ตัดก่อน generator เริ่ม -> finally ใน generator ไม่ทำงาน
+    resp.call_on_close(lambda: hub.unsubscribe(client))
+    return resp
+
+
+# ======================
+# PUBLISH (ทาง write)
+# ======================
+def publish(entity, action, rows, session=None):
+    """เข้าคิวใน session ปัจจุบัน เขียนลง live_events ตอน commit (ไม่ commit เอง)"""
+    if not rows:
+        return
+    session = session or db.session()
+    session.info.setdefault("live_events", []).append({
+        "entity": entity,
+        "action": action,
+        "payload": json.dumps({"rows": rows}, ensure_ascii=False, separators=(",", ":")),
+        "created_at": datetime.utcnow(),
+    })
+
+
+def _before_commit(session):
+    events = session.info.pop("live_events", None)
+    if events:
+        session.execute(insert(LiveEvent), events)
+
+
+def _after_rollback(session):
+    session.info.pop("live_events", None)
+
+
+def prune():
+    """ลบ event ที่เก่ากว่า LIVE_RETENTION_SECONDS (scheduler)"""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config["LIVE_RETENTION_SECONDS"])
+    deleted = db.session.execute(delete(LiveEvent).where(LiveEvent.created_at < cutoff)).rowcount
+    db.session.commit()
+    return {"deleted": deleted}
+
+
+def init_app(app):
+    app.extensions["live_hub"] = Hub(
+        app,
+        poll=app.config["LIVE_POLL_SECONDS"],
+        queue_size=app.config["LIVE_QUEUE_SIZE"],
+        max_clients=app.config["LIVE_MAX_CLIENTS"],
+        gap_seconds=app.config["LIVE_GAP_SECONDS"],
+    )
+    scheduler.add_job(app, "live_events_prune", prune, app.config["LIVE_PRUNE_SECONDS"])
+
+    if not event.contains(Session, "before_commit", _before_commit):
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,23 @@
+# services/marks.py
+# ======================
+# ค่าสถานะของงานเบื้องหลัง (ตาราง sync_marks)
+# ======================
+# เช่น วันที่ rollup คำนวณถึง / high-water mark ของงาน scan
+#   get_mark(name)          -> (value, updated_at) หรือ (None, None)
+#   set_mark(name, value)   -> ยังไม่ commit
+from datetime import datetime
+
+from extensions import db
+from models import SyncMark
+
+
+def get_mark(name):
+    row = db.session.get(SyncMark, name)
+    if row is None:
+        return None, None
+    return row.value, row.updated_at
+
+
+def set_mark(name, value):
+    # ตั้ง updated_at เองทุกครั้ง: ค่าเดิมซ้ำ (เช่น refresh วันเดียวกัน) ก็ต้องนับว่าเปลี่ยน
+    db.session.merge(SyncMark(name=name, value=str(value), updated_at=datetime.utcnow()))
@@ -0,0 +1,169 @@
+# services/overdue.py
+# ======================
+# ตรวจ loan ที่เลยกำหนดคืน -> ตาราง overdue_checkouts
+# ======================
+# scan() (scheduler ทุก OVERDUE_SCAN_SECONDS / CLI):
+#   high-water mark "overdue.due_through" = due_date ล่าสุดที่ตรวจแล้ว
+#   แต่ละรอบอ่านเฉพาะช่วงที่เพิ่งเลยกำหนด ผ่าน idx_checkouts_status_due
+#       WHERE status = 'approved' AND due_date > :mark AND due_date < :today
+#       ORDER BY due_date, id   (keyset เป็นชุด)
+#   แล้วลบแถวที่ checkout ไม่ได้อยู่ในสถานะ approved แล้ว (เทียบเฉพาะแถวใน overdue_checkouts)
+# ทาง write ของ checkout ดูแลส่วนที่ mark ไม่ครอบคลุม (ใน transaction เดียวกัน):
+#   track()   : อนุมัติ loan ที่เลยกำหนดไปแล้ว (due_date <= mark)
+#   resolve() : คืนของ -> ลบออกทันที ไม่ต้องรอรอบถัดไป
+# อ่าน: count() / most_overdue() สำหรับ dashboard
+#   flask --app wsgi overdue scan [--full]
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import contains_eager
+
+from extensions import db
+from models import Asset, Checkout, OverdueCheckout, User
+from services import scheduler
+from services.marks import get_mark, set_mark
+
+MARK = "overdue.due_through"
+COLUMNS = (Checkout.id, Checkout.asset_id, Checkout.borrower_id, Checkout.due_date)
+
+
+def _insert_ignore(rows):
+    """INSERT แถวที่ยังไม่มี (checkout_id ซ้ำ = ข้าม)"""
+    if not rows:
+        return
+    now = datetime.utcnow()
+    for r in rows:
+        r["detected_at"] = now
+    name = db.session.get_bind(mapper=OverdueCheckout.__mapper__).dialect.name
+    if name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(OverdueCheckout)
+        stmt = stmt.on_duplicate_key_update(due_date=stmt.inserted.due_date)
+    else:
+        if name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(OverdueCheckout).on_conflict_do_nothing(index_elements=["checkout_id"])
+    db.session.execute(stmt, rows)
+
+
+def _row(r):
+    return {"checkout_id": r.id, "asset_id": r.asset_id, "borrower_id": r.borrower_id, "due_date": r.due_date}
+
+
+# ======================
+# SCAN
+# ======================
+def scan(today=None, batch_size=None, full=False):
+    """ตรวจ loan ที่เพิ่งเลยกำหนด (ถึงเมื่อวาน) คืนสถิติของรอบนี้"""
+    today = today or date.today()
+    batch_size = batch_size or current_app.config["OVERDUE_BATCH_SIZE"]
+    through = today - timedelta(days=1)
+
+    value, _ = (None, None) if full else get_mark(MARK)
+    mark = date.fromisoformat(value) if value else None
+    stats = {"due_through": through.isoformat(), "scanned": 0, "resolved": 0}
+
+    if mark is None or mark < through:
+        base = select(*COLUMNS).where(Checkout.status == "approved", Checkout.due_date <= through)
+        if mark is not None:
+            base = base.where(Checkout.due_date > mark)
+        else:
+            base = base.where(Checkout.due_date.is_not(None))
+        cursor = None
+        while True:
+            stmt = base
+            if cursor is not None:
+                # (due_date, id) > cursor แตกเป็น OR/AND ให้ MySQL ใช้ index ได้
+                stmt = stmt.where(or_(
+                    Checkout.due_date > cursor[0],
+                    and_(Checkout.due_date == cursor[0], Checkout.id > cursor[1]),
+                ))
+            rows = db.session.execute(stmt.order_by(Checkout.due_date, Checkout.id).limit(batch_size)).all()
+            if not rows:
+                break
+            cursor = (rows[-1].due_date, rows[-1].id)
+            _insert_ignore([_row(r) for r in rows])
+            stats["scanned"] += len(rows)
+            db.session.commit()
+
+    # คืน / แก้ไขผ่านทางอื่นที่ไม่ได้เรียก resolve() (ตาราง overdue มีขนาดเท่ากับจำนวนที่ค้างอยู่)
+    stale = (
+        select(OverdueCheckout.checkout_id)
+        .join(Checkout, Checkout.id == OverdueCheckout.checkout_id)
+        .where(Checkout.status != "approved")
+    )
+    stale_ids = list(db.session.execute(stale).scalars())
+    if stale_ids:
+        resolve(stale_ids)
+        stats["resolved"] = len(stale_ids)
+
+    set_mark(MARK, (through if mark is None else max(mark, through)).isoformat())
+    db.session.commit()
+    return stats
+
+
+# ======================
+# WRITE PATH (เรียกใน transaction ของ checkout, ไม่ commit)
+# ======================
+def track(checkout_ids):
+    """loan ที่เพิ่งอนุมัติแต่เลยกำหนดไปแล้ว -> เข้าตารางทันที"""
+    if not checkout_ids:
+        return
+    rows = db.session.execute(
+        select(*COLUMNS).where(
+            Checkout.id.in_(checkout_ids),
+            Checkout.status == "approved",
+            Checkout.due_date < date.today(),
+        )
+    ).all()
+    _insert_ignore([_row(r) for r in rows])
+
+
+def resolve(checkout_ids):
+    if checkout_ids:
+        db.session.execute(delete(OverdueCheckout).where(OverdueCheckout.checkout_id.in_(checkout_ids)))
+
+
+# ======================
+# READ (dashboard)
+# ======================
+def count():
+    return db.session.execute(select(func.count()).select_from(OverdueCheckout)).scalar()
+
+
+def most_overdue(limit=5):
+    """loan ที่เลยกำหนดนานที่สุด (ผ่าน idx_overdue_checkouts_due) พร้อมครุภัณฑ์ / ผู้ยืม"""
+    return (
+        db.session.query(OverdueCheckout)
+        .join(OverdueCheckout.checkout)
+        .join(Asset, Checkout.asset_id == Asset.id)
+        .join(User, Checkout.borrower_id == User.id)
+        .options(
+            contains_eager(OverdueCheckout.checkout).contains_eager(Checkout.asset),
+            contains_eager(OverdueCheckout.checkout).contains_eager(Checkout.borrower),
+        )
+        .order_by(OverdueCheckout.due_date, OverdueCheckout.checkout_id)
+        .limit(limit)
+        .all()
+    )
+
+
+
+def init_app(app):
+    scheduler.add_job(app, "overdue_scan", scan, app.config["OVERDUE_SCAN_SECONDS"])
+
+    @app.cli.group("overdue")
+    def overdue_cli():
+        """loan ที่เลยกำหนดคืน"""
+
+    @overdue_cli.command("scan")
+    @click.option("--full", is_flag=True, help="ตรวจใหม่ทั้งหมด (ไม่ใช้ high-water mark)")
+    @click.option("--batch-size", type=int, default=None)
+    def scan_cmd(full, batch_size):
+        """เพิ่ม loan ที่เพิ่งเลยกำหนดลง overdue_checkouts"""
+        stats = scan(batch_size=batch_size, full=full)
+        click.echo("due_through=%(due_through)s scanned=%(scanned)d resolved=%(resolved)d" % stats)
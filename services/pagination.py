@@ -0,0 +1,170 @@
+# services/pagination.py
+# ======================
+# Keyset (cursor) pagination
+# ======================
+# แทนที่ OFFSET/.all() ด้วยการ seek ตามคีย์ที่มี index
+# ต้นทุนต่อหน้าคงที่ไม่ว่าตารางจะใหญ่แค่ไหน
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.types import Date, DateTime
+
+from extensions import db
+
+
+@dataclass
+class Page:
+    items: list
+    page_size: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    total: int | None = None
+    total_is_estimate: bool = False
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+# ======================
+# CURSOR ENCODING
+# ======================
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, columns):
+    """คืน list ค่าคีย์ตามลำดับ columns หรือ None ถ้า cursor เสีย/ไม่ตรง"""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(columns):
+        return None
+
+    out = []
+    for col, v in zip(columns, values):
+        try:
+            if v is not None and isinstance(col.type, DateTime):
+                v = datetime.fromisoformat(v)
+            elif v is not None and isinstance(col.type, Date):
+                v = date.fromisoformat(v)
+        except (TypeError, ValueError):
+            return None
+        out.append(v)
+    return out
+
+
+# ======================
+# PAGE SIZE
+# ======================
+def get_page_size(default_key="DEFAULT_PAGE_SIZE"):
+    default = current_app.config.get(default_key) or current_app.config.get("DEFAULT_PAGE_SIZE", 50)
+    maximum = current_app.config.get("MAX_PAGE_SIZE", 200)
+    size = request.args.get("per_page", type=int) or default
+    return max(1, min(size, maximum))
+
+
+# ======================
+# SEEK PREDICATE
+# ======================
+def _seek(columns, values, descending):
+    # (a, b, c) < (x, y, z) แตกเป็น OR/AND เพื่อให้ทั้ง MySQL และ SQLite ใช้ index ได้
+    clauses = []
+    for i, col in enumerate(columns):
+        eq = [columns[j] == values[j] for j in range(i)]
+        cmp = col < values[i] if descending else col > values[i]
+        clauses.append(and_(*eq, cmp) if eq else cmp)
+    return or_(*clauses)
+
+
+def _key_of(item, columns):
+    return [getattr(item, col.key) for col in columns]
+
+
+def paginate(query, columns, page_size, after=None, before=None, descending=True):
+    """
+    query    : Query/Select ที่ใส่ filter แล้ว (ยังไม่ order_by)
+    columns  : คอลัมน์คีย์ตามลำดับ index เช่น [Asset.id] หรือ [status, created_at, id]
+    after    : cursor ของหน้าถัดไป  / before : cursor ของหน้าก่อนหน้า
+    """
+    after_vals = decode_cursor(after, columns)
+    before_vals = None if after_vals else decode_cursor(before, columns)
+
+    backwards = before_vals is not None
+    order_desc = descending != backwards
+    order = [c.desc() if order_desc else c.asc() for c in columns]
+
+    if after_vals:
+        query = query.filter(_seek(columns, after_vals, descending))
+    elif backwards:
+        query = query.filter(_seek(columns, before_vals, not descending))
+
+    # ดึงเกิน 1 แถวเพื่อรู้ว่ายังมีหน้าถัดไปหรือไม่ โดยไม่ต้อง COUNT
+    rows = query.order_by(*order).limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    page = Page(items=rows, page_size=page_size)
+    if rows:
+        first_key = _key_of(rows[0], columns)
+        last_key = _key_of(rows[-1], columns)
+        if backwards:
+            page.next_cursor = encode_cursor(last_key)
+            page.prev_cursor = encode_cursor(first_key) if has_more else None
+        else:
+            page.next_cursor = encode_cursor(last_key) if has_more else None
+            page.prev_cursor = encode_cursor(first_key) if after_vals else None
+    return page
+
+
+# ======================
+# APPROXIMATE COUNT
+# ======================
+def approximate_count(query, table_name, filtered, cap=None):
+    """
+    นับจำนวนแบบประมาณ:
+      - MySQL + ไม่มี filter -> information_schema.TABLE_ROWS (ไม่แตะตาราง)
+      - อื่น ๆ -> COUNT(*) บน subquery ที่ LIMIT ไว้ที่ cap
+    คืน (total, is_estimate)
+    """
+    cap = cap or current_app.config.get("COUNT_CAP", 10000)
+
+    if not filtered and db.engine.dialect.name == "mysql":
+        est = db.session.execute(
+            text("""
+                SELECT TABLE_ROWS
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t
+            """),
+            {"t": table_name}
+        ).scalar()
+        if est is not None:
+            return int(est), True
+
+    capped = query.order_by(None).limit(cap + 1).subquery()
+    total = db.session.execute(select(func.count()).select_from(capped)).scalar() or 0
+    if total > cap:
+        return cap, True
+    return total, False
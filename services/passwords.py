@@ -0,0 +1,122 @@
+# services/passwords.py
+# ======================
+# Password hashing (กิน CPU) แบบมีขอบเขต
+# ======================
+# - พารามิเตอร์ hash มาจาก Config.PASSWORD_HASH_METHOD / PASSWORD_SALT_LENGTH
+# - hash / verify รันใน thread pool ขนาด PASSWORD_HASH_WORKERS
+#   งานที่รอเกิน PASSWORD_HASH_MAX_PENDING -> HashingBusy ทันที (ไม่ให้ login แย่ง CPU ทุก route)
+# - needs_rehash() บอกว่า hash เดิมใช้พารามิเตอร์เก่า -> login สำเร็จแล้ว hash ใหม่ให้
+# - stats() : จำนวนครั้งและเวลาที่ใช้ hash
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingBusy(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, method, salt_length, workers, max_pending):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._prefix = None
+        self._dummy = None
+        self._stats_lock = threading.Lock()
+        self.counts = {"hash": 0, "verify": 0, "busy": 0}
+        self.seconds = {"hash": 0.0, "verify": 0.0}
+        self.max_seconds = 0.0
+
+    def _executor(self):
+        # สร้างตอนใช้ครั้งแรก (หลัง gunicorn fork แล้ว)
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pw-hash")
+            return self._pool
+
+    def _timed(self, kind, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.counts[kind] += 1
+                self.seconds[kind] += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def _run(self, kind, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.counts["busy"] += 1
+            raise HashingBusy("password hashing queue is full")
+        try:
+            return self._executor().submit(self._timed, kind, fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _generate(self, password):
+        return generate_password_hash(password, method=self.method, salt_length=self.salt_length)
+
+    def hash(self, password):
+        return self._run("hash", self._generate, password)
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            # user ไม่มีอยู่จริง: ยัง hash เท่าเดิม เวลาตอบจะได้ไม่บอกว่า email มีในระบบหรือไม่
+            pwhash = self._dummy_hash()
+            self._run("verify", check_password_hash, pwhash, password)
+            return False
+        return self._run("verify", check_password_hash, pwhash, password)
+
+    def _dummy_hash(self):
+        if self._dummy is None:
+            self._dummy = self._generate("dummy-password")
+        return self._dummy
+
+    def needs_rehash(self, pwhash):
+        if self._prefix is None:
+            # werkzeug เติมค่า default ให้ method (เช่น "scrypt" -> "scrypt:32768:8:1")
+            self._prefix = self._dummy_hash().split("$", 1)[0]
+        return pwhash.split("$", 1)[0] != self._prefix
+
+    def stats(self):
+        with self._stats_lock:
+            total = self.counts["hash"] + self.counts["verify"]
+            spent = self.seconds["hash"] + self.seconds["verify"]
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "counts": dict(self.counts),
+                "seconds": {k: round(v, 4) for k, v in self.seconds.items()},
+                "avg_ms": round(spent * 1000 / total, 2) if total else 0.0,
+                "max_ms": round(self.max_seconds * 1000, 2),
+            }
+
+
+def get_hasher():
+    return current_app.extensions["password_hasher"]
+
+
+def hash_password(password):
+    return get_hasher().hash(password)
+
+
+def verify_password(pwhash, password):
+    return get_hasher().verify(pwhash, password)
+
+
+def init_app(app):
+    app.extensions["password_hasher"] = PasswordHasher(
+        method=app.config["PASSWORD_HASH_METHOD"],
+        salt_length=app.config["PASSWORD_SALT_LENGTH"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_pending=app.config["PASSWORD_HASH_MAX_PENDING"],
+    )
@@ -0,0 +1,94 @@
+# services/pdf_render.py
+# ======================
+# ReportLab rendering (รันใน worker process)
+# ======================
+# โมดูลนี้ต้องไม่ import Flask/DB เพราะถูก import ใหม่ในทุก process ของ pool
+from io import BytesIO
+
+TOP_MARGIN = 50
+BOTTOM_MARGIN = 60
+ROW_HEIGHT = 13
+
+
+def rows_per_page(first_page):
+    from reportlab.lib.pagesizes import A4
+
+    _, height = A4
+    # หน้าแรกมีหัวรายงาน (title 20 + generated 25 + header 15)
+    y = height - TOP_MARGIN - (60 if first_page else 0)
+    return int((y - BOTTOM_MARGIN) // ROW_HEIGHT) + 1
+
+
+def split_pages(rows, pages_per_chunk):
+    """แบ่ง rows เป็นก้อนตามขอบหน้า เพื่อให้ผลที่ merge แล้วเหมือน render ทีเดียว"""
+    chunks = []
+    first = rows_per_page(True)
+    other = rows_per_page(False)
+
+    size = first + other * (pages_per_chunk - 1)
+    chunks.append(rows[:size])
+    start = size
+    size = other * pages_per_chunk
+    while start < len(rows):
+        chunks.append(rows[start:start + size])
+        start += size
+    return chunks
+
+
+def render_chunk(rows, first_chunk, generated_at):
+    """
+    rows : list ของ (id, asset_tag, name, category, status)
+    คืน bytes ของ PDF สำหรับก้อนนี้
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    y = height - TOP_MARGIN
+    if first_chunk:
+        c.setFont("Helvetica", 14)
+        c.drawString(50, y, "IT Assets Report")
+        y -= 20
+
+        c.setFont("Helvetica", 10)
+        c.drawString(50, y, "Generated: " + generated_at)
+        y -= 25
+
+        c.setFont("Helvetica", 9)
+        c.drawString(50, y, "id")
+        c.drawString(80, y, "asset_tag")
+        c.drawString(160, y, "name")
+        c.drawString(330, y, "category")
+        c.drawString(420, y, "status")
+        y -= 15
+
+    c.setFont("Helvetica", 9)
+    for asset_id, asset_tag, name, category, status in rows:
+        if y < BOTTOM_MARGIN:
+            c.showPage()
+            y = height - TOP_MARGIN
+            c.setFont("Helvetica", 9)
+
+        c.drawString(50, y, str(asset_id))
+        c.drawString(80, y, asset_tag[:12])
+        c.drawString(160, y, name[:28])
+        c.drawString(330, y, category[:15])
+        c.drawString(420, y, status)
+        y -= ROW_HEIGHT
+
+    c.save()
+    return buffer.getvalue()
+
+
+def merge_pdfs(parts, out_path):
+    """รวม PDF หลายก้อนเป็นไฟล์เดียว (ต้องมี pypdf)"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(BytesIO(part))
+    with open(out_path, "wb") as f:
+        writer.write(f)
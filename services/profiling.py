@@ -0,0 +1,154 @@
+# services/profiling.py
+# ======================
+# Profiling ต่อ request (เปิดด้วย PROFILING_ENABLED=1)
+# ======================
+# เวลาที่จับได้ของแต่ละ request:
+#   db    : รวมเวลา statement ทั้งหมด (before/after_cursor_execute)
+#   tpl   : รวมเวลา render template (signal before_render_template -> template_rendered)
+#   app   : ที่เหลือของ view (Python / serialization)
+#   total : ตั้งแต่ before_request แรกถึง after_request สุดท้าย
+# -> ส่งออกใน header  Server-Timing: db;dur=12.3;desc="4 queries", tpl;dur=..., app;dur=..., total;dur=...
+#    (DevTools > Network > Timing แสดงให้เลย)
+# request ที่ total >= SLOW_REQUEST_MS -> log warning พร้อม statement ที่ใช้เวลามากที่สุด
+# สุ่ม PROFILE_SAMPLE_RATE ของ request ผ่าน cProfile -> PROFILE_DIR/<เวลา>-<endpoint>-<ms>.prof
+#   ดูด้วย: python -m pstats <ไฟล์>  หรือ snakeviz
+# response แบบ stream (export CSV / live) วัดถึงตอนคืน Response เท่านั้น ไม่รวมช่วงส่ง body
+import cProfile
+import os
+import random
+import time
+from datetime import datetime
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestProfile:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.statements = {}   # statement -> [count, seconds]
+        self.templates = 0.0
+        self._render_start = []
+        self.profiler = None
+
+
+def _current():
+    return g.get("_profile") if has_request_context() else None
+
+
+# ======================
+# SQL
+# ======================
+# เวลาเริ่มเก็บบน ExecutionContext (อายุเท่ากับ statement นั้น) ไม่ใช่ conn.info ของ pool:
+# statement ที่ error ไม่มี after_cursor_execute -> ค่าที่ค้างหายไปพร้อม context ไม่ติดไป request ถัดไป
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current() is not None:
+        context._profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    prof = _current()
+    start = getattr(context, "_profile_start", None)
+    if prof is None or start is None:
+        return
+    elapsed = time.perf_counter() - start
+    prof.db += elapsed
+    prof.queries += 1
+    entry = prof.statements.setdefault(statement, [0, 0.0])
+    entry[0] += 1
+    entry[1] += elapsed
+
+
+# ======================
+# TEMPLATES
+# ======================
+def _before_render(sender, template, context, **extra):
+    prof = _current()
+    if prof is not None:
+        prof._render_start.append(time.perf_counter())
+
+
+def _rendered(sender, template, context, **extra):
+    prof = _current()
+    if prof is not None and prof._render_start:
+        start = prof._render_start.pop()
+        # render ซ้อนกัน (render_template ภายใน template) นับเฉพาะชั้นนอก
+        if not prof._render_start:
+            prof.templates += time.perf_counter() - start
+
+
+# ======================
+# REQUEST HOOKS
+# ======================
+def _start_request():
+    prof = g._profile = RequestProfile()
+    rate = current_app.config["PROFILE_SAMPLE_RATE"]
+    if rate > 0 and random.random() < rate:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # มี profiler ตัวอื่นทำงานอยู่ใน thread นี้แล้ว -> ข้าม sample นี้
+            return
+        prof.profiler = profiler
+
+
+def _finish_request(response):
+    prof = g.pop("_profile", None)
+    if prof is None:
+        return response
+    if prof.profiler is not None:
+        prof.profiler.disable()
+    total = time.perf_counter() - prof.start
+    cfg = current_app.config
+
+    if cfg["PROFILE_SERVER_TIMING"]:
+        app_time = max(0.0, total - prof.db - prof.templates)
+        response.headers.add("Server-Timing", ", ".join([
+            'db;dur=%.1f;desc="%d queries"' % (prof.db * 1000, prof.queries),
+            "tpl;dur=%.1f" % (prof.templates * 1000),
+            "app;dur=%.1f" % (app_time * 1000),
+            "total;dur=%.1f" % (total * 1000),
+        ]))
+
+    if total * 1000 >= cfg["SLOW_REQUEST_MS"]:
+        _log_slow(prof, total, cfg["SLOW_REQUEST_TOP_STATEMENTS"])
+
+    if prof.profiler is not None:
+        _dump(prof.profiler, total)
+    return response
+
+
+def _log_slow(prof, total, top):
+    lines = [
+        "slow request %s %s -> %.0f ms (db %.0f ms / %d queries, tpl %.0f ms)" % (
+            request.method, request.full_path.rstrip("?"), total * 1000,
+            prof.db * 1000, prof.queries, prof.templates * 1000)
+    ]
+    ranked = sorted(prof.statements.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    for statement, (count, seconds) in ranked:
+        lines.append("  %7.1f ms  x%-3d %s" % (seconds * 1000, count, " ".join(statement.split())[:300]))
+    current_app.logger.warning("\n".join(lines))
+
+
+def _dump(profiler, total):
+    directory = current_app.config["PROFILE_DIR"] or os.path.join(current_app.instance_path, "profiles")
+    os.makedirs(directory, exist_ok=True)
+    name = "%s-%s-%dms.prof" % (
+        datetime.utcnow().strftime("%Y%m%dT%H%M%S%f"), request.endpoint or "unknown", total * 1000)
+    profiler.dump_stats(os.path.join(directory, name))
+
+
+def init_app(app):
+    if not app.config["PROFILING_ENABLED"]:
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,137 @@
+# services/query_budget.py
+# ======================
+# N+1 detector / query budget ต่อ request
+# ======================
+# นับ statement ทุกตัวผ่าน before_cursor_execute แล้วตรวจตอนจบ request:
+#   - จำนวนรวมเกิน budget ของ view       -> log warning
+#     (ค่าเริ่มต้น: QUERY_BUDGET_DEFAULT สำหรับ GET, QUERY_BUDGET_WRITE สำหรับคำขอที่เขียนข้อมูล)
+#   - statement เดียวกันซ้ำเกิน threshold -> น่าจะเป็น N+1 (lazy load ต่อแถว)
+# ตั้ง QUERY_BUDGET_RAISE = True (เช่นตอนเทส) เพื่อให้ raise แทนการ log
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """decorator: กำหนด budget ของ view นี้แทนค่าเริ่มต้น (None = ไม่ตรวจ)"""
+    def decorator(view):
+        view._query_budget = limit
+        return view
+    return decorator
+
+
+# ======================
+# COUNTING
+# ======================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        stats = g.get("_query_stats")
+        if stats is not None:
+            stats[statement] += 1
+
+    for counter in _active_counters:
+        counter[statement] += 1
+
+
+_active_counters = []
+
+
+@contextmanager
+def count_queries():
+    """
+    นับ statement ในบล็อก (ใช้ในเทส/benchmark)
+        with count_queries() as stats:
+            client.get("/checkouts/")
+        sum(stats.values())
+    """
+    stats = Counter()
+    _active_counters.append(stats)
+    try:
+        yield stats
+    finally:
+        _active_counters.remove(stats)
+
+
+def assert_queries_constant(client, url, add_rows, slack=0, warm=True):
+    """
+    ยิง url สองครั้ง โดยเพิ่มข้อมูลด้วย add_rows() ระหว่างกลาง
+    ถ้าจำนวน query เพิ่มตามจำนวนแถว -> QueryBudgetExceeded
+    warm: ยิงหนึ่งครั้งก่อนนับทุกรอบ (cache ที่ถูกล้างเพราะ add_rows ไม่ถูกนับเป็นส่วนต่าง)
+    """
+    if warm:
+        client.get(url)
+    with count_queries() as before:
+        client.get(url)
+    add_rows()
+    if warm:
+        client.get(url)
+    with count_queries() as after:
+        client.get(url)
+
+    n_before, n_after = sum(before.values()), sum(after.values())
+    if n_after > n_before + slack:
+        grown = [s for s in after if after[s] > before.get(s, 0)]
+        raise QueryBudgetExceeded(
+            "%s: %d -> %d queries after adding rows; growing statements:\n%s"
+            % (url, n_before, n_after, "\n".join(grown[:3]))
+        )
+    return n_before, n_after
+
+
+# ======================
+# REQUEST HOOKS
+# ======================
+def _start_request():
+    g._query_stats = Counter()
+
+
+def _check_request(response):
+    stats = g.pop("_query_stats", None)
+    if not stats:
+        return response
+
+    cfg = current_app.config
+    view = current_app.view_functions.get(request.endpoint)
+    default = cfg["QUERY_BUDGET_DEFAULT"] if request.method in READ_METHODS else cfg["QUERY_BUDGET_WRITE"]
+    budget = getattr(view, "_query_budget", default)
+    if budget is None:
+        # view ที่จำนวน query ขึ้นกับขนาดงานโดยตั้งใจ (เช่น bulk import ทีละ batch)
+        return response
+    total = sum(stats.values())
+
+    problems = []
+    if total > budget:
+        problems.append("%d queries (budget %d)" % (total, budget))
+
+    statement, repeats = stats.most_common(1)[0]
+    if repeats >= cfg["QUERY_BUDGET_REPEAT_THRESHOLD"]:
+        problems.append(
+            "possible N+1: statement repeated %d times: %s"
+            % (repeats, " ".join(statement.split())[:200])
+        )
+
+    if problems:
+        message = "%s %s -> %s" % (request.method, request.endpoint, "; ".join(problems))
+        if cfg["QUERY_BUDGET_RAISE"]:
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+    return response
+
+
+def init_app(app):
+    if not app.config.get("QUERY_BUDGET_ENABLED", True):
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_check_request)
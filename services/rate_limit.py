@@ -0,0 +1,77 @@
+# services/rate_limit.py
+# ======================
+# Token bucket rate limiter (ใน process)
+# ======================
+# bucket ละ key (เช่น IP หรือ email)
+#   capacity : จำนวนครั้งที่ทำติดกันได้
+#   per      : วินาทีที่ใช้เติมจนเต็ม capacity
+# จำกัดจำนวน key ด้วย max_keys (ทิ้ง bucket ที่เต็มแล้ว = เหมือนไม่เคยใช้)
+# หมายเหตุ: แต่ละ gunicorn worker มี bucket ของตัวเอง -> limit จริง ≈ capacity x workers
+import threading
+import time
+
+from flask import current_app
+
+
+class TokenBucketLimiter:
+    def __init__(self, capacity, per, max_keys=10000):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / float(per)
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _level(self, key, now):
+        tokens, stamp = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - stamp) * self.rate)
+
+    def _prune(self, now):
+        full = [k for k in self._buckets if self._level(k, now) >= self.capacity]
+        for k in full:
+            del self._buckets[k]
+        # ยังเกิน (โดนยิงจากหลาย key มาก) -> ทิ้งที่เก่าที่สุด
+        if len(self._buckets) >= self.max_keys:
+            oldest = sorted(self._buckets, key=lambda k: self._buckets[k][1])
+            for k in oldest[:len(self._buckets) - self.max_keys + 1]:
+                del self._buckets[k]
+
+    def retry_after(self, key):
+        with self._lock:
+            level = self._level(key, time.monotonic())
+        return 0.0 if level >= 1 else (1 - level) / self.rate
+
+    def hit(self, key):
+        """ใช้ 1 token ของ key ถ้าหมด -> False"""
+        now = time.monotonic()
+        with self._lock:
+            level = self._level(key, now)
+            if level < 1:
+                self.rejected += 1
+                return False
+            if key not in self._buckets and len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            self._buckets[key] = (level - 1, now)
+            return True
+
+    def refund(self, key):
+        """คืน 1 token (ครั้งที่ hit ไปแล้วแต่ไม่นับ เช่น ตรวจรหัสผ่านไม่ได้เพราะระบบยุ่ง)"""
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                self._buckets[key] = (min(self.capacity, self._level(key, now) + 1), now)
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+def login_limiters():
+    return current_app.extensions["login_limiters"]
+
+
+def init_app(app):
+    app.extensions["login_limiters"] = {
+        "ip": TokenBucketLimiter(*app.config["LOGIN_LIMIT_PER_IP"]),
+        "email": TokenBucketLimiter(*app.config["LOGIN_LIMIT_PER_EMAIL"]),
+    }
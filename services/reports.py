@@ -0,0 +1,209 @@
+# services/reports.py
+# ======================
+# Background report jobs (PDF export)
+# ======================
+# - submit_asset_report() คืน job_id ทันที งานจริงรันใน thread พื้นหลัง
+# - การ render แบ่งเป็นก้อนตามหน้า แล้วส่งเข้า process pool (ReportLab กิน CPU)
+# - ผลลัพธ์เก็บเป็นไฟล์บน disk ตั้งชื่อตาม hash ของข้อมูล -> ข้อมูลเดิม = ไม่ต้อง render ใหม่
+# - สถานะ job เก็บเป็นไฟล์ JSON เพื่อให้ gunicorn worker ตัวไหนก็ poll ได้
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from extensions import db
+from services import pdf_render
+from services.db_routing import mark_read_only
+
+log = logging.getLogger(__name__)
+
+# เปลี่ยนเลขนี้เมื่อ layout ของ PDF เปลี่ยน เพื่อไม่ให้เสิร์ฟไฟล์ cache เก่า
+REPORT_LAYOUT_VERSION = "1"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_lock = threading.Lock()
+_process_pool = None
+_dispatcher = None
+
+
+def _pools(app):
+    global _process_pool, _dispatcher
+    with _lock:
+        if _process_pool is None:
+            # spawn: ไม่ fork process ที่มี thread/DB connection ค้างอยู่
+            ctx = multiprocessing.get_context("spawn")
+            _process_pool = ProcessPoolExecutor(
+                max_workers=app.config["REPORT_WORKERS"], mp_context=ctx
+            )
+            _dispatcher = ThreadPoolExecutor(
+                max_workers=app.config["REPORT_MAX_CONCURRENT_JOBS"],
+                thread_name_prefix="report-job"
+            )
+    return _process_pool, _dispatcher
+
+
+def shutdown():
+    """ปิด pool ของ worker นี้ (เรียกจาก gunicorn worker_exit) งานที่ยังไม่เริ่มถูกยกเลิก"""
+    global _process_pool, _dispatcher
+    with _lock:
+        if _dispatcher is not None:
+            _dispatcher.shutdown(wait=False, cancel_futures=True)
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = _dispatcher = None
+
+
+# ======================
+# STORAGE
+# ======================
+def report_dir(app=None):
+    app = app or current_app
+    path = app.config.get("REPORT_DIR") or os.path.join(app.instance_path, "reports")
+    os.makedirs(os.path.join(path, "jobs"), exist_ok=True)
+    return path
+
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _job_path(base, job_id):
+    return os.path.join(base, "jobs", job_id + ".json")
+
+
+def get_job(job_id):
+    # job_id มาจาก URL -> ตรวจรูปแบบก่อนแตะ filesystem
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+    path = _job_path(report_dir(), job_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def artifact_path(job):
+    return os.path.join(report_dir(), job["artifact"])
+
+
+def _update_job(base, job, **changes):
+    job.update(changes, updated_at=time.time())
+    _write_json(_job_path(base, job["id"]), job)
+
+
+def _prune(base, max_age):
+    cutoff = time.time() - max_age
+    for folder in (base, os.path.join(base, "jobs")):
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# ======================
+# SUBMIT
+# ======================
+def submit_asset_report(filters, fetch_rows):
+    """
+    filters    : dict filter เดียวกับหน้า list (ใช้เป็นส่วนหนึ่งของ cache key)
+    fetch_rows : callable(filters) -> iterable ของ batch rows (รันใน app context ของ thread)
+    """
+    app = current_app._get_current_object()
+    base = report_dir(app)
+    _prune(base, app.config["REPORT_CACHE_MAX_AGE"])
+
+    job = {
+        "id": str(uuid.uuid4()),
+        "kind": "assets_pdf",
+        "status": JOB_QUEUED,
+        "filters": filters,
+        "artifact": None,
+        "cached": False,
+        "error": None,
+        "created_at": time.time(),
+    }
+    _update_job(base, job)
+
+    _, dispatcher = _pools(app)
+    dispatcher.submit(_run_job, app, base, job, fetch_rows)
+    return job["id"]
+
+
+def _run_job(app, base, job, fetch_rows):
+    try:
+        with app.app_context():
+            _update_job(base, job, status=JOB_RUNNING)
+            mark_read_only(db.session())
+
+            # อ่านข้อมูลครั้งเดียว แล้ว hash ไปพร้อมกัน -> data version
+            digest = hashlib.sha256()
+            digest.update(REPORT_LAYOUT_VERSION.encode())
+            digest.update(json.dumps(job["filters"], sort_keys=True).encode())
+            rows = []
+            for batch in fetch_rows(job["filters"]):
+                for r in batch:
+                    row = (r.id, r.asset_tag, r.name, r.category, r.status)
+                    digest.update(repr(row).encode("utf-8"))
+                    rows.append(row)
+
+            artifact = "assets-%s.pdf" % digest.hexdigest()[:32]
+            out_path = os.path.join(base, artifact)
+
+            if os.path.exists(out_path):
+                os.utime(out_path)
+                _update_job(base, job, status=JOB_DONE, artifact=artifact, cached=True)
+                return
+
+            _render(app, rows, out_path)
+            _update_job(base, job, status=JOB_DONE, artifact=artifact)
+    except Exception as e:
+        log.exception("report job %s failed", job["id"])
+        _update_job(base, job, status=JOB_FAILED, error=str(e))
+
+
+def _render(app, rows, out_path):
+    process_pool, _ = _pools(app)
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+    chunks = pdf_render.split_pages(rows, app.config["REPORT_PAGES_PER_CHUNK"])
+
+    tmp = out_path + ".%s.tmp" % uuid.uuid4().hex
+    if len(chunks) == 1 or not _can_merge():
+        # ก้อนเดียว (หรือไม่มี pypdf) -> render ทีเดียวใน pool
+        data = process_pool.submit(pdf_render.render_chunk, rows, True, generated_at).result()
+        with open(tmp, "wb") as f:
+            f.write(data)
+    else:
+        futures = [
+            process_pool.submit(pdf_render.render_chunk, chunk, i == 0, generated_at)
+            for i, chunk in enumerate(chunks)
+        ]
+        pdf_render.merge_pdfs([f.result() for f in futures], tmp)
+    os.replace(tmp, out_path)
+
+
+def _can_merge():
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        return False
+    return True
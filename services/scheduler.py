@@ -0,0 +1,198 @@
+# services/scheduler.py
+# ======================
+# Scheduler ในตัว app (งานเบื้องหลังตามรอบเวลา)
+# ======================
+# - ทุก worker มี thread ของตัวเอง แต่มีแค่ worker ที่ถือ leader lease เท่านั้นที่รันงาน
+#     lease = แถวใน scheduler_leases (owner, expires_at) ต่ออายุทุก SCHEDULER_TICK_SECONDS
+#     worker ที่ถือ lease ตาย -> lease หมดอายุใน SCHEDULER_LEASE_SECONDS แล้ว worker อื่นรับช่วง
+#     ใช้ DB เป็นตัวกลาง จึงใช้ได้ทั้งหลาย worker และหลายเครื่อง (นาฬิกาแต่ละเครื่องควรตรงกัน)
+# - เวลารันล่าสุดของแต่ละงานเก็บใน sync_marks ("job.<name>") -> leader ใหม่ไม่รันซ้ำทันที
+# - service อื่นลงทะเบียนงานด้วย add_job(name, fn, interval) ใน init_app ของตัวเอง
+#   fn ถูกเรียกใน app context และต้อง commit เอง
+# เริ่ม thread: gunicorn post_fork / python app.py (ไม่เริ่มตอน import หรือ flask CLI)
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import SchedulerLease
+from services.marks import get_mark, set_mark
+
+log = logging.getLogger(__name__)
+
+LEASE = "scheduler"
+
+
+class Job:
+    def __init__(self, name, fn, interval):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.last_run = None
+
+    @property
+    def mark(self):
+        return "job.%s" % self.name
+
+    def due(self, now):
+        return self.last_run is None or now - self.last_run >= timedelta(seconds=self.interval)
+
+
+class Scheduler:
+    def __init__(self, app, tick, lease_seconds, enabled=True):
+        self.app = app
+        self.tick = tick
+        self.lease_seconds = lease_seconds
+        self.enabled = enabled
+        self.jobs = {}
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def owner(self):
+        return "%s:%d" % (socket.gethostname(), os.getpid())
+
+    def add_job(self, name, fn, interval):
+        if interval and interval > 0:
+            self.jobs[name] = Job(name, fn, interval)
+
+    # ----------------------
+    # THREAD
+    # ----------------------
+    def start(self):
+        # เรียกหลัง fork (thread ของ master ไม่ตามมาใน worker)
+        if not self.enabled or not self.jobs:
+            return
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.tick + 5)
+        if self.is_leader:
+            # คืน lease ทันที worker อื่นไม่ต้องรอหมดอายุ
+            with self.app.app_context():
+                self._release()
+
+    def _run(self):
+        # รอบแรกหน่วงเล็กน้อย ไม่แย่ง DB กับ request แรก ๆ หลัง boot
+        while not self._stop.wait(self.tick):
+            with self.app.app_context():
+                try:
+                    self.run_pending()
+                except Exception:
+                    db.session.rollback()
+                    log.exception("scheduler tick failed")
+
+    # ----------------------
+    # LEADER LEASE
+    # ----------------------
+    def _acquire(self):
+        now = datetime.utcnow()
+        values = {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lease_seconds)}
+        result = db.session.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == LEASE,
+                   or_(SchedulerLease.owner == self.owner, SchedulerLease.expires_at < now))
+            .values(values)
+        )
+        if result.rowcount == 0:
+            try:
+                db.session.execute(insert(SchedulerLease).values(name=LEASE, **values))
+            except IntegrityError:
+                # มี leader ที่ lease ยังไม่หมดอายุ
+                db.session.rollback()
+                return False
+        db.session.commit()
+        return True
+
+    def _release(self):
+        db.session.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == LEASE, SchedulerLease.owner == self.owner)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.session.commit()
+        self.is_leader = False
+
+    # ----------------------
+    # RUN
+    # ----------------------
+    def run_pending(self):
+        """หนึ่งรอบ: ต่อ/ขอ lease แล้วรันงานที่ถึงเวลา คืนชื่องานที่รัน"""
+        leader = self._acquire()
+        if leader and not self.is_leader:
+            # เพิ่งได้เป็น leader: อ่านเวลารันล่าสุดที่ leader คนก่อนทิ้งไว้
+            for job in self.jobs.values():
+                value, _ = get_mark(job.mark)
+                job.last_run = datetime.fromisoformat(value) if value else None
+        self.is_leader = leader
+        if not leader:
+            return []
+
+        ran = []
+        for job in self.jobs.values():
+            now = datetime.utcnow()
+            if not job.due(now):
+                continue
+            # งานยาว: ต่อ lease ก่อนเริ่มแต่ละงาน
+            if not self._acquire():
+                self.is_leader = False
+                break
+            self.run_job(job.name, now)
+            ran.append(job.name)
+        return ran
+
+    def run_job(self, name, now=None):
+        job = self.jobs[name]
+        now = now or datetime.utcnow()
+        try:
+            result = job.fn()
+        except Exception:
+            db.session.rollback()
+            log.exception("scheduled job %s failed", name)
+            result = None
+        # ล้มเหลวก็เลื่อนไปรอบถัดไป (ไม่วนรันถี่ ๆ ตอน DB มีปัญหา)
+        job.last_run = now
+        set_mark(job.mark, now.isoformat(timespec="seconds"))
+        db.session.commit()
+        log.info("scheduled job %s: %s", name, result)
+        return result
+
+
+def get_scheduler():
+    return current_app.extensions["scheduler"]
+
+
+def add_job(app, name, fn, interval):
+    app.extensions["scheduler"].add_job(name, fn, interval)
+
+
+def init_app(app):
+    scheduler = Scheduler(
+        app,
+        tick=app.config["SCHEDULER_TICK_SECONDS"],
+        lease_seconds=app.config["SCHEDULER_LEASE_SECONDS"],
+        enabled=app.config["SCHEDULER_ENABLED"],
+    )
+    app.extensions["scheduler"] = scheduler
+
+    @app.cli.command("scheduler-run")
+    def scheduler_run_cmd():
+        """รันทุกงานที่ลงทะเบียนไว้หนึ่งครั้ง (ไม่สน leader lease)"""
+        for name in scheduler.jobs:
+            click.echo("%s: %s" % (name, scheduler.run_job(name)))
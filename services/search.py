@@ -0,0 +1,379 @@
+# services/search.py
+# ======================
+# Asset search (Thai + English)
+# ======================
+# - asset_tag : ค้นแบบ prefix ด้วย range scan (ใช้ uq_assets_asset_tag ได้)
+# - name      : MySQL -> FULLTEXT ... WITH PARSER ngram
+#               SQLite -> ตาราง trigram ของเราเอง (asset_search_trigrams)
+# ภาษาไทยไม่มีช่องว่างระหว่างคำ จึงตัดเป็น n-gram ระดับตัวอักษรแทนการตัดคำ
+import unicodedata
+from contextlib import contextmanager
+
+import click
+from flask import current_app
+from sqlalchemy import MetaData, Table, Column, Integer, String, event, func, literal, select, text, union_all
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Asset, Checkout
+
+NGRAM = 3
+CANDIDATE_FACTOR = 5
+
+TAG_EXACT_SCORE = 100.0
+TAG_PREFIX_SCORE = 50.0
+NAME_SCORE = 40.0
+
+
+# ======================
+# TOKENIZER
+# ======================
+def normalize(value):
+    value = unicodedata.normalize("NFKC", value or "").casefold()
+    return " ".join(value.split())
+
+
+def ngrams(value, n=NGRAM):
+    """ตัดเป็น character n-gram หลัง normalize (ใช้ได้ทั้งไทยและอังกฤษ)"""
+    value = normalize(value)
+    if len(value) < n:
+        return set()
+    return {value[i:i + n] for i in range(len(value) - n + 1)}
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _tag_prefix_hits(q, limit):
+    # asset_tag >= q AND asset_tag < q + U+FFFF  -> range scan บน unique index
+    # (SQLite เทียบแบบ case-sensitive จึงลองตัวพิมพ์ใหญ่ด้วย เพราะ tag ส่วนใหญ่เป็นตัวพิมพ์ใหญ่)
+    prefixes = {q, q.upper()}
+    ranges = [db.and_(Asset.asset_tag >= p, Asset.asset_tag < p + "\uffff") for p in prefixes]
+    rows = db.session.execute(
+        select(Asset.id, Asset.asset_tag)
+        .where(db.or_(*ranges))
+        .order_by(Asset.asset_tag)
+        .limit(limit)
+    ).all()
+    return {
+        r.id: TAG_EXACT_SCORE if r.asset_tag.casefold() == q.casefold() else TAG_PREFIX_SCORE
+        for r in rows
+    }
+
+
+# ======================
+# BACKENDS
+# ======================
+class SearchBackend:
+    """คืน {asset_id: score} ของผู้สมัคร ไม่เกิน limit แถวต่อแหล่ง"""
+    name = "base"
+
+    def candidates(self, q, limit):
+        raise NotImplementedError
+
+    def index_assets(self, connection, assets):
+        pass
+
+    def remove_assets(self, connection, asset_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class LikeBackend(SearchBackend):
+    # fallback เดิม: LIKE '%q%' (full scan) ใช้กับ dialect ที่ไม่รู้จัก
+    name = "like"
+
+    def candidates(self, q, limit):
+        scores = _tag_prefix_hits(q, limit)
+        like = "%" + _escape_like(q) + "%"
+        rows = db.session.execute(
+            select(Asset.id).where(Asset.name.like(like, escape="\\")).limit(limit)
+        ).scalars()
+        for asset_id in rows:
+            scores[asset_id] = scores.get(asset_id, 0.0) + NAME_SCORE
+        return scores
+
+
+class MySQLFulltextBackend(SearchBackend):
+    # ต้องมี: CREATE FULLTEXT INDEX ft_assets_name ON assets(name) WITH PARSER ngram;
+    name = "mysql"
+
+    def candidates(self, q, limit):
+        scores = _tag_prefix_hits(q, limit)
+        rows = db.session.execute(
+            text("""
+                SELECT id, MATCH(name) AGAINST (:q IN NATURAL LANGUAGE MODE) AS rel
+                FROM assets
+                WHERE MATCH(name) AGAINST (:q IN NATURAL LANGUAGE MODE)
+                ORDER BY rel DESC
+                LIMIT :limit
+            """),
+            {"q": q, "limit": limit}
+        ).all()
+        if rows:
+            top = rows[0].rel or 1.0
+            for r in rows:
+                scores[r.id] = scores.get(r.id, 0.0) + NAME_SCORE * float(r.rel) / float(top)
+        return scores
+
+    def rebuild(self):
+        db.session.execute(text("OPTIMIZE TABLE assets"))
+
+
+trigram_metadata = MetaData()
+
+asset_search_trigrams = Table(
+    "asset_search_trigrams",
+    trigram_metadata,
+    Column("trigram", String(NGRAM * 4), primary_key=True),
+    Column("asset_id", Integer, primary_key=True, index=True),
+    sqlite_with_rowid=False,
+)
+
+
+class SearchIndexMissing(RuntimeError):
+    pass
+
+
+@contextmanager
+def _trigram_table():
+    # DB ที่สร้างด้วย create_all (ไม่ผ่าน migration) ไม่มีตาราง trigram -> บอกวิธีแก้แทน OperationalError ดิบ
+    try:
+        yield
+    except OperationalError as e:
+        if "no such table" in str(e.orig) and asset_search_trigrams.name in str(e.orig):
+            raise SearchIndexMissing(
+                "ไม่มีตาราง %s: รัน flask --app wsgi db upgrade "
+                "(หรือ trigram_metadata.create_all(engine) สำหรับ DB ที่สร้างด้วย create_all)"
+                % asset_search_trigrams.name
+            ) from e
+        raise
+
+
+class SQLiteTrigramBackend(SearchBackend):
+    # ตารางสร้าง + backfill ครั้งแรกใน migration e9f1b3c7a502 (ไม่มี DDL บน request path)
+    # สร้างใหม่ทั้งหมด: flask search-reindex
+    name = "sqlite"
+
+    def _backfill(self, connection, batch_size=1000):
+        last_id = 0
+        while True:
+            batch = connection.execute(
+                select(Asset.id, Asset.name, Asset.asset_tag)
+                .where(Asset.id > last_id)
+                .order_by(Asset.id)
+                .limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            self.index_assets(connection, batch)
+            last_id = batch[-1].id
+
+    def candidates(self, q, limit):
+        scores = _tag_prefix_hits(q, limit)
+        grams = ngrams(q)
+
+        if not grams:
+            # คำค้นสั้นกว่า trigram (1-2 ตัวอักษร) -> ใช้ LikeBackend ซึ่งหยุดที่ limit แถวแรก
+            return LikeBackend().candidates(q, limit)
+
+        t = asset_search_trigrams
+        hits = func.count().label("hits")
+        with _trigram_table():
+            rows = db.session.execute(
+                select(t.c.asset_id, hits)
+                .where(t.c.trigram.in_(grams))
+                .group_by(t.c.asset_id)
+                .order_by(hits.desc())
+                .limit(limit)
+            ).all()
+
+        # ต้องตรงอย่างน้อยครึ่งหนึ่งของ trigram ในคำค้น
+        need = max(1, len(grams) // 2)
+        for r in rows:
+            if r.hits >= need:
+                scores[r.asset_id] = scores.get(r.asset_id, 0.0) + NAME_SCORE * r.hits / len(grams)
+        return scores
+
+    def index_assets(self, connection, assets):
+        ids = [a.id for a in assets]
+        if not ids:
+            return
+        t = asset_search_trigrams
+        rows = [
+            {"trigram": g, "asset_id": a.id}
+            for a in assets
+            for g in ngrams(a.name) | ngrams(a.asset_tag)
+        ]
+        with _trigram_table():
+            connection.execute(t.delete().where(t.c.asset_id.in_(ids)))
+            if rows:
+                connection.execute(t.insert(), rows)
+
+    def remove_assets(self, connection, asset_ids):
+        if asset_ids:
+            t = asset_search_trigrams
+            with _trigram_table():
+                connection.execute(t.delete().where(t.c.asset_id.in_(list(asset_ids))))
+
+    def rebuild(self):
+        connection = db.session.connection()
+        with _trigram_table():
+            connection.execute(asset_search_trigrams.delete())
+        self._backfill(connection)
+        db.session.commit()
+
+
+BACKENDS = {
+    "like": LikeBackend,
+    "mysql": MySQLFulltextBackend,
+    "sqlite": SQLiteTrigramBackend,
+}
+
+
+def register_backend(name, backend_cls):
+    BACKENDS[name] = backend_cls
+
+
+def get_backend():
+    backend = current_app.extensions.get("asset_search")
+    if backend is None:
+        name = current_app.config.get("SEARCH_BACKEND", "auto")
+        if name == "auto":
+            name = db.engine.dialect.name
+        backend = BACKENDS.get(name, LikeBackend)()
+        current_app.extensions["asset_search"] = backend
+    return backend
+
+
+# ======================
+# PUBLIC API
+# ======================
+def search_asset_ids(q, limit=1000):
+    """id ของผู้สมัครเรียงตามคะแนน (ไม่โหลด ORM) ใช้กับ export/API"""
+    q = (q or "").strip()
+    if not q:
+        return []
+    scores = get_backend().candidates(q, limit)
+    return sorted(scores, key=lambda i: (-scores[i], -i))[:limit]
+
+
+def search_assets(q, query=None, limit=50):
+    """
+    ค้นหาครุภัณฑ์แล้วเรียงตาม relevance
+    query : Asset query ที่ใส่ filter อื่นไว้แล้ว (status/category/location)
+    คืน list ของ (Asset, score)
+    """
+    q = (q or "").strip()
+    if not q:
+        return []
+
+    scores = get_backend().candidates(q, limit * CANDIDATE_FACTOR)
+    if not scores:
+        return []
+
+    query = query if query is not None else Asset.query
+    assets = query.filter(Asset.id.in_(list(scores))).all()
+    # คะแนนเท่ากัน -> ชื่อสั้นกว่า (ตรงกว่า) มาก่อน
+    ranked = sorted(assets, key=lambda a: (-scores[a.id], len(a.name), -a.id))
+    return [(a, scores[a.id]) for a in ranked[:limit]]
+
+
+# ======================
+# TYPEAHEAD (ตัวเลือกในฟอร์ม)
+# ======================
+def _prefix_variants(q):
+    # SQLite เทียบแบบ case-sensitive -> ลองแบบที่พิมพ์ / ตัวพิมพ์ใหญ่ / ขึ้นต้นตัวใหญ่
+    return sorted({q, q.upper(), q[:1].upper() + q[1:]})
+
+
+def typeahead(q, limit=20, exclude_checked_out=True):
+    """
+    ครุภัณฑ์ที่ asset_tag หรือ name ขึ้นต้นด้วย q (สูงสุด limit รายการ)
+    ตัด retired เสมอ และตัดตัวที่มี checkout requested/approved อยู่ (anti-join บน uq_checkouts_active_asset)
+    แต่ละ prefix เป็น range scan ที่ ORDER BY + LIMIT บน index ของตัวเอง (uq_assets_asset_tag / idx_assets_name)
+    แล้ว UNION ALL รวมเป็น query เดียว
+    """
+    q = (q or "").strip()
+    conditions = [Asset.status != "retired"]
+    if exclude_checked_out:
+        active = (
+            select(Checkout.id)
+            .where(Checkout.active_asset_id == Asset.id)
+            .exists()
+        )
+        conditions.append(~active)
+
+    cols = (Asset.id, Asset.asset_tag, Asset.name, Asset.status)
+    if not q:
+        return db.session.execute(
+            select(*cols).where(*conditions).order_by(Asset.asset_tag).limit(limit)
+        ).all()
+
+    branches = []
+    for rank, col in enumerate((Asset.asset_tag, Asset.name)):
+        for p in _prefix_variants(q):
+            branch = (
+                select(*cols, literal(rank).label("rank"))
+                .where(col >= p, col < p + "\uffff", *conditions)
+                .order_by(col)
+                .limit(limit)
+                .subquery()
+            )
+            branches.append(select(*branch.c))
+    rows = db.session.execute(union_all(*branches)).all()
+
+    # tag ตรงก่อนชื่อ แล้วเรียงตาม tag
+    best = {}
+    for r in rows:
+        if r.id not in best or r.rank < best[r.id].rank:
+            best[r.id] = r
+    return sorted(best.values(), key=lambda r: (r.rank, r.asset_tag))[:limit]
+
+
+# ======================
+# INDEX MAINTENANCE
+# ======================
+def _after_flush(session, flush_context):
+    changed = [o for o in list(session.new) + list(session.dirty) if isinstance(o, Asset)]
+    removed = [o.id for o in session.deleted if isinstance(o, Asset)]
+    if not changed and not removed:
+        return
+
+    # MySQL ดูแล FULLTEXT index เอง มีแค่ trigram table ที่ต้องอัปเดตตาม
+    if not current_app:
+        return
+    backend = get_backend()
+    if not isinstance(backend, SQLiteTrigramBackend):
+        return
+    if changed:
+        backend.index_assets(session.connection(), changed)
+    if removed:
+        backend.remove_assets(session.connection(), removed)
+
+
+def assets_bulk_inserted(asset_tags):
+    # insert แบบ Core (bulk import) ไม่ผ่าน after_flush -> index ตาม asset_tag ที่เพิ่งเพิ่ม
+    backend = get_backend()
+    if not isinstance(backend, SQLiteTrigramBackend) or not asset_tags:
+        return
+    connection = db.session.connection()
+    rows = connection.execute(
+        select(Asset.id, Asset.name, Asset.asset_tag).where(Asset.asset_tag.in_(asset_tags))
+    ).all()
+    backend.index_assets(connection, rows)
+
+
+def init_app(app):
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+    @app.cli.command("search-reindex")
+    def search_reindex():
+        """สร้าง search index ของครุภัณฑ์ใหม่ทั้งหมด"""
+        get_backend().rebuild()
+        click.echo("search index rebuilt (%s)" % get_backend().name)
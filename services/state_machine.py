@@ -0,0 +1,223 @@
+# services/state_machine.py
+# ======================
+# State machine ของ checkout / ticket + optimistic concurrency
+# ======================
+# - สถานะมาจาก CHECKOUT_STATUSES / TICKET_STATUSES ใน models (ไม่มีสถานะลอย)
+#   action -> (สถานะต้นทางที่ยอมรับ, สถานะปลายทาง)
+# - guarded_update() : UPDATE เดียวแบบ
+#       UPDATE t SET status=:new, version=version+1, ...
+#       WHERE id IN (...) AND status = :old [AND version = :expected]
+#   แถวที่คนอื่นเปลี่ยนไปก่อน (status / version ไม่ตรง) -> skipped พร้อมสถานะปัจจุบัน
+#   ไม่มี lock ทั้งตาราง แถวที่ไม่เกี่ยวข้องเขียนพร้อมกันได้ตามปกติ
+# - ConflictError -> 409 (app.errorhandler) ให้ client โหลดสถานะล่าสุดแล้วลองใหม่
+# - ทุกแถวที่เปลี่ยนถูกส่งเข้า audit log (services/audit.py) และหน้า live (services/live.py)
+# - with_retry() : ลองใหม่เมื่อ DB แจ้ง deadlock / lock timeout (ไม่ใช่ conflict ทางธุรกิจ)
+import random
+import time
+
+from flask import current_app, flash, jsonify, redirect, request, url_for
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+
+from extensions import db
+from models import CHECKOUT_STATUSES, TICKET_STATUSES
+from services import audit, live
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class ConflictError(Exception):
+    """แถวถูกเปลี่ยนไปก่อน: conflicts = [{"id", "status", "version"}] (status None = ไม่พบ)"""
+
+    def __init__(self, message, conflicts=()):
+        super().__init__(message)
+        self.conflicts = list(conflicts)
+
+    def as_dict(self):
+        return {"error": "conflict", "message": str(self), "conflicts": self.conflicts, "retry": True}
+
+
+class StateMachine:
+    def __init__(self, name, states, actions):
+        self.name = name
+        self.states = tuple(states)
+        self.actions = {}
+        for action, (sources, target) in actions.items():
+            sources = (sources,) if isinstance(sources, str) else tuple(sources)
+            unknown = [s for s in sources + (target,) if s not in self.states]
+            if unknown:
+                raise ValueError("%s.%s: unknown status %s" % (name, action, ", ".join(unknown)))
+            self.actions[action] = (sources, target)
+
+    def __contains__(self, action):
+        return action in self.actions
+
+    def sources(self, action):
+        return self.actions[action][0]
+
+    def target(self, action):
+        return self.actions[action][1]
+
+    def allowed(self, status):
+        """action ที่ทำได้จาก status นี้ (ใช้ซ่อน/แสดงปุ่ม)"""
+        return [a for a, (sources, _) in self.actions.items() if status in sources]
+
+    def check(self, action, status):
+        if action not in self.actions:
+            raise InvalidTransition("%s: action ไม่ถูกต้อง: %s" % (self.name, action))
+        if status not in self.sources(action):
+            raise InvalidTransition("%s: %s ไม่ได้จากสถานะ %s" % (self.name, action, status))
+        return self.target(action)
+
+
+CHECKOUT_FLOW = StateMachine("checkout", CHECKOUT_STATUSES, {
+    "approve": ("requested", "approved"),
+    "reject": ("requested", "rejected"),
+    "return": ("approved", "returned"),
+})
+
+TICKET_FLOW = StateMachine("ticket", TICKET_STATUSES, {
+    "start": ("open", "in_progress"),
+    "resolve": (("open", "in_progress"), "resolved"),
+    "close": (("open", "in_progress", "resolved"), "closed"),
+    "reopen": (("resolved", "closed"), "open"),
+})
+
+
+# ======================
+# GUARDED UPDATE
+# ======================
+def guarded_update(model, flow, action, ids, values=None, versions=None, actor_id=None, note=None):
+    """
+    เปลี่ยนสถานะหลาย id ของ model ตาม flow คืน
+        {"action", "changed": [id], "skipped": [{"id", "status", "version"}]}
+    versions: {id: version ที่ client เห็น} -> id ที่ version ไม่ตรงจะถูก skip
+    แถวที่เปลี่ยนถูกบันทึก audit และส่ง event ไปหน้า live (หลัง commit)
+    ยังไม่ commit (ผู้เรียกรวมกับงานอื่นใน transaction เดียวกันได้)
+    """
+    if action not in flow:
+        raise InvalidTransition("%s: action ไม่ถูกต้อง: %s" % (flow.name, action))
+    versions = versions or {}
+    target = flow.target(action)
+    values = dict(values or {}, status=target, version=model.version + 1)
+    bind = db.session.get_bind(mapper=model.__mapper__)
+    returning = bind.dialect.update_returning
+
+    sources = flow.sources(action)
+    if len(sources) == 1:
+        seen = dict.fromkeys(ids, sources[0])
+    else:
+        # หลายสถานะต้นทาง: อ่านสถานะเดิมก่อน (audit ต้องรู้ old_status)
+        # แล้ว UPDATE แบบ compare-and-set ต่อกลุ่มสถานะเดิม
+        stmt = select(model.id, model.status).where(model.id.in_(ids), model.status.in_(sources))
+        seen = dict(db.session.execute(stmt if returning else stmt.with_for_update()).all())
+
+    # กลุ่ม (สถานะเดิม, version ที่ client เห็น) -> id  (id ที่ไม่ส่ง version มา ตรวจแค่ status)
+    groups = {}
+    for i in ids:
+        if i in seen:
+            groups.setdefault((seen[i], versions.get(i)), []).append(i)
+
+    opts = {"synchronize_session": False}
+    changed = {}  # id -> version ใหม่
+    for (old, version), group in groups.items():
+        where = [model.id.in_(group), model.status == old]
+        if version is not None:
+            where.append(model.version == version)
+        stmt = update(model).where(*where).values(**values)
+        if returning:
+            # SQLite 3.35+ / MariaDB / PostgreSQL: ได้ id ที่เปลี่ยนจาก UPDATE ตรง ๆ
+            changed.update(db.session.execute(
+                stmt.returning(model.id, model.version), execution_options=opts
+            ).all())
+        else:
+            # MySQL: ล็อกเฉพาะแถวที่ยังตรงเงื่อนไข แล้ว UPDATE ด้วยเงื่อนไขเดิม
+            hit = dict(db.session.execute(select(model.id, model.version).where(*where).with_for_update()).all())
+            if hit:
+                db.session.execute(stmt, execution_options=opts)
+            changed.update((i, v + 1) for i, v in hit.items())
+
+    audit.record(flow.name, [(i, seen[i], target) for i in ids if i in changed], actor_id, note)
+    live.publish(flow.name, action, [
+        {"id": i, "status": target, "version": changed[i], "from": seen[i]} for i in ids if i in changed
+    ])
+
+    skipped = [i for i in ids if i not in changed]
+    current = {}
+    if skipped:
+        current = {
+            row.id: row for row in db.session.execute(
+                select(model.id, model.status, model.version).where(model.id.in_(skipped))
+            )
+        }
+    return {
+        "action": action,
+        "changed": [i for i in ids if i in changed],
+        "skipped": [
+            {
+                "id": i,
+                "status": current[i].status if i in current else None,
+                "version": current[i].version if i in current else None,
+            }
+            for i in skipped
+        ],
+    }
+
+
+# ======================
+# RETRY
+# ======================
+_TRANSIENT = (
+    "deadlock",              # MySQL 1213 / PostgreSQL
+    "lock wait timeout",     # MySQL 1205
+    "database is locked",    # SQLite (ผู้เขียนหลายคนพร้อมกัน)
+    "could not serialize",   # PostgreSQL serializable
+)
+
+
+def is_transient(exc):
+    return isinstance(exc, OperationalError) and any(t in str(exc.orig).lower() for t in _TRANSIENT)
+
+
+def with_retry(fn, *args, attempts=None, **kwargs):
+    """เรียก fn ใหม่เมื่อ transaction ตายเพราะ lock ชนกัน (rollback ก่อนทุกครั้ง)"""
+    attempts = attempts or current_app.config["CONCURRENCY_RETRIES"]
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn(*args, **kwargs)
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt == attempts or not is_transient(e):
+                raise
+            # backoff แบบสุ่ม กันทุก thread ตื่นมาชนกันซ้ำพร้อมกัน
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+
+
+# ======================
+# 409
+# ======================
+def _wants_json():
+    return (request.is_json or request.path.startswith("/api/")
+            or request.accept_mimetypes.best == "application/json")
+
+
+def conflict_response(exc):
+    db.session.rollback()
+    if _wants_json():
+        return jsonify(exc.as_dict()), 409
+    # ฟอร์ม HTML: กลับไปหน้าเดิมซึ่งจะแสดงสถานะล่าสุด ให้ผู้ใช้กดใหม่ได้
+    flash(str(exc), "warning")
+    return redirect(request.referrer or url_for("dashboard.index"), code=303)
+
+
+def _stale_response(exc):
+    # ORM flush เจอ version ไม่ตรง (version_id_col) -> conflict เหมือนกัน
+    return conflict_response(ConflictError("ข้อมูลถูกแก้ไขโดยผู้ใช้อื่นแล้ว กรุณาโหลดใหม่แล้วลองอีกครั้ง"))
+
+
+def init_app(app):
+    app.register_error_handler(ConflictError, conflict_response)
+    app.register_error_handler(StaleDataError, _stale_response)
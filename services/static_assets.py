@@ -0,0 +1,225 @@
+# services/static_assets.py
+# ======================
+# Static asset pipeline (build ตอน deploy)
+# ======================
+#   flask --app wsgi static-build
+# สร้าง static/dist/ :
+#   - ไฟล์ทุกตัวตั้งชื่อใหม่ตาม hash ของเนื้อหา  css/style.css -> css/style.1a2b3c4d5e6f.css
+#   - ไฟล์ข้อความ (css/js/svg/...) มี .gz และ .br (ถ้าติดตั้ง Brotli) วางคู่กัน
+#   - รูปภาพมีรุ่นย่อขนาดตาม STATIC_IMAGE_WIDTHS ทั้งนามสกุลเดิมและ WebP (ใช้ Pillow)
+#   - manifest.json จับคู่ชื่อเดิม -> ชื่อใหม่
+# ตอนรัน:
+#   - url_for('static', filename='css/style.css') ได้ชื่อ hash อัตโนมัติ (ผ่าน url_defaults)
+#     รูป: url_for('static', filename='img/college_logo.png', w=64, fmt='webp')
+#   - ไฟล์ใน dist/ ส่งแบบ immutable 1 ปี และเลือก .br / .gz ตาม Accept-Encoding
+# ไม่มี manifest (dev) -> ใช้ static เดิมทุกอย่าง
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+import click
+from flask import current_app, request, send_from_directory
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+TEXT_EXTENSIONS = {".css", ".js", ".svg", ".json", ".txt", ".map", ".html"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+# ======================
+# BUILD
+# ======================
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _hashed_name(rel, data, suffix=""):
+    stem, ext = os.path.splitext(rel)
+    return "%s%s.%s%s" % (stem, suffix, _digest(data), ext)
+
+
+def _write(out_dir, rel, data):
+    path = os.path.join(out_dir, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _precompress(path, data):
+    # mtime=0 -> build ซ้ำได้ไฟล์เดิมทุกไบต์
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(path + ".br", "wb") as f:
+        f.write(brotli.compress(data, quality=11))
+
+
+def _image_variants(src_path, rel, out_dir, widths, webp_quality):
+    """คืน {width: {"orig": name, "webp": name}} รวมขนาดเต็มด้วย"""
+    from io import BytesIO
+    from PIL import Image, ImageOps
+
+    stem, ext = os.path.splitext(rel)
+    fmt = "JPEG" if ext.lower() in (".jpg", ".jpeg") else "PNG"
+    variants = {}
+
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        full = img.width
+        for w in sorted({w for w in widths if w < full} | {full}):
+            resized = img if w == full else img.resize(
+                (w, max(1, round(img.height * w / full))), Image.LANCZOS
+            )
+            entry = {}
+
+            if w != full:
+                buf = BytesIO()
+                if fmt == "JPEG":
+                    resized.convert("RGB").save(buf, "JPEG", quality=82, optimize=True, progressive=True)
+                else:
+                    resized.save(buf, "PNG", optimize=True)
+                data = buf.getvalue()
+                entry["orig"] = _hashed_name(rel, data, ".%d" % w)
+                _write(out_dir, entry["orig"], data)
+
+            buf = BytesIO()
+            resized.save(buf, "WEBP", quality=webp_quality, method=6)
+            data = buf.getvalue()
+            entry["webp"] = _hashed_name(stem + ".webp", data, ".%d" % w)
+            _write(out_dir, entry["webp"], data)
+
+            variants[w] = entry
+    return variants, full
+
+
+def build(app):
+    static_dir = app.static_folder
+    out_dir = os.path.join(static_dir, DIST)
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    widths = app.config["STATIC_IMAGE_WIDTHS"]
+    manifest = {"files": {}, "images": {}}
+
+    for root, dirs, files in os.walk(static_dir):
+        # ไม่ประมวลผล output ของตัวเอง
+        dirs[:] = [d for d in dirs if os.path.join(root, d) not in (out_dir, tmp_dir)]
+        for name in sorted(files):
+            src = os.path.join(root, name)
+            rel = os.path.relpath(src, static_dir).replace(os.sep, "/")
+            with open(src, "rb") as f:
+                data = f.read()
+
+            hashed = _hashed_name(rel, data)
+            path = _write(tmp_dir, hashed, data)
+            manifest["files"][rel] = hashed
+
+            ext = os.path.splitext(name)[1].lower()
+            if ext in TEXT_EXTENSIONS:
+                _precompress(path, data)
+            elif ext in IMAGE_EXTENSIONS:
+                try:
+                    variants, full = _image_variants(src, rel, tmp_dir, widths, app.config["STATIC_WEBP_QUALITY"])
+                except ImportError:
+                    click.echo("Pillow not installed: skip image variants for %s" % rel)
+                    continue
+                variants[full]["orig"] = hashed
+                manifest["images"][rel] = {str(w): v for w, v in variants.items()}
+
+    with open(os.path.join(tmp_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return manifest
+
+
+# ======================
+# RUNTIME
+# ======================
+def load_manifest(app):
+    path = os.path.join(app.static_folder, DIST, MANIFEST)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pick_image(variants, width, fmt):
+    sizes = sorted(int(w) for w in variants)
+    chosen = sizes[-1]
+    if width:
+        # รุ่นที่เล็กที่สุดที่ยังกว้างพอ (หรือใหญ่สุดที่มี)
+        chosen = next((w for w in sizes if w >= width), sizes[-1])
+    entry = variants[str(chosen)]
+    if fmt == "webp":
+        return entry["webp"]
+    # ขนาดที่ไม่มีรุ่นนามสกุลเดิม (ไม่ควรเกิด) -> ใช้ขนาดใหญ่สุด
+    return entry.get("orig") or variants[str(sizes[-1])]["orig"]
+
+
+def _static_url_defaults(endpoint, values):
+    if endpoint != "static":
+        return
+    width = values.pop("w", None)
+    fmt = values.pop("fmt", None)
+    manifest = current_app.extensions.get("static_manifest")
+    filename = values.get("filename")
+    if not manifest or not filename:
+        return
+
+    variants = manifest["images"].get(filename)
+    if variants and (width or fmt):
+        values["filename"] = DIST + "/" + _pick_image(variants, int(width or 0), fmt)
+    elif filename in manifest["files"]:
+        values["filename"] = DIST + "/" + manifest["files"][filename]
+
+
+def serve_static(filename):
+    app = current_app
+    if not filename.startswith(DIST + "/"):
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(filename)[0]
+    accepted = request.accept_encodings
+    for encoding, ext in ENCODINGS:
+        if accepted[encoding] and os.path.isfile(os.path.join(app.static_folder, filename + ext)):
+            response = send_from_directory(app.static_folder, filename + ext, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+            break
+    else:
+        response = send_from_directory(app.static_folder, filename, mimetype=mimetype)
+
+    if os.path.splitext(filename)[1].lower() in TEXT_EXTENSIONS:
+        response.vary.add("Accept-Encoding")
+    # ชื่อไฟล์มี hash ของเนื้อหา -> cache ได้ตลอดไป
+    response.headers["Cache-Control"] = IMMUTABLE
+    return response
+
+
+def init_app(app):
+    manifest = load_manifest(app)
+    if manifest is not None:
+        app.extensions["static_manifest"] = manifest
+    app.url_defaults(_static_url_defaults)
+    if "static" in app.view_functions:
+        app.view_functions["static"] = serve_static
+
+    @app.cli.command("static-build")
+    def static_build():
+        """สร้าง static/dist (ชื่อ hash + gzip/brotli + รูปย่อ/WebP) และ manifest"""
+        manifest = build(app)
+        app.extensions["static_manifest"] = manifest
+        click.echo("built %d files, %d images -> %s" % (
+            len(manifest["files"]), len(manifest["images"]), os.path.join(app.static_folder, DIST)
+        ))
@@ -0,0 +1,107 @@
+// asset_picker.js
+// ======================
+// typeahead เลือกครุภัณฑ์ (แทน <select> ที่ฝังครุภัณฑ์ทั้งหมดไว้ในหน้า)
+// ======================
+// <div class="asset-picker" data-url="/assets/lookup?mode=checkout" data-name="asset_id" data-multiple="1">
+// - ดึงผลทีละไม่เกิน limit รายการตามที่พิมพ์ (debounce + ยกเลิก request เก่า + cache ต่อคำค้น)
+// - เลือกแล้วสร้าง <input type="hidden" name="asset_id"> ให้ฟอร์มส่งตามเดิม
+(function () {
+  const DEBOUNCE_MS = 200;
+
+  function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function initPicker(root) {
+    const url = root.dataset.url;
+    const name = root.dataset.name || "asset_id";
+    const multiple = root.dataset.multiple === "1";
+    const input = root.querySelector(".asset-picker-input");
+    const results = root.querySelector(".asset-picker-results");
+    const selected = root.querySelector(".asset-picker-selected");
+    const cache = new Map();
+    let timer = null;
+    let inflight = null;
+
+    function chosenIds() {
+      return Array.from(selected.querySelectorAll("input[type=hidden]")).map(i => i.value);
+    }
+
+    function choose(item) {
+      if (!multiple) selected.innerHTML = "";
+      if (chosenIds().includes(String(item.id))) return;
+
+      const chip = el("span", "asset-picker-chip", item.asset_tag + " · " + item.name);
+      const hidden = el("input");
+      hidden.type = "hidden";
+      hidden.name = name;
+      hidden.value = item.id;
+      const remove = el("button", "asset-picker-remove", "×");
+      remove.type = "button";
+      remove.addEventListener("click", () => chip.remove());
+      chip.append(hidden, remove);
+      selected.appendChild(chip);
+
+      input.value = "";
+      results.innerHTML = "";
+    }
+
+    function render(items) {
+      results.innerHTML = "";
+      const taken = chosenIds();
+      items.filter(item => !taken.includes(String(item.id))).forEach(item => {
+        const row = el("button", "list-group-item list-group-item-action asset-picker-item");
+        row.type = "button";
+        row.append(el("strong", "", item.asset_tag), document.createTextNode(" " + item.name));
+        row.addEventListener("click", () => choose(item));
+        results.appendChild(row);
+      });
+      if (!results.children.length) {
+        results.appendChild(el("div", "list-group-item asset-picker-empty", "ไม่พบครุภัณฑ์ที่เลือกได้"));
+      }
+    }
+
+    function load(q) {
+      if (cache.has(q)) return render(cache.get(q));
+      if (inflight) inflight.abort();
+      inflight = new AbortController();
+
+      const sep = url.includes("?") ? "&" : "?";
+      fetch(url + sep + "q=" + encodeURIComponent(q), {
+        signal: inflight.signal,
+        headers: { "Accept": "application/json" },
+        credentials: "same-origin",
+      })
+        .then(r => r.json())
+        .then(data => {
+          cache.set(q, data.results);
+          render(data.results);
+        })
+        .catch(err => {
+          if (err.name !== "AbortError") notify("โหลดรายการครุภัณฑ์ไม่สำเร็จ", "danger");
+        });
+    }
+
+    input.addEventListener("input", () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => load(input.value.trim()), DEBOUNCE_MS);
+    });
+    input.addEventListener("focus", () => load(input.value.trim()));
+
+    const form = root.closest("form");
+    if (form) {
+      form.addEventListener("submit", e => {
+        if (!chosenIds().length) {
+          e.preventDefault();
+          notify("กรุณาเลือกครุภัณฑ์", "warning");
+          input.focus();
+        }
+      });
+    }
+  }
+
+  document.querySelectorAll(".asset-picker").forEach(initPicker);
+})();
@@ -1,16 +1,105 @@
-function notify(message, type = "info", timeout = 3000) {
-  const box = document.createElement("div");
-  box.className = "notify " + type;
-  box.innerText = message;
-
-  document.getElementById("notify-container").appendChild(box);
-
-  setTimeout(() => {
-    box.style.opacity = "0";
-    setTimeout(() => box.remove(), 300);
-  }, timeout);
-}
-setTimeout(() => {
-  el.classList.add("hide");
-  setTimeout(() => el.remove(), 350);
-}, 3500); // เวลาโชว์รวม
+// static/script.js
+// ======================
+// Live updates (Server-Sent Events) ของ dashboard / checkouts / tickets
+// ======================
+// หน้าไหนมี [data-live-url] จะเปิด EventSource แล้วแก้เฉพาะส่วนที่เปลี่ยนแทนการโหลดทั้งหน้า
+//   event "checkout" / "ticket": {"action", "rows": [{"id", "status", "version", "from"}]}
+//   tr[data-live-row="checkout:12"]   แถวของรายการ
+//     [data-live-status]              ช่องสถานะ -> แทนที่ด้วย template[data-live-badge="checkout:<status>"]
+//     input[name=version] / [data-version]  version ล่าสุด (กด action ต่อได้ไม่ชน 409)
+//     [data-live-when="a b"]          แสดงเฉพาะเมื่อสถานะอยู่ในรายการ
+//     data-live-keep="a b"            สถานะใหม่ไม่อยู่ในรายการ -> นำแถวออก
+//   [data-live-count="ticket:open"]   ตัวนับ: -1 ที่สถานะเดิม, +1 ที่สถานะใหม่
+//   [data-live-new="checkout"]        รายการใหม่ (from = null) -> แสดงลิงก์โหลดใหม่พร้อมจำนวน
+//   event "resync"                    ตามไม่ทัน -> โหลดหน้าใหม่
+(function () {
+  const root = document.querySelector("[data-live-url]");
+  if (!root || !window.EventSource) return;
+
+  const url = root.getAttribute("data-live-url");
+  let source = null;
+  let backoff = 5000;
+  let lastId = null;
+
+  function bump(key, delta) {
+    document.querySelectorAll('[data-live-count="' + key + '"]').forEach(el => {
+      const n = parseInt(el.textContent, 10);
+      if (!isNaN(n)) el.textContent = Math.max(0, n + delta);
+    });
+  }
+
+  function announce(entity, count) {
+    document.querySelectorAll('[data-live-new="' + entity + '"]').forEach(el => {
+      const counter = el.querySelector("[data-live-new-count]");
+      if (counter) counter.textContent = (parseInt(counter.textContent, 10) || 0) + count;
+      el.classList.remove("d-none");
+    });
+  }
+
+  function patchRow(entity, row) {
+    const tr = document.querySelector('[data-live-row="' + entity + ":" + row.id + '"]');
+    if (!tr) return;
+
+    const keep = tr.getAttribute("data-live-keep");
+    if (keep && !keep.split(" ").includes(row.status)) {
+      tr.classList.add("live-leave");
+      setTimeout(() => tr.remove(), 400);
+      return;
+    }
+
+    const badge = document.querySelector('template[data-live-badge="' + entity + ":" + row.status + '"]');
+    const cell = tr.querySelector("[data-live-status]");
+    if (badge && cell) cell.replaceChildren(badge.content.cloneNode(true));
+
+    tr.querySelectorAll('input[name="version"]').forEach(el => { el.value = row.version; });
+    tr.querySelectorAll("[data-version]").forEach(el => el.setAttribute("data-version", row.version));
+    tr.querySelectorAll("[data-live-when]").forEach(el => {
+      el.hidden = !el.getAttribute("data-live-when").split(" ").includes(row.status);
+      if (el.hidden && el.type === "checkbox") el.checked = false;
+    });
+
+    tr.classList.remove("live-flash");
+    void tr.offsetWidth; // เริ่ม animation ใหม่
+    tr.classList.add("live-flash");
+  }
+
+  function handle(entity, event) {
+    if (event.lastEventId) lastId = event.lastEventId;
+    const data = JSON.parse(event.data);
+    let created = 0;
+    data.rows.forEach(row => {
+      if (row.from === row.status) return;
+      if (row.from) bump(entity + ":" + row.from, -1);
+      bump(entity + ":" + row.status, 1);
+      if (row.from === null) {
+        created++;
+      } else {
+        patchRow(entity, row);
+      }
+    });
+    if (created) announce(entity, created);
+  }
+
+  function connect() {
+    // EventSource ตัวใหม่ไม่ส่ง Last-Event-ID ให้เอง -> ส่งทาง query string
+    source = new EventSource(lastId ? url + "?last_event_id=" + encodeURIComponent(lastId) : url);
+    source.addEventListener("open", () => { backoff = 5000; });
+    source.addEventListener("checkout", e => handle("checkout", e));
+    source.addEventListener("ticket", e => handle("ticket", e));
+    source.addEventListener("resync", () => {
+      source.close();
+      location.reload();
+    });
+    source.addEventListener("error", () => {
+      // network หลุด -> EventSource ต่อใหม่เอง; server ตอบ 503 (เต็ม) -> CLOSED ต้องต่อเองแบบถอยเวลา
+      if (source.readyState === EventSource.CLOSED) {
+        setTimeout(connect, backoff);
+        backoff = Math.min(backoff * 2, 60000);
+      }
+    });
+  }
+
+  connect();
+  window.addEventListener("pagehide", () => source && source.close());
+  window.addEventListener("pageshow", e => { if (e.persisted) connect(); });
+})();
@@ -0,0 +1,108 @@
+# tests/conftest.py
+# ======================
+# app + SQLite ชั่วคราว สำหรับเทส (ตารางสร้างใหม่ทุกเทส)
+# ======================
+# Config อ่าน env ตอน import -> ตั้งค่าก่อน import app
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP = tempfile.mkdtemp(prefix="webstock-tests-")
+
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(TMP, "test.db"),
+    "DATABASE_REPLICA_URLS": "",
+    "SCHEDULER_ENABLED": "0",
+    # budget เกิน / N+1 -> exception (เทสล้ม) แทน log warning
+    "QUERY_BUDGET_ENABLED": "1",
+    "QUERY_BUDGET_RAISE": "1",
+    "CHANGE_VERSION_DIR": os.path.join(TMP, "versions"),
+    "IDENTITY_CACHE_SIGNAL_FILE": "",
+    "JINJA_CACHE_DIR": "",
+    "REPORT_DIR": os.path.join(TMP, "reports"),
+})
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+
+_app = create_app()
+_app.config["TESTING"] = True
+
+
+@pytest.fixture
+def app():
+    from services.search import trigram_metadata
+
+    with _app.app_context():
+        db.drop_all()
+        trigram_metadata.drop_all(db.engine)
+        db.create_all()
+        trigram_metadata.create_all(db.engine)
+        for name in ("fragment_cache",):
+            cache = _app.extensions.get(name)
+            if cache is not None:
+                cache.clear()
+        yield _app
+        db.session.remove()
+
+
+@pytest.fixture
+def admin(app):
+    from models import User
+
+    user = User(full_name="Admin", email="admin@example.com", password_hash="-", role="admin")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def client(app, admin):
+    """test client ที่ login เป็น admin แล้ว (ใส่ session ตรง ๆ ไม่ผ่านการ hash รหัสผ่าน)"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(admin)
+        sess["_fresh"] = True
+    return client
+
+
+@pytest.fixture
+def seed(app, admin):
+    """
+    seed(n): เพิ่มข้อมูล n ชุด (ผู้ใช้, ครุภัณฑ์, checkout ที่คืนแล้ว/ยังยืมอยู่, แจ้งซ่อม)
+    แต่ละแถวอ้างถึงแถวของตัวเอง -> lazy load ต่อแถว (N+1) ทำให้จำนวน query โตตาม n
+    """
+    from datetime import date, timedelta
+    from models import Asset, Category, Checkout, Location, Ticket, User
+
+    counter = itertools.count(1)
+
+    def add(n):
+        category = Category.query.first() or Category(name="โน้ตบุ๊ค")
+        location = Location.query.first() or Location(building="A", room="101")
+        db.session.add_all([category, location])
+        db.session.flush()
+        today = date.today()
+        for _ in range(n):
+            i = next(counter)
+            user = User(full_name="ผู้ใช้ %d" % i, email="user%d@example.com" % i, password_hash="-")
+            asset = Asset(asset_tag="T-%05d" % i, name="Notebook %d" % i,
+                          category_id=category.id, location_id=location.id, status="in_use")
+            db.session.add_all([user, asset])
+            db.session.flush()
+            db.session.add_all([
+                Checkout(asset_id=asset.id, borrower_id=user.id, status="returned", approved_by=admin,
+                         checkout_date=today - timedelta(days=10), due_date=today - timedelta(days=3),
+                         return_date=today - timedelta(days=4)),
+                Checkout(asset_id=asset.id, borrower_id=user.id, status="approved", approved_by=admin,
+                         checkout_date=today - timedelta(days=2), due_date=today + timedelta(days=5)),
+                Ticket(asset_id=asset.id, requester_id=user.id, issue="เปิดไม่ติด", status="open"),
+            ])
+        db.session.commit()
+
+    return add
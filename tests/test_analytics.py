@@ -0,0 +1,49 @@
+# tests/test_analytics.py
+# ======================
+# refresh แบบ incremental ต้องได้ rollup เท่ากับคำนวณใหม่ทั้งหมด
+# ======================
+from datetime import date, timedelta
+
+from extensions import db
+from services import analytics
+
+
+def _rollup():
+    from models import AssetUsageDaily as u
+
+    return sorted(
+        (r.day, r.asset_id) + tuple(getattr(r, m) for m in analytics.METRICS)
+        for r in u.query.all()
+    )
+
+
+def _from_scratch(as_of):
+    from models import AnalyticsCheckoutState, AssetUsageDaily
+
+    AssetUsageDaily.query.delete()
+    AnalyticsCheckoutState.query.delete()
+    db.session.commit()
+    analytics.refresh(as_of)
+    return _rollup()
+
+
+def test_open_loans_extend_incrementally(app, seed):
+    from models import Checkout
+
+    seed(3)
+    today = date.today()
+    analytics.refresh(today - timedelta(days=1))
+    # loan ที่ยังไม่คืนเลย due ไปแล้ว -> วันที่ต่อท้ายต้องนับเป็น overdue ด้วย
+    loan = Checkout.query.filter_by(status="approved").first()
+    loan.due_date = today - timedelta(days=1)
+    db.session.commit()
+    analytics.refresh(today + timedelta(days=3))
+    analytics.refresh(today + timedelta(days=10))
+
+    stats = analytics.refresh(today + timedelta(days=12))
+    # รอบนี้แตะเฉพาะ loan ที่ยังไม่คืน และบวกแค่วันที่เพิ่ม (2 วันต่อ loan)
+    assert stats["checkouts"] == 3
+    assert stats["rollup_rows"] == 3 * 2
+
+    incremental = _rollup()
+    assert incremental == _from_scratch(today + timedelta(days=12))
@@ -0,0 +1,44 @@
+# tests/test_asset_import.py
+# ======================
+# import CSV: encoding ภาษาไทย / ไฟล์เสียกลางทาง
+# ======================
+import io
+
+from services import asset_import
+from services.asset_import import import_assets
+
+HEADER = "asset_tag,name,category,location\r\n"
+
+
+def _rows(start, stop):
+    return "".join("NB-%04d,โน้ตบุ๊ค %d,โน้ตบุ๊ค,A / 101\r\n" % (i, i) for i in range(start, stop))
+
+
+def test_cp874_csv_is_imported(app):
+    data = (HEADER + _rows(1, 4)).encode("cp874")
+    report = import_assets(io.BytesIO(data), "assets.csv")
+    assert report.aborted is None
+    assert report.inserted == 3
+
+
+def test_bad_bytes_after_committed_batches_are_reported(app, monkeypatch):
+    from models import Asset
+
+    # ส่วนต้น (ที่ใช้เดา encoding) เป็น UTF-8 ถูกต้อง แถวที่ 6 เป็น byte ที่ไม่ใช่ UTF-8
+    monkeypatch.setattr(asset_import, "CSV_SNIFF_BYTES", 64)
+    data = (HEADER + _rows(1, 5)).encode("utf-8") + b"NB-9999,\xa1\xa2,x,A / 101\r\n" + _rows(5, 7).encode("utf-8")
+    report = import_assets(io.BytesIO(data), "assets.csv", batch_size=2)
+
+    assert "แถวที่ 6" in report.aborted
+    assert report.batches == [{"from": 2, "to": 3, "inserted": 2}, {"from": 4, "to": 5, "inserted": 2}]
+    assert report.committed_to == 5
+    assert Asset.query.count() == 4
+
+
+def test_import_view_does_not_500_on_bad_encoding(client, monkeypatch):
+    monkeypatch.setattr(asset_import, "CSV_SNIFF_BYTES", 64)
+    data = (HEADER + _rows(1, 5)).encode("utf-8") + b"NB-9999,\xa1\xa2,x,A / 101\r\n"
+    resp = client.post("/assets/import", data={"file": (io.BytesIO(data), "assets.csv")},
+                       content_type="multipart/form-data")
+    assert resp.status_code == 200
+    assert "หยุดนำเข้า" in resp.get_data(as_text=True)
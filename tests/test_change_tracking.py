@@ -0,0 +1,25 @@
+# tests/test_change_tracking.py
+# ======================
+# on_commit ได้เฉพาะตารางที่ Session นั้นเขียน
+# ======================
+from sqlalchemy import text
+
+from extensions import db
+from services import change_tracking
+
+
+def test_core_writes_outside_session_do_not_leak(app, monkeypatch):
+    seen = []
+    monkeypatch.setattr(change_tracking, "_callbacks", [seen.append])
+
+    # เขียนผ่าน Core นอก Session แล้วคืน connection เข้า pool (SQLite ใช้ connection เดิมซ้ำ)
+    with db.engine.begin() as conn:
+        conn.execute(text("INSERT INTO categories (name) VALUES ('จอ')"))
+
+    db.session.execute(text("UPDATE locations SET room = room"))
+    db.session.commit()
+    assert seen == [{"locations"}]
+
+    db.session.execute(text("SELECT 1"))
+    db.session.commit()
+    assert seen == [{"locations"}]
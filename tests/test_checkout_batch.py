@@ -0,0 +1,72 @@
+# tests/test_checkout_batch.py
+# ======================
+# optimistic concurrency ของ checkout: version ไม่ตรง -> 409 / ครุภัณฑ์ละ 1 checkout active
+# ======================
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from services.checkout_batch import request_assets, transition
+
+
+def _free_asset(tag="FREE-1"):
+    from models import Asset, Category, Location
+
+    asset = Asset(asset_tag=tag, name="Projector", category_id=Category.query.first().id,
+                  location_id=Location.query.first().id)
+    db.session.add(asset)
+    db.session.commit()
+    return asset.id
+
+
+def test_stale_version_returns_409(client, seed, admin):
+    from models import Checkout
+
+    seed(1)
+    asset_id = _free_asset()
+    assert request_assets([asset_id], admin)["created"] == [asset_id]
+    checkout_id = Checkout.query.filter_by(asset_id=asset_id).one().id
+
+    # admin อีกคนอนุมัติไปก่อน (version 1 -> 2)
+    assert transition("approve", [checkout_id], admin, versions={checkout_id: 1})["changed"] == [checkout_id]
+
+    resp = client.post("/checkouts/%d/reject" % checkout_id, data={"version": "1"},
+                       headers={"Accept": "application/json"})
+    assert resp.status_code == 409
+    body = resp.get_json()
+    assert body["error"] == "conflict" and body["retry"] is True
+    assert body["conflicts"] == [{"id": checkout_id, "status": "approved", "version": 2}]
+    assert db.session.get(Checkout, checkout_id).status == "approved"
+
+
+def test_unique_index_rejects_second_active_checkout(app, seed, admin):
+    from models import Checkout
+
+    seed(1)
+    asset_id = _free_asset()
+    row = {"asset_id": asset_id, "borrower_id": admin, "status": "requested"}
+    db.session.execute(insert(Checkout), [row])
+    db.session.commit()
+
+    with pytest.raises(IntegrityError):
+        db.session.execute(insert(Checkout), [row])
+        db.session.commit()
+    db.session.rollback()
+
+    # checkout ที่จบแล้ว (active_asset_id = NULL) ไม่ชนกัน
+    db.session.execute(insert(Checkout), [dict(row, status="returned")] * 2)
+    db.session.commit()
+    assert Checkout.query.filter_by(asset_id=asset_id).count() == 3
+
+
+def test_request_assets_reports_busy(app, seed, admin):
+    from models import Asset, Checkout
+
+    seed(1)
+    busy_asset = Asset.query.filter_by(asset_tag="T-00001").one().id   # มี checkout approved อยู่
+    free_asset = _free_asset()
+
+    result = request_assets([busy_asset, free_asset, 99999], admin)
+    assert result == {"created": [free_asset], "skipped": [99999], "busy": [busy_asset]}
+    assert Checkout.query.filter_by(asset_id=busy_asset, status="requested").count() == 0
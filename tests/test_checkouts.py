@@ -0,0 +1,40 @@
+# tests/test_checkouts.py
+# ======================
+# ขอเบิกหลายรายการ: ไม่มีรายการไหนสร้างได้ -> ไม่แจ้งว่าสำเร็จ
+# ======================
+
+
+def test_request_only_busy_assets_rerenders_form(client, seed):
+    from models import Asset, Checkout
+
+    seed(1)
+    asset = Asset.query.first()
+    resp = client.post("/checkouts/new", data={"asset_id": [str(asset.id), "99999"]})
+
+    body = resp.get_data(as_text=True)
+    assert resp.status_code == 200
+    assert "ส่งคำขอเบิก" not in body
+    assert "ข้าม 1 รายการที่มีผู้ขอเบิก/ยืมอยู่แล้ว" in body
+    assert "ไม่พบครุภัณฑ์ 1 รายการ" in body
+    assert Checkout.query.filter_by(status="requested").count() == 0
+
+
+def test_request_flashes_success_when_created(client, seed):
+    from models import Asset, Category, Location
+    from extensions import db
+
+    seed(1)
+    free = Asset(asset_tag="FREE-1", name="Projector", category_id=Category.query.first().id,
+                 location_id=Location.query.first().id)
+    db.session.add(free)
+    db.session.commit()
+    resp = client.post("/checkouts/new", data={"asset_id": str(free.id)}, follow_redirects=True)
+    assert resp.request.path == "/checkouts/"
+    assert "ส่งคำขอเบิก 1 รายการแล้ว" in resp.get_data(as_text=True)
+
+
+def test_index_is_paginated(client, seed):
+    seed(3)
+    first = client.get("/checkouts/?per_page=2").get_data(as_text=True)
+    assert first.count('data-live-row="checkout:') == 2
+    assert "ถัดไป ›" in first
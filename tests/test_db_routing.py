@@ -0,0 +1,24 @@
+# tests/test_db_routing.py
+# ======================
+# ไม่มี replica -> ไม่ลงทะเบียน hook ของ read/write split
+# ======================
+from sqlalchemy import event
+
+from services import db_routing
+from services.db_routing import RoutingSession
+
+
+def test_no_hooks_without_replica(client, seed):
+    assert not event.contains(RoutingSession, "after_flush", db_routing._after_flush)
+    assert not event.contains(RoutingSession, "after_commit", db_routing._after_commit)
+
+    from models import Asset, Category, Location
+
+    seed(1)
+    resp = client.post("/assets/create", data={
+        "asset_tag": "NEW-1", "name": "Monitor", "category_id": Category.query.first().id,
+        "location_id": Location.query.first().id, "status": "new",
+    })
+    assert resp.status_code == 302 and Asset.query.filter_by(asset_tag="NEW-1").count() == 1
+    with client.session_transaction() as sess:
+        assert db_routing.STICKY_KEY not in sess
@@ -0,0 +1,77 @@
+# tests/test_live.py
+# ======================
+# hub ของหน้า live: id ที่ commit ไม่เรียงลำดับต้องไม่หาย / ไม่ซ้ำ
+# ======================
+import json
+
+from extensions import db
+from services.live import Client, Hub
+
+
+def _event(event_id):
+    from models import LiveEvent
+
+    db.session.add(LiveEvent(id=event_id, entity="checkout", action="update", payload=json.dumps({"rows": []})))
+    db.session.commit()
+
+
+def _ids(client):
+    out = []
+    while not client.queue.empty():
+        out.append(int(client.queue.get_nowait().split("\n", 1)[0][len("id: "):]))
+    return out
+
+
+def _hub(app):
+    # ไม่เริ่ม thread: เรียก _poll_once เอง
+    hub = Hub(app, poll=1, queue_size=100, max_clients=10, gap_seconds=60)
+    hub._ensure_thread = lambda: None
+    with hub._lock:
+        hub._start()
+    client = Client(100)
+    hub._clients.add(client)
+    return hub, client
+
+
+def test_late_commit_is_delivered_once_without_moving_cursor_back(app):
+    _event(1)
+    hub, client = _hub(app)
+
+    _event(3)            # id 2 ยังไม่ commit
+    hub._poll_once()
+    assert _ids(client) == [3]
+    assert list(hub._gaps) == [2]
+
+    _event(2)
+    hub._poll_once()
+    # ส่ง event 2 ด้วย id = cursor (3): Last-Event-ID ของ browser ไม่ถอยหลัง
+    assert _ids(client) == [3]
+    assert hub._gaps == {} and hub.counts["late"] == 1
+
+    hub._poll_once()
+    assert _ids(client) == []
+
+
+def test_gap_below_max_at_start_is_rechecked(app):
+    _event(1)
+    _event(3)
+    hub, client = _hub(app)
+    assert list(hub._gaps) == [2]
+
+    # client ที่ resume จาก id 1: backlog ไม่รวม gap (hub ส่งให้เองตอนเจอ)
+    _, backlog = hub.subscribe(last_event_id=1)
+    assert [m.split("\n", 1)[0] for m in backlog] == ["id: 3"]
+
+    _event(2)
+    hub._poll_once()
+    assert hub.counts["late"] == 1 and hub._gaps == {}
+
+
+def test_gap_expires(app):
+    _event(1)
+    hub, client = _hub(app)
+    hub.gap_seconds = 0
+    _event(3)
+    hub._poll_once()
+    hub._poll_once()
+    assert hub._gaps == {}
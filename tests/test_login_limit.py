@@ -0,0 +1,56 @@
+# tests/test_login_limit.py
+# ======================
+# rate limit ของ login: ต่อ email นับเฉพาะครั้งที่รหัสผิด
+# ======================
+import pytest
+
+from extensions import db
+from services.rate_limit import TokenBucketLimiter
+
+
+@pytest.fixture
+def user(app):
+    from models import User
+
+    u = User(full_name="Staff", email="staff@example.com", role="staff")
+    u.set_password("Secret123!")
+    db.session.add(u)
+    db.session.commit()
+    limiters = app.extensions["login_limiters"]
+    for limiter in limiters.values():
+        limiter._buckets.clear()
+    return u
+
+
+def _login(client, password):
+    resp = client.post("/login", data={"email": "staff@example.com", "password": password})
+    client.get("/logout")
+    return resp.status_code
+
+
+def test_successful_logins_do_not_lock_out(app, user):
+    client = app.test_client()
+    capacity = int(app.extensions["login_limiters"]["email"].capacity)
+    for _ in range(capacity + 2):
+        assert _login(client, "Secret123!") == 302
+
+
+def test_failures_lock_email_and_success_resets(app, user):
+    client = app.test_client()
+    capacity = int(app.extensions["login_limiters"]["email"].capacity)
+    for _ in range(capacity - 1):
+        assert _login(client, "wrong") == 200
+    # สำเร็จก่อนครบ -> ล้างครั้งที่ผิดก่อนหน้า
+    assert _login(client, "Secret123!") == 302
+    for _ in range(capacity):
+        assert _login(client, "wrong") == 200
+    assert _login(client, "Secret123!") == 429
+
+
+def test_refund_returns_one_token():
+    limiter = TokenBucketLimiter(2, 3600)
+    assert limiter.hit("k") and limiter.hit("k")
+    assert not limiter.hit("k")
+    limiter.refund("k")
+    assert limiter.hit("k")
+    assert not limiter.hit("k")
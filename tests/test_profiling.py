@@ -0,0 +1,38 @@
+# tests/test_profiling.py
+# ======================
+# เวลา SQL ต่อ request: statement ที่ error ไม่ทิ้งค่าค้างบน connection ของ pool
+# ======================
+import pytest
+from flask import g
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from services import profiling
+
+
+@pytest.fixture
+def sql_hooks(app):
+    hooks = (("before_cursor_execute", profiling._before_cursor_execute),
+             ("after_cursor_execute", profiling._after_cursor_execute))
+    for name, fn in hooks:
+        event.listen(db.engine, name, fn)
+    yield
+    for name, fn in hooks:
+        event.remove(db.engine, name, fn)
+
+
+def test_failed_statement_does_not_leak_into_next_request(app, sql_hooks):
+    with app.test_request_context("/"):
+        g._profile = profiling.RequestProfile()
+        info = db.session.connection().info   # dict ของ connection ใน pool (อยู่ต่อหลังคืน pool)
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+        assert not any(k.startswith("_profile") for k in info)
+
+    with app.test_request_context("/"):
+        prof = g._profile = profiling.RequestProfile()
+        db.session.execute(text("SELECT 1"))
+        assert prof.queries == 1
+        assert list(prof.statements) == ["SELECT 1"]
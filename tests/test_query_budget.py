@@ -0,0 +1,57 @@
+# tests/test_query_budget.py
+# ======================
+# จำนวน query ของแต่ละหน้าต้องไม่โตตามจำนวนแถว (N แถว vs 10N แถว)
+# ======================
+import pytest
+
+from services.query_budget import QueryBudgetExceeded, assert_queries_constant, count_queries
+
+N = 4
+
+ROUTES = [
+    "/assets/",
+    "/checkouts/",
+    "/checkouts/history",
+    "/tickets/?status=open",
+    "/",
+    "/api/v1/assets",
+    "/api/v1/checkouts",
+    "/api/v1/tickets",
+]
+
+
+@pytest.mark.parametrize("url", ROUTES)
+def test_query_count_does_not_grow_with_rows(client, seed, url):
+    seed(N)
+    # ทุกแถวของ 10N ต้องอยู่ในหน้าเดียว ไม่งั้น pagination ซ่อน N+1
+    assert 10 * N <= 50
+    before, after = assert_queries_constant(client, url, lambda: seed(9 * N))
+    assert client.get(url).status_code == 200
+    assert after <= before
+
+
+def test_detects_lazy_load_per_row(app, seed):
+    from models import Checkout
+
+    class LazyPage:
+        # จงใจ lazy load c.asset ทีละแถว (แทน client ของ assert_queries_constant)
+        def get(self, url):
+            return ",".join(c.asset.name for c in Checkout.query.all())
+
+    seed(N)
+    with pytest.raises(QueryBudgetExceeded):
+        assert_queries_constant(LazyPage(), "lazy", lambda: seed(9 * N))
+
+
+def test_write_requests_use_write_budget(app, client, seed):
+    from models import Category, Location
+
+    seed(1)
+    category, location = Category.query.first(), Location.query.first()
+    with count_queries() as stats:
+        resp = client.post("/assets/create", data={
+            "asset_tag": "NEW-1", "name": "Monitor", "category_id": category.id,
+            "location_id": location.id, "status": "new",
+        })
+    assert resp.status_code == 302
+    assert sum(stats.values()) <= app.config["QUERY_BUDGET_WRITE"]
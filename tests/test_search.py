@@ -0,0 +1,25 @@
+# tests/test_search.py
+# ======================
+# SQLite trigram index: ไม่มีตาราง (DB จาก create_all) -> error ที่บอกวิธีแก้
+# ======================
+import pytest
+
+from extensions import db
+from services.search import SearchIndexMissing, search_assets, trigram_metadata
+
+
+def test_asset_insert_without_trigram_table_says_run_upgrade(app, seed):
+    from models import Asset, Category, Location
+
+    seed(1)
+    trigram_metadata.drop_all(db.engine)
+    db.session.add(Asset(asset_tag="NEW-1", name="Monitor", category_id=Category.query.first().id,
+                         location_id=Location.query.first().id))
+    with pytest.raises(SearchIndexMissing, match="db upgrade"):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_search_uses_trigram_index(app, seed):
+    seed(2)
+    assert [a.asset_tag for a, _ in search_assets("Notebook 2")][0] == "T-00002"